@@ -0,0 +1,2 @@
+'''performance benchmarks for grg_psse2grg, these are not part of the test
+suite and are run as modules, e.g. python -m benchmarks.parse_memory'''
@@ -0,0 +1,62 @@
+'''compares the memory of the bus, load, generator and branch objects of a
+scaled WECC240 case with their columnar representation, and times the per
+unit conversions of to_grg as loops and as vectorized column operations
+
+usage: python -m benchmarks.columnar [copies]
+'''
+
+import math
+import pickle
+import sys
+import time
+
+from grg_psse2grg.io import parse_psse_case_file
+from grg_psse2grg.columnar import ColumnarCase
+from grg_psse2grg.columnar import columnar_sections
+
+from benchmarks.common import measure
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+def load_tables(pickled_tables):
+    return pickle.loads(pickled_tables)
+
+
+def loop_conversions(case):
+    base_mva = case.sbase
+    angles = [math.radians(bus.va) for bus in case.buses]
+    demands = [(load.pl/base_mva, load.ql/base_mva) for load in case.loads]
+    ratings = [(branch.ratea/base_mva, branch.rateb/base_mva, branch.ratec/base_mva) for branch in case.branches]
+    return angles, demands, ratings
+
+
+def vectorized_conversions(columnar_case):
+    return columnar_case.bus_voltage_setpoints(), columnar_case.load_demands(), columnar_case.branch_ratings()
+
+
+def best_time(function, *args, repeats=5):
+    best = float('inf')
+    for i in range(0, repeats):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(copies):
+    case = scale_case(parse_psse_case_file(wecc240_file), copies)
+
+    pickled_tables = pickle.dumps({name: getattr(case, name) for name in columnar_sections})
+    tables, seconds, object_peak = measure(load_tables, pickled_tables)
+    del tables
+    columnar_case, seconds, columnar_peak = measure(ColumnarCase, case)
+
+    print('{} buses, {} branches'.format(len(case.buses), len(case.branches)))
+    print('objects: {:.1f} MB, columns: {:.1f} MB'.format(object_peak/1e6, columnar_peak/1e6))
+    print('loop conversions: {:.2f} ms, vectorized: {:.2f} ms'.format(
+        1000*best_time(loop_conversions, case), 1000*best_time(vectorized_conversions, columnar_case)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
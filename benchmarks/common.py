@@ -0,0 +1,102 @@
+'''shared helpers for the grg_psse2grg benchmarks'''
+
+import copy
+import os
+import time
+import tracemalloc
+
+from grg_psse2grg.struct import Case
+
+data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'tests', 'data', 'correct')
+
+wecc240_file = os.path.join(data_dir, 'WECC240_M21_psse33_v02.raw')
+
+
+def scale_case(case, copies):
+    '''builds a larger case by placing disconnected copies of the given case
+    side by side, bus numbers are remapped so that each copy is unique
+
+    Args:
+        case(Case): the case to replicate
+        copies(int): the number of copies to include
+    Returns:
+        Case: a case with copies times the components of the given case
+    '''
+
+    bus_count = len(case.buses)
+    bus_rank = {bus.i: rank+1 for rank, bus in enumerate(sorted(case.buses, key=lambda x: x.i))}
+
+    def remap(offset, obj, *attributes):
+        for attribute in attributes:
+            value = getattr(obj, attribute)
+            if value != 0:
+                sign = 1 if value > 0 else -1
+                setattr(obj, attribute, sign*(offset + bus_rank[abs(value)]))
+
+    buses, loads, fixed_shunts, generators, branches, transformers, switched_shunts = [], [], [], [], [], [], []
+    for c in range(0, copies):
+        offset = c*bus_count
+
+        for bus in case.buses:
+            bus = copy.copy(bus)
+            remap(offset, bus, 'i')
+            buses.append(bus)
+
+        for load in case.loads:
+            load = copy.copy(load)
+            load.index = len(loads)
+            remap(offset, load, 'i')
+            loads.append(load)
+
+        for fixed_shunt in case.fixed_shunts:
+            fixed_shunt = copy.copy(fixed_shunt)
+            fixed_shunt.index = len(fixed_shunts)
+            remap(offset, fixed_shunt, 'i')
+            fixed_shunts.append(fixed_shunt)
+
+        for gen in case.generators:
+            gen = copy.copy(gen)
+            gen.index = len(generators)
+            remap(offset, gen, 'i', 'ireg')
+            generators.append(gen)
+
+        for branch in case.branches:
+            branch = copy.copy(branch)
+            branch.index = len(branches)
+            remap(offset, branch, 'i', 'j')
+            branches.append(branch)
+
+        for transformer in case.transformers:
+            transformer = copy.deepcopy(transformer)
+            transformer.index = len(transformers)
+            remap(offset, transformer.p1, 'i', 'j', 'k')
+            remap(offset, transformer.w1, 'cont')
+            transformers.append(transformer)
+
+        for switched_shunt in case.switched_shunts:
+            switched_shunt = copy.copy(switched_shunt)
+            switched_shunt.index = len(switched_shunts)
+            remap(offset, switched_shunt, 'i', 'swrem')
+            switched_shunts.append(switched_shunt)
+
+    return Case(case.ic, case.sbase, case.rev, case.xfrrat, case.nxfrat,
+        case.basfrq, case.record1, case.record2, buses, loads, fixed_shunts,
+        generators, branches, transformers, case.areas, [], [], [], [], [],
+        case.zones, [], case.owners, [], switched_shunts, [], [])
+
+
+def measure(function, *args, **kwargs):
+    '''calls the given function and measures its wall time and peak memory
+
+    Returns:
+        tuple: the function result, the wall time in seconds and the peak
+            traced memory in bytes
+    '''
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
@@ -0,0 +1,37 @@
+'''compares the memory of the records of a scaled WECC240 case built with the
+regular component classes and with the compact, __slots__ based, classes
+
+usage: python -m benchmarks.compact_records [copies]
+'''
+
+import sys
+
+from grg_psse2grg.io import parse_psse_case_file
+from grg_psse2grg.io import parse_psse_case_lines
+
+from benchmarks.common import measure
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+record_sections = ['buses', 'loads', 'fixed_shunts', 'generators', 'branches', 'transformers', 'switched_shunts']
+
+
+def main(copies):
+    lines = scale_case(parse_psse_case_file(wecc240_file), copies).to_psse().split('\n')
+
+    print('{:>16} {:>8} {:>14} {:>14} {:>8}'.format('section', 'records', 'regular B/rec', 'compact B/rec', 'saved'))
+    for name in record_sections:
+        case, seconds, regular_peak = measure(parse_psse_case_lines, lines, sections=[name])
+        del case
+        case, seconds, compact_peak = measure(parse_psse_case_lines, lines, sections=[name], compact=True)
+        count = len(getattr(case, name))
+        del case
+        if count == 0:
+            continue
+        print('{:>16} {:>8} {:>14.0f} {:>14.0f} {:>7.1f}%'.format(name, count,
+            regular_peak/count, compact_peak/count, 100.0*(1.0 - compact_peak/regular_peak)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
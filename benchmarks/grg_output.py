@@ -0,0 +1,69 @@
+'''compares writing the grg data of WECC240 and of a scaled WECC240 case with
+json.dumps and with the streaming write_grg_json, for peak memory, and
+the time and size of the pretty, compact, orjson and rounded outputs
+
+usage: python -m benchmarks.grg_output [copies]
+'''
+
+import io
+import json
+import os
+import sys
+import time
+
+from grg_psse2grg.io import parse_psse_case_file
+from grg_psse2grg.io import write_grg_json
+
+from benchmarks.common import measure
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+def write_dumps(grg_data, output):
+    output.write(json.dumps(grg_data, sort_keys=True, indent=2, separators=(',', ': ')))
+    output.write('\n')
+
+
+output_modes = [
+    ('pretty json', {}),
+    ('compact json', {'compact': True}),
+    ('pretty orjson', {'json_backend': 'orjson'}),
+    ('compact orjson', {'compact': True, 'json_backend': 'orjson'}),
+    ('compact orjson 6dp', {'compact': True, 'json_backend': 'orjson', 'float_precision': 6}),
+]
+
+
+def time_output(grg_data, repeats, **kwargs):
+    best = float('inf')
+    for i in range(0, repeats):
+        output = io.StringIO()
+        start = time.perf_counter()
+        write_grg_json(grg_data, output, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return len(output.getvalue().encode('utf-8')), best
+
+
+def main(copies, repeats=3):
+    base_case = parse_psse_case_file(wecc240_file)
+    for name, case in [('WECC240', base_case), ('WECC240 x{}'.format(copies), scale_case(base_case, copies))]:
+        grg_data = case.to_grg('benchmark', skip_validation=True)
+        print(name)
+
+        print('  {:>20} {:>10}'.format('writer', 'peak MB'))
+        with open(os.devnull, 'w') as output:
+            for writer_name, writer in [('json.dumps', write_dumps), ('write_grg_json', write_grg_json)]:
+                result, seconds, peak = measure(writer, grg_data, output)
+                print('  {:>20} {:>10.1f}'.format(writer_name, peak/1e6))
+
+        print('  {:>20} {:>10} {:>10} {:>8} {:>8}'.format('output', 'MB', 'ms', 'size %', 'time %'))
+        base_bytes, base_seconds = None, None
+        for mode_name, kwargs in output_modes:
+            output_bytes, seconds = time_output(grg_data, repeats, **kwargs)
+            if base_bytes is None:
+                base_bytes, base_seconds = output_bytes, seconds
+            print('  {:>20} {:>10.2f} {:>10.1f} {:>8.1f} {:>8.1f}'.format(mode_name, output_bytes/1e6,
+                1000*seconds, 100.0*output_bytes/base_bytes, 100.0*seconds/base_seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
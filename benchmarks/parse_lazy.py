@@ -0,0 +1,49 @@
+'''times a topology-only job, reading the buses and branches of a scaled
+WECC240 case, with eager parsing, with a lazy case and with only those
+sections selected
+
+usage: python -m benchmarks.parse_lazy [copies] [repeats]
+'''
+
+import os
+import sys
+import tempfile
+import time
+
+from grg_psse2grg.io import parse_psse_case_file
+
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+def topology(case):
+    return len(case.buses), len(case.branches)
+
+
+def time_job(repeats, psse_file_name, **kwargs):
+    best = float('inf')
+    for i in range(0, repeats):
+        start = time.perf_counter()
+        topology(parse_psse_case_file(psse_file_name, **kwargs))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(copies, repeats):
+    with tempfile.NamedTemporaryFile('w', suffix='.raw', delete=False) as psse_file:
+        psse_file.write(scale_case(parse_psse_case_file(wecc240_file), copies).to_psse())
+    try:
+        eager = time_job(repeats, psse_file.name)
+        lazy = time_job(repeats, psse_file.name, lazy=True)
+        lazy_mmap = time_job(repeats, psse_file.name, lazy=True, input_mode='mmap')
+        selected = time_job(repeats, psse_file.name, sections=['buses', 'branches'])
+    finally:
+        os.remove(psse_file.name)
+
+    print('{:>10} {:>10} {:>14} {:>12}'.format('eager ms', 'lazy ms', 'lazy mmap ms', 'selected ms'))
+    print('{:>10.1f} {:>10.1f} {:>14.1f} {:>12.1f}'.format(1000*eager, 1000*lazy, 1000*lazy_mmap, 1000*selected))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
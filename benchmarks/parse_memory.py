@@ -0,0 +1,51 @@
+'''compares the peak memory and time of parsing a pss/e file from a list of
+lines, as given by readlines(), with parsing directly from the open file
+and with parsing from a memory mapped file
+
+usage: python -m benchmarks.parse_memory [copies ...]
+'''
+
+import os
+import sys
+import tempfile
+
+from grg_psse2grg.io import parse_psse_case_file
+from grg_psse2grg.io import parse_psse_case_lines
+
+from benchmarks.common import measure
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+def parse_readlines(psse_file_name):
+    with open(psse_file_name, 'r') as psse_file:
+        lines = psse_file.readlines()
+    return parse_psse_case_lines(lines)
+
+
+def main(copies_list):
+    base_case = parse_psse_case_file(wecc240_file)
+
+    print('{:>8} {:>10} {:>20} {:>20} {:>20}'.format('copies', 'buses', 'readlines MB / ms', 'streaming MB / ms', 'mmap MB / ms'))
+    for copies in copies_list:
+        with tempfile.NamedTemporaryFile('w', suffix='.raw', delete=False) as psse_file:
+            psse_file.write(scale_case(base_case, copies).to_psse())
+        try:
+            case, readlines_seconds, readlines_peak = measure(parse_readlines, psse_file.name)
+            bus_count = len(case.buses)
+            del case
+            case, stream_seconds, stream_peak = measure(parse_psse_case_file, psse_file.name)
+            del case
+            case, mmap_seconds, mmap_peak = measure(parse_psse_case_file, psse_file.name, input_mode='mmap')
+            del case
+        finally:
+            os.remove(psse_file.name)
+
+        print('{:>8} {:>10} {:>20} {:>20} {:>20}'.format(copies, bus_count,
+            '{:.1f} / {:.0f}'.format(readlines_peak/1e6, 1000*readlines_seconds),
+            '{:.1f} / {:.0f}'.format(stream_peak/1e6, 1000*stream_seconds),
+            '{:.1f} / {:.0f}'.format(mmap_peak/1e6, 1000*mmap_seconds)))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [1, 10, 100])
@@ -0,0 +1,40 @@
+'''times sequential pss/e parsing against the section pre-scan with large
+sections parsed in worker processes, on scaled copies of WECC240
+
+usage: python -m benchmarks.parse_parallel [workers] [repeats]
+'''
+
+import sys
+import time
+
+import grg_psse2grg.io
+
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+def time_call(repeats, function, *args, **kwargs):
+    best = float('inf')
+    for i in range(0, repeats):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(workers, repeats):
+    base_case = grg_psse2grg.io.parse_psse_case_file(wecc240_file)
+
+    print('{:>8} {:>8} {:>10} {:>10} {:>12} {:>8}'.format('copies', 'lines', 'seq ms', 'scan ms', 'parallel ms', 'speedup'))
+    for copies in [10, 50, 100]:
+        lines = scale_case(base_case, copies).to_psse().split('\n')
+        sequential = time_call(repeats, grg_psse2grg.io.parse_psse_case_lines, lines)
+        scan = time_call(repeats, grg_psse2grg.io.scan_psse_sections, lines)
+        parallel = time_call(repeats, grg_psse2grg.io.parse_psse_case_lines, lines, workers=workers)
+        print('{:>8} {:>8} {:>10.1f} {:>10.1f} {:>12.1f} {:>8.2f}'.format(copies, len(lines),
+            1000*sequential, 1000*scan, 1000*parallel, sequential/parallel))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,85 @@
+'''times pss/e parsing over the test corpus and a scaled WECC240 case, and
+reports how many times each physical line was tokenized and how many of
+those tokenizations took the fast path
+
+usage: python -m benchmarks.parse_speed [repeats]
+'''
+
+import os
+import sys
+import time
+
+import grg_psse2grg.io
+
+from benchmarks.common import data_dir
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+def corpus_lines():
+    corpus = {}
+    for wd, directory, files in os.walk(data_dir):
+        for file in sorted(files):
+            if file.endswith('.raw'):
+                with open(os.path.join(wd, file), 'r') as psse_file:
+                    corpus[file] = psse_file.readlines()
+    return corpus
+
+
+def count_tokenizations(lines):
+    '''parses the given lines
+
+    Returns:
+        tuple: the number of fast path and general path tokenizations
+    '''
+
+    parse_line = grg_psse2grg.io.parse_line
+    fast_parse_line = grg_psse2grg.io._fast_parse_line
+    calls = {'fast': 0, 'general': 0}
+    def counting_parse_line(*args, **kwargs):
+        calls['general'] += 1
+        return parse_line(*args, **kwargs)
+    def counting_fast_parse_line(*args, **kwargs):
+        tokens = fast_parse_line(*args, **kwargs)
+        if tokens is not None:
+            calls['fast'] += 1
+        return tokens
+
+    grg_psse2grg.io.parse_line = counting_parse_line
+    grg_psse2grg.io._fast_parse_line = counting_fast_parse_line
+    try:
+        grg_psse2grg.io.parse_psse_case_lines(lines)
+    finally:
+        grg_psse2grg.io.parse_line = parse_line
+        grg_psse2grg.io._fast_parse_line = fast_parse_line
+    return calls['fast'], calls['general']
+
+
+def time_parse(lines, repeats):
+    best = float('inf')
+    for i in range(0, repeats):
+        start = time.perf_counter()
+        grg_psse2grg.io.parse_psse_case_lines(lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeats):
+    corpus = corpus_lines()
+    scaled = scale_case(grg_psse2grg.io.parse_psse_case_file(wecc240_file), 50).to_psse().split('\n')
+    corpus['WECC240 x50'] = scaled
+
+    total_seconds = 0.0
+    print('{:>36} {:>8} {:>12} {:>8} {:>10}'.format('case', 'lines', 'tokens/line', 'fast %', 'best ms'))
+    for name, lines in corpus.items():
+        fast, general = count_tokenizations(lines)
+        seconds = time_parse(lines, repeats)
+        if lines is not scaled:
+            total_seconds += seconds
+        print('{:>36} {:>8} {:>12.2f} {:>8.1f} {:>10.2f}'.format(name, len(lines),
+            (fast + general)/len(lines), 100.0*fast/(fast + general), 1000*seconds))
+    print('test corpus total: {:.2f} ms'.format(1000*total_seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
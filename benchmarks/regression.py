@@ -0,0 +1,174 @@
+'''compares the phase times and peak memory of a benchmark suite run with a
+committed baseline and fails when a phase of a case regressed beyond the
+tolerances, or when a module exceeded its import time budget
+
+usage: python -m benchmarks.regression [-b baseline.json] [-r results.json] [-u]
+
+without -r the cases of the baseline are benchmarked first, see
+benchmarks.suite.  The baseline times are only comparable on the machine
+that recorded them, -u replaces the baseline with the current results.
+'''
+
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.suite import import_budget_violations
+from benchmarks.suite import run_suite
+from benchmarks.suite import standard_cases
+from benchmarks.suite import synthetic_case_name
+
+default_baseline_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'baseline.json')
+
+# changes below these amounts are measurement noise, whatever the tolerance
+min_time_change = 0.005
+min_memory_change = 100000
+
+
+class Regression(object):
+    def __init__(self, case, phase, metric, baseline, current):
+        '''a phase of a case that is slower or uses more memory than in the
+        baseline'''
+        self.case = case
+        self.phase = phase
+        self.metric = metric
+        self.baseline = baseline
+        self.current = current
+
+    def __str__(self):
+        return '{} {} {}: {:.6g} in the calibrated baseline, {:.6g} now ({:+.1f}%)'.format(self.case, self.phase,
+            self.metric, self.baseline, self.current, 100.0*(self.current - self.baseline)/self.baseline)
+
+
+def _phases_by_case(results):
+    return {case['name']: {phase['name']: phase for phase in case['phases']} for case in results['cases']}
+
+
+def compare_results(baseline, results, time_tolerance=0.25, memory_tolerance=0.1):
+    '''compares benchmark results with a baseline, only the cases and
+    phases in both are compared.  The baseline times of a case are scaled
+    by the ratio of the calibration times of the case, see
+    benchmarks.suite.calibrate, which compensates for changes of the speed
+    of the machine between the runs.
+
+    Args:
+        baseline (dict): the baseline results, as given by run_suite
+        results (dict): the current results, as given by run_suite
+        time_tolerance (float): the allowed relative increase of the wall
+            time of a phase
+        memory_tolerance (float): the allowed relative increase of the
+            peak memory of a phase
+    Returns:
+        list: a Regression for each phase and metric beyond its tolerance
+    '''
+
+    limits = [
+        ('wall_time', time_tolerance, min_time_change),
+        ('peak_memory', memory_tolerance, min_memory_change),
+    ]
+
+    calibrations = {case['name']: case.get('calibration') for case in results['cases']}
+    current_cases = _phases_by_case(results)
+    regressions = []
+    for case in baseline['cases']:
+        if case['name'] not in current_cases:
+            continue
+        time_scale = 1.0
+        if case.get('calibration') and calibrations[case['name']]:
+            time_scale = calibrations[case['name']]/case['calibration']
+
+        current_phases = current_cases[case['name']]
+        for phase in case['phases']:
+            if phase['name'] not in current_phases:
+                continue
+            current_phase = current_phases[phase['name']]
+            for metric, tolerance, min_change in limits:
+                baseline_value = phase[metric]
+                current_value = current_phase[metric]
+                if baseline_value is None or current_value is None:
+                    continue
+                if metric == 'wall_time':
+                    baseline_value *= time_scale
+                if current_value - baseline_value > max(tolerance*baseline_value, min_change):
+                    regressions.append(Regression(case['name'], phase['name'], metric, baseline_value, current_value))
+
+    return regressions
+
+
+def baseline_cases(baseline):
+    '''Returns: the standard case names and the synthetic case sizes of the
+    given baseline results'''
+    case_names = []
+    synthetic_sizes = []
+    for case in baseline['cases']:
+        if case['name'] in standard_cases:
+            case_names.append(case['name'])
+        elif case['buses'] is not None and case['name'] == synthetic_case_name(case['buses']):
+            synthetic_sizes.append(case['buses'])
+    return case_names, synthetic_sizes
+
+
+def build_cli_parser():
+    parser = argparse.ArgumentParser(description='compares benchmark results with a baseline')
+    parser.add_argument('-b', '--baseline', help='the baseline results', default=default_baseline_file)
+    parser.add_argument('-r', '--results', help='the current results, as written by benchmarks.suite, by default the baseline cases are benchmarked')
+    parser.add_argument('-tt', '--time-tolerance', help='the allowed relative increase of the wall time of a phase', type=float, default=0.25)
+    parser.add_argument('-mt', '--memory-tolerance', help='the allowed relative increase of the peak memory of a phase', type=float, default=0.1)
+    parser.add_argument('-rp', '--repeats', help='the number of timed runs of each case', type=int, default=3)
+    parser.add_argument('-u', '--update', help='writes the current results to the baseline file instead of comparing them', default=False, action='store_true')
+    return parser
+
+
+def main(args):
+    '''Returns: 0 if no phase regressed, 1 otherwise'''
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as baseline_file:
+            baseline = json.load(baseline_file)
+    elif args.update:
+        baseline = None
+    else:
+        print('the baseline {} does not exist, create it with -u'.format(args.baseline))
+        return 1
+
+    if args.results is not None:
+        with open(args.results, 'r') as results_file:
+            results = json.load(results_file)
+    elif baseline is not None:
+        case_names, synthetic_sizes = baseline_cases(baseline)
+        results = run_suite(case_names, synthetic_sizes, baseline['validation'], repeats=args.repeats)
+    else:
+        results = run_suite(repeats=args.repeats)
+
+    if args.update:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print('updated the baseline {}'.format(args.baseline))
+        return 0
+
+    if results.get('validation') != baseline.get('validation'):
+        print('the results use {} validation and the baseline {} validation'.format(results.get('validation'), baseline.get('validation')))
+        return 1
+
+    violations = import_budget_violations(results)
+    for violation in violations:
+        print(violation)
+
+    regressions = compare_results(baseline, results, args.time_tolerance, args.memory_tolerance)
+    if len(regressions) > 0:
+        print('{} regressions against the baseline of commit {}:'.format(len(regressions), baseline.get('commit')))
+        for regression in regressions:
+            print('  {}'.format(regression))
+        return 1
+
+    if len(violations) > 0:
+        return 1
+
+    print('no regressions against the baseline of commit {}'.format(baseline.get('commit')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(build_cli_parser().parse_args()))
@@ -0,0 +1,64 @@
+'''times the substation clustering of to_grg on synthetic transformer
+topologies, comparing the disjoint-set cluster_buses with the set merging
+it replaced
+
+usage: python -m benchmarks.substation_clustering [transformers ...]
+'''
+
+import random
+import sys
+import time
+
+from grg_psse2grg.struct import cluster_buses
+
+
+def set_cluster_buses(bus_ids, bus_groups):
+    bus_sub = {bus_id: set([bus_id]) for bus_id in bus_ids}
+    for bus_group in bus_groups:
+        bus_id_set = set().union(*[bus_sub[bus_id] for bus_id in bus_group])
+        for bus_id in bus_id_set:
+            bus_sub[bus_id] = bus_id_set
+    sub_buses = {frozenset(buses) for buses in bus_sub.values()}
+    return [sorted(buses) for buses in sorted(sub_buses, key=lambda x: min(x))]
+
+
+def chain(transformers):
+    '''one long chain of two winding transformers'''
+    bus_ids = list(range(1, transformers+2))
+    return bus_ids, [(i, i+1) for i in bus_ids[:-1]]
+
+
+def radial(transformers):
+    '''random feeders of two and three winding transformers'''
+    generator = random.Random(0)
+    bus_ids = list(range(1, 2*transformers+2))
+    bus_groups = []
+    for i in range(0, transformers):
+        new_bus = 2*i+2
+        if generator.random() < 0.8:
+            bus_groups.append((generator.randint(1, new_bus-1), new_bus))
+        else:
+            bus_groups.append((generator.randint(1, new_bus-1), new_bus, new_bus+1))
+    return bus_ids, bus_groups
+
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    print('{:>8} {:>14} {:>10} {:>16}'.format('topology', 'transformers', 'sets ms', 'disjoint-set ms'))
+    for topology in [chain, radial]:
+        for transformers in sizes:
+            bus_ids, bus_groups = topology(transformers)
+            expected, set_seconds = time_call(set_cluster_buses, bus_ids, bus_groups)
+            clusters, disjoint_seconds = time_call(cluster_buses, bus_ids, bus_groups)
+            assert clusters == expected
+            print('{:>8} {:>14} {:>10.1f} {:>16.1f}'.format(topology.__name__, transformers,
+                1000*set_seconds, 1000*disjoint_seconds))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 20000])
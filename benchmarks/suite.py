@@ -0,0 +1,317 @@
+'''times each phase of the conversion of the standard test cases and of
+synthetic cases in both directions: parsing, to_grg, validation, grg json
+serialization, build_psse_case and to_psse, and records the wall time, cpu
+time and peak memory of each phase as json, so that runs can be compared
+across commits.  The import times of the grg_psse2grg modules are measured
+with python -X importtime and checked against import_time_budgets.
+
+usage: python -m benchmarks.suite [-c CASE ...] [-s BUSES ...] [-o results.json]
+
+the parser's progress messages are written to stderr, redirect it to hide
+them, for example with 2>/dev/null
+'''
+
+import argparse
+import datetime
+import importlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import grg_psse2grg
+import grg_psse2grg.io
+import grg_psse2grg.struct
+import grg_psse2grg.validation
+
+from grg_psse2grg.io import build_psse_case
+from grg_psse2grg.io import parse_psse_case_file
+from grg_psse2grg.io import write_grg_json
+from grg_psse2grg.lazy import LazyModule
+from grg_psse2grg.profiling import Profile
+from grg_psse2grg.validation import check_grg_structure
+from grg_psse2grg.validation import grg_schema_validator
+from grg_psse2grg.validation import grg_validation_modes
+from grg_psse2grg.validation import validate_grg_data
+
+from benchmarks.common import data_dir
+from benchmarks.synthetic import write_synthetic_case
+
+# the test cases that are benchmarked by default, by name
+standard_cases = {
+    'case5_000': os.path.join(data_dir, 'case5_000.raw'),
+    'case14': os.path.join(data_dir, 'powermodels', 'case14.raw'),
+    'pglib_opf_case73_ieee_rts': os.path.join(data_dir, 'pglib-opf', 'pglib_opf_case73_ieee_rts.raw'),
+    'WECC240': os.path.join(data_dir, 'WECC240_M21_psse33_v02.raw'),
+}
+
+default_synthetic_sizes = [1000, 10000]
+
+benchmark_phases = ['parse', 'to_grg', 'validation', 'serialize', 'build_psse_case', 'to_psse']
+
+# the largest cumulative import time of each module, in seconds, in a new
+# process.  grg_grgdata and jsonschema take over 0.2 seconds to import, they
+# are only loaded on the first grg validation or translation
+import_time_budgets = {
+    'grg_psse2grg': 0.02,
+    'grg_psse2grg.io': 0.15,
+}
+
+repository_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def synthetic_case_name(bus_count):
+    return 'synthetic_{}'.format(bus_count)
+
+
+def benchmark_case(psse_file_name, validation='structural', trace_memory=True):
+    '''converts a pss/e file to grg data and back, recording each phase
+
+    Args:
+        psse_file_name (str): the pss/e file to convert
+        validation (str): one of grg_validation_modes
+        trace_memory (bool): measures the peak memory of each phase
+    Returns:
+        Profile: the measurements of the phases in benchmark_phases
+    '''
+
+    profile = Profile(trace_memory)
+
+    with profile.phase('parse'):
+        case = parse_psse_case_file(psse_file_name)
+
+    with profile.phase('to_grg'):
+        grg_data = case.to_grg('benchmark', skip_validation=True)
+    del case
+
+    with profile.phase('validation'):
+        if validation == 'structural':
+            valid = check_grg_structure(grg_data)
+        else:
+            valid = validate_grg_data(grg_data)
+    if not valid:
+        raise ValueError('the grg data of {} is not valid'.format(psse_file_name))
+
+    with profile.phase('serialize'):
+        output = io.StringIO()
+        write_grg_json(grg_data, output)
+    del output
+
+    with profile.phase('build_psse_case'):
+        case = build_psse_case(grg_data, 'starting_points', 'breakers_assignment')
+
+    with profile.phase('to_psse'):
+        case.to_psse()
+
+    return profile
+
+
+def calibrate(repeats=5):
+    '''times a fixed pure python workload of tokenizing, dictionary and
+    list operations, which is used to scale times recorded on a machine
+    of a different speed or load
+
+    Returns:
+        float: the fastest time of the workload in seconds
+    '''
+
+    line = '  1001,\'FOURCORN    \', 500.0000,1,  10,  10,   1,1.02984,   7.2840'
+    best = float('inf')
+    for repeat in range(0, repeats):
+        start = time.perf_counter()
+        table = {}
+        for i in range(0, 20000):
+            values = [value.strip() for value in line.split(',')]
+            table[i] = {'id': values[0], 'name': values[1], 'basekv': float(values[2])}
+        sorted(table.values(), key=lambda x: x['basekv'])
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_import_time(module_name, repeats=5):
+    '''imports a module in new python processes, with -X importtime
+
+    Returns:
+        float: the fastest cumulative import time of the module in seconds
+    '''
+
+    best = float('inf')
+    for repeat in range(0, repeats):
+        output = subprocess.check_output([sys.executable, '-X', 'importtime', '-c', 'import '+module_name],
+            cwd=repository_dir, stderr=subprocess.STDOUT, universal_newlines=True)
+        for line in output.splitlines():
+            # import time: self [us] | cumulative | imported package
+            fields = line.split('|')
+            if line.startswith('import time:') and len(fields) == 3 and fields[2].strip() == module_name:
+                best = min(best, int(fields[1])/1e6)
+    return best
+
+
+def measure_imports(budgets=None, repeats=5):
+    '''Args:
+        budgets (dict): the import time budget of each module in seconds,
+            import_time_budgets by default
+    Returns:
+        list: the module name, the import time and the budget of each module
+    '''
+
+    budgets = import_time_budgets if budgets is None else budgets
+    return [{'module': module_name, 'time': measure_import_time(module_name, repeats), 'budget': budgets[module_name]}
+        for module_name in sorted(budgets)]
+
+
+def import_budget_violations(results):
+    '''Returns: a description of each module of the given results that took
+    longer to import than its budget'''
+    return ['importing {} took {:.3f} seconds, the budget is {:.3f} seconds'.format(entry['module'], entry['time'], entry['budget'])
+        for entry in results.get('imports', []) if entry['time'] > entry['budget']]
+
+
+def warm_up():
+    '''imports the modules that grg_psse2grg loads on first use and compiles
+    the grg schema validator, so that the first timed case does not pay for
+    them in its to_grg or validation phase'''
+    for module in [grg_psse2grg.io, grg_psse2grg.struct, grg_psse2grg.validation]:
+        for value in vars(module).values():
+            if isinstance(value, LazyModule):
+                importlib.import_module(value._lazy_module_name)
+    grg_schema_validator()
+
+
+def git_commit():
+    '''Returns: the current git commit of the repository, or None'''
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.realpath(__file__)), stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('utf-8').strip()
+
+
+def run_suite(case_names=None, synthetic_sizes=None, validation='structural', trace_memory=True, repeats=1, work_dir=None):
+    '''benchmarks the given standard and synthetic cases
+
+    Args:
+        case_names (list): names of standard_cases, all of them by default
+        synthetic_sizes (list): the bus counts of the synthetic cases,
+            default_synthetic_sizes by default
+        validation (str): one of grg_validation_modes
+        trace_memory (bool): measures the peak memory of each phase, in an
+            additional run of each case
+        repeats (int): the number of timed runs of each case, the fastest
+            time of each phase is kept
+        work_dir (str): the directory of the synthetic case files, a
+            temporary directory by default
+    Returns:
+        dict: the results, with the environment, the import times and the
+            phases of each case, and the time of the calibration workload
+            before each case
+    '''
+
+    case_names = sorted(standard_cases) if case_names is None else case_names
+    synthetic_sizes = default_synthetic_sizes if synthetic_sizes is None else synthetic_sizes
+
+    results = {
+        'commit': git_commit(),
+        'version': grg_psse2grg.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': datetime.datetime.utcnow().isoformat(),
+        'validation': validation,
+        'repeats': repeats,
+        'imports': measure_imports(),
+        'cases': [],
+    }
+    print_imports(results['imports'])
+    warm_up()
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        case_files = [(name, standard_cases[name], None) for name in case_names]
+        for bus_count in synthetic_sizes:
+            file_name = os.path.join(temp_dir, synthetic_case_name(bus_count)+'.raw')
+            write_synthetic_case(bus_count, file_name)
+            case_files.append((synthetic_case_name(bus_count), file_name, bus_count))
+
+        for name, file_name, bus_count in case_files:
+            calibration = calibrate()
+
+            # tracemalloc slows the conversion down many times, so the
+            # times and the peak memory are measured in separate runs
+            phases = {}
+            for repeat in range(0, repeats):
+                profile = benchmark_case(file_name, validation, False)
+                for stats in profile.phases.values():
+                    if stats.name not in phases:
+                        phases[stats.name] = stats.as_dict()
+                    else:
+                        best = phases[stats.name]
+                        best['wall_time'] = min(best['wall_time'], stats.wall_time)
+                        best['cpu_time'] = min(best['cpu_time'], stats.cpu_time)
+
+            if trace_memory:
+                profile = benchmark_case(file_name, validation, True)
+                for stats in profile.phases.values():
+                    phases[stats.name]['peak_memory'] = stats.peak_memory
+
+            results['cases'].append({
+                'name': name,
+                'buses': bus_count,
+                'file_bytes': os.path.getsize(file_name),
+                'calibration': calibration,
+                'phases': [phases[phase] for phase in benchmark_phases],
+            })
+            print_case(results['cases'][-1])
+
+    return results
+
+
+def print_imports(imports):
+    print('imports')
+    print('  {:>16} {:>10} {:>10}'.format('module', 'time s', 'budget s'))
+    for entry in imports:
+        print('  {:>16} {:>10.3f} {:>10.3f}'.format(entry['module'], entry['time'], entry['budget']))
+    sys.stdout.flush()
+
+
+def print_case(case_result):
+    print(case_result['name'])
+    print('  {:>16} {:>10} {:>10} {:>10}'.format('phase', 'wall s', 'cpu s', 'peak MB'))
+    for phase in case_result['phases']:
+        peak = '-' if phase['peak_memory'] is None else '{:.1f}'.format(phase['peak_memory']/1e6)
+        print('  {:>16} {:>10.3f} {:>10.3f} {:>10}'.format(phase['name'], phase['wall_time'], phase['cpu_time'], peak))
+    sys.stdout.flush()
+
+
+def build_cli_parser():
+    parser = argparse.ArgumentParser(description='benchmarks the conversion of standard and synthetic pss/e cases')
+    parser.add_argument('-c', '--cases', help='the standard cases to benchmark, all by default', nargs='*', choices=sorted(standard_cases), default=None)
+    parser.add_argument('-s', '--synthetic', help='the bus counts of the synthetic cases, such as 1000 100000 500000', nargs='*', type=int, default=None)
+    parser.add_argument('-vm', '--validation', help='the validation to time, full validation takes about 15 ms per bus', choices=grg_validation_modes, default='structural')
+    parser.add_argument('-r', '--repeats', help='runs each case the given number of times and keeps the best times', type=int, default=1)
+    parser.add_argument('-nm', '--no-memory', help='skips the additional run of each case that measures the peak memory', default=False, action='store_true')
+    parser.add_argument('-o', '--output', help='writes the results as json to the given file')
+    return parser
+
+
+def main(args):
+    '''Returns: 0 if all of the modules were imported within their budgets,
+    1 otherwise'''
+
+    results = run_suite(args.cases, args.synthetic, args.validation, not args.no_memory, args.repeats)
+    if args.output is not None:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+            output.write('\n')
+
+    violations = import_budget_violations(results)
+    for violation in violations:
+        print(violation)
+    return 0 if len(violations) == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(build_cli_parser().parse_args()))
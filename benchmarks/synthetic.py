@@ -0,0 +1,151 @@
+'''generates synthetic pss/e v33 cases of any number of buses, with loads,
+fixed shunts, generators, branches, two winding transformers, areas, zones
+and owners, for benchmarking the conversion of cases larger than the test
+data
+
+usage: python -m benchmarks.synthetic bus_count output_file
+'''
+
+import random
+import sys
+
+from grg_psse2grg.struct import Area
+from grg_psse2grg.struct import Branch
+from grg_psse2grg.struct import Bus
+from grg_psse2grg.struct import Case
+from grg_psse2grg.struct import FixedShunt
+from grg_psse2grg.struct import Generator
+from grg_psse2grg.struct import Load
+from grg_psse2grg.struct import Owner
+from grg_psse2grg.struct import TwoWindingTransformer
+from grg_psse2grg.struct import Zone
+
+from grg_pssedata.struct import TransformerParametersFirstLine
+from grg_pssedata.struct import TransformerParametersSecondLineShort
+from grg_pssedata.struct import TransformerWinding
+from grg_pssedata.struct import TransformerWindingShort
+
+# the number of buses per area, zone and owner
+area_size = 1000
+zone_size = 250
+owner_size = 2000
+
+# every tenth bus is a 138 kV bus behind a transformer, the other buses are
+# 345 kV buses connected by branches
+transformer_interval = 10
+generator_interval = 8
+fixed_shunt_interval = 20
+
+# the number of additional branches per bus, to nearby buses
+extra_branch_ratio = 0.3
+
+
+def _group(bus_number, size):
+    return (bus_number - 1)//size + 1
+
+
+def synthetic_case(bus_count, seed=0):
+    '''builds a connected synthetic case, the same bus count and seed give
+    the same case
+
+    Args:
+        bus_count (int): the number of buses, at least 2
+        seed (int): the seed of the random component values
+    Returns:
+        Case: a case with about bus_count/2 loads, bus_count/8 generators,
+            1.2*bus_count branches and bus_count/10 transformers
+    '''
+
+    if bus_count < 2:
+        raise ValueError('a synthetic case needs at least 2 buses, given {}'.format(bus_count))
+
+    rng = random.Random(seed)
+
+    buses, loads, fixed_shunts, generators, branches, transformers = [], [], [], [], [], []
+
+    def is_transformer_bus(bus_number):
+        return bus_number % transformer_interval == 0
+
+    for i in range(1, bus_count+1):
+        if i == 1:
+            ide = 3
+        elif i % generator_interval == 1:
+            ide = 2
+        else:
+            ide = 1
+        basekv = 138.0 if is_transformer_bus(i) else 345.0
+        buses.append(Bus(i, 'BUS {:<8}'.format(i), basekv, ide,
+            _group(i, area_size), _group(i, zone_size), _group(i, owner_size),
+            round(rng.uniform(0.98, 1.04), 5), round(rng.uniform(-30.0, 30.0), 3)))
+
+        if i % 2 == 0:
+            loads.append(Load(len(loads), i, '1 ', 1, _group(i, area_size), _group(i, zone_size),
+                round(rng.uniform(5.0, 150.0), 3), round(rng.uniform(-10.0, 40.0), 3),
+                0.0, 0.0, 0.0, 0.0, _group(i, owner_size), 1, 0))
+
+        if i % fixed_shunt_interval == 5:
+            fixed_shunts.append(FixedShunt(len(fixed_shunts), i, '1 ', 1, 0.0, round(rng.uniform(-50.0, 50.0), 3)))
+
+        if ide > 1:
+            pt = round(rng.uniform(100.0, 1000.0), 1)
+            generators.append(Generator(len(generators), i, '1 ', round(pt*0.6, 3), 0.0,
+                round(pt*0.5, 1), round(-pt*0.5, 1), 1.02, 0, 100.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1,
+                100.0, pt, 0.0, 1, 1.0, 0, 1.0, 0, 1.0, 0, 1.0, 0, 1.0))
+
+    def add_branch(i, j, ckt):
+        branches.append(Branch(len(branches), i, j, '{:<2}'.format(ckt),
+            round(rng.uniform(0.0005, 0.01), 5), round(rng.uniform(0.005, 0.1), 5), round(rng.uniform(0.0, 1.0), 5),
+            round(rng.uniform(300.0, 2000.0), 1), 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1, 1, 0.0, 1, 1.0))
+
+    # a path through the 345 kV buses, and a transformer to each 138 kV bus
+    previous = None
+    for i in range(1, bus_count+1):
+        if is_transformer_bus(i):
+            transformers.append(TwoWindingTransformer(len(transformers),
+                TransformerParametersFirstLine(i-1, i, 0, '1 ', 1, 1, 1, 0.0, 0.0, 2, '            ', 1,
+                    1, 1.0, 0, 1.0, 0, 1.0, 0, 1.0, '            '),
+                TransformerParametersSecondLineShort(0.0005, round(rng.uniform(0.01, 0.05), 5), 100.0),
+                TransformerWinding(1, 1.0, 345.0, 0.0, round(rng.uniform(200.0, 800.0), 1), 0.0, 0.0,
+                    0, 0, 1.1, 0.9, 1.1, 0.9, 33, 0, 0.0, 0.0, 0.0),
+                TransformerWindingShort(2, 1.0, 138.0)))
+        else:
+            if previous is not None:
+                add_branch(previous, i, 1)
+            previous = i
+
+    # additional branches between nearby 345 kV buses
+    high_voltage_buses = [i for i in range(1, bus_count+1) if not is_transformer_bus(i)]
+    for index in range(0, int(extra_branch_ratio*len(high_voltage_buses))):
+        position = rng.randrange(0, len(high_voltage_buses))
+        other = min(len(high_voltage_buses)-1, position + rng.randint(2, 20))
+        if other != position:
+            add_branch(high_voltage_buses[position], high_voltage_buses[other], 2 + index % 8)
+
+    areas = [Area(i, 0, 0.0, 10.0, 'AREA {:<7}'.format(i)) for i in range(1, _group(bus_count, area_size)+1)]
+    zones = [Zone(i, 'ZONE {:<7}'.format(i)) for i in range(1, _group(bus_count, zone_size)+1)]
+    owners = [Owner(i, 'OWNER {:<6}'.format(i)) for i in range(1, _group(bus_count, owner_size)+1)]
+
+    return Case(0, 100.0, 33, 0, 0, 60.0,
+        'SYNTHETIC CASE WITH {} BUSES'.format(bus_count), 'GENERATED BY BENCHMARKS.SYNTHETIC, SEED {}'.format(seed),
+        buses, loads, fixed_shunts, generators, branches, transformers, areas,
+        [], [], [], [], [], zones, [], owners, [], [], [], [])
+
+
+def write_synthetic_case(bus_count, file_name, seed=0):
+    '''writes a synthetic case to the given pss/e file
+
+    Returns:
+        int: the size of the file in bytes
+    '''
+
+    text = synthetic_case(bus_count, seed).to_psse()
+    with open(file_name, 'w') as psse_file:
+        psse_file.write(text)
+    return len(text)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    write_synthetic_case(int(sys.argv[1]), sys.argv[2])
@@ -0,0 +1,59 @@
+'''compares the time of validating the grg data of WECC240 and of a scaled
+WECC240 case with grg_grgdata's validate_grg, with the reused schema
+validator of validate_grg_data, serially and in worker processes, and with
+the structural check alone
+
+usage: python -m benchmarks.validation [copies] [workers]
+'''
+
+import contextlib
+import functools
+import io
+import os
+import sys
+import time
+
+from grg_grgdata.cmd import validate_grg
+
+from grg_psse2grg.io import parse_psse_case_file
+from grg_psse2grg.validation import validate_grg_data
+from grg_psse2grg.validation import check_grg_structure
+
+from benchmarks.common import scale_case
+from benchmarks.common import wecc240_file
+
+
+def validators(workers):
+    return [
+        ('validate_grg', validate_grg),
+        ('validate_grg_data', validate_grg_data),
+        ('{} workers'.format(workers), functools.partial(validate_grg_data, workers=workers)),
+        ('check_grg_structure', check_grg_structure),
+    ]
+
+
+def time_validator(validator, grg_data, repeats):
+    best = float('inf')
+    for i in range(0, repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            valid = validator(grg_data)
+            best = min(best, time.perf_counter() - start)
+        assert valid
+    return best
+
+
+def main(copies, workers, repeats=1):
+    base_case = parse_psse_case_file(wecc240_file)
+    for name, case in [('WECC240', base_case), ('WECC240 x{}'.format(copies), scale_case(base_case, copies))]:
+        grg_data = case.to_grg('benchmark', skip_validation=True)
+        print(name)
+        print('  {:>20} {:>10}'.format('validator', 'ms'))
+        for validator_name, validator in validators(workers):
+            seconds = time_validator(validator, grg_data, repeats)
+            print('  {:>20} {:>10.1f}'.format(validator_name, 1000*seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count())
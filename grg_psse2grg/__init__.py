@@ -1,8 +1,18 @@
 """a package for converting psse data files to grg data files"""
 
-# import standard entry points to the code
-from grg_psse2grg import io
-from grg_pssedata import exception
+import importlib
 
 __version__ = '0.0.3'
 
+# standard entry points to the code, which are imported on first access
+_entry_points = ['io', 'exception']
+
+
+def __getattr__(name):
+    if name in _entry_points:
+        return importlib.import_module('grg_psse2grg.' + name)
+    raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_entry_points))
@@ -0,0 +1,275 @@
+''' asyncio entry points of the conversions, which run the parsing,
+Case.to_grg, build_psse_case and the writing of the results in an executor,
+so that one event loop can overlap many conversions without blocking'''
+
+import asyncio
+import concurrent.futures
+import functools
+
+from grg_psse2grg.context import conversion_context
+from grg_psse2grg.io import build_psse_case as _build_psse_case
+from grg_psse2grg.io import iter_grg_json
+from grg_psse2grg.io import open_output_file
+from grg_psse2grg.io import parse_grg_case_file as _parse_grg_case_file
+from grg_psse2grg.io import parse_psse_case_file as _parse_psse_case_file
+from grg_psse2grg.io import parse_psse_case_lines
+
+
+# the number of lines read from a stream at a time, the next chunk is read
+# by the event loop while the parser works on the current one
+stream_chunk_lines = 1024
+
+# the size in characters of the text sent to a stream at a time
+stream_chunk_size = 1 << 16
+
+
+async def _run(executor, context, function):
+    '''runs a function without arguments in the executor, cancelling the
+    context when the awaiting task is cancelled, so the conversion stops at
+    its next checkpoint instead of running to the end'''
+
+    if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        raise ValueError('the conversions share their cases and contexts with the event loop, process pool executors are not supported')
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, function)
+    try:
+        return await future
+    except asyncio.CancelledError:
+        context.cancel()
+        raise
+
+
+async def parse_psse_case_file(psse_file_name, executor=None, workers=None, input_mode='stream', sections=None, compact=False, cache=None, profile=None, context=None):
+    '''parses a pss/e file in the executor, see
+    grg_psse2grg.io.parse_psse_case_file.  The file is read line by line in
+    the executor.
+
+    Args:
+        psse_file_name(str): path to the a psse data file
+        executor: a concurrent.futures.ThreadPoolExecutor, by default the
+            default executor of the event loop
+        workers(int): the number of worker processes for parsing large
+            sections
+        input_mode(str): one of grg_psse2grg.io.psse_input_modes
+        sections(list): the names of the sections to parse
+        compact(bool): build records with __slots__
+        cache(CaseCache): a grg_psse2grg.cache.CaseCache of parsed cases
+        profile(Profile): records the phases of the parsing
+        context(ConversionContext): receives the progress messages and
+            warnings, and is cancelled when the awaiting task is
+    Returns:
+        Case: a grg_pssedata case
+    '''
+
+    context = conversion_context(context, profile=profile)
+    return await _run(executor, context, functools.partial(_parse_psse_case_file, psse_file_name, workers, input_mode, sections=sections, compact=compact, cache=cache, context=context))
+
+
+async def _read_chunk(lines, encoding):
+    chunk = []
+    while len(chunk) < stream_chunk_lines:
+        try:
+            line = await lines.__anext__()
+        except StopAsyncIteration:
+            break
+        if isinstance(line, bytes):
+            # as in a file opened in text mode
+            line = line.decode(encoding).replace('\r\n', '\n')
+        chunk.append(line)
+    return chunk
+
+
+def _iter_stream_lines(lines, loop, context, encoding):
+    # runs in the executor, the lines are read by the event loop one chunk
+    # ahead of the parser
+    next_chunk = asyncio.run_coroutine_threadsafe(_read_chunk(lines, encoding), loop)
+    while True:
+        chunk = next_chunk.result()
+        if len(chunk) == 0:
+            return
+        context.check_cancelled()
+        next_chunk = asyncio.run_coroutine_threadsafe(_read_chunk(lines, encoding), loop)
+        for line in chunk:
+            yield line
+
+
+async def parse_psse_case_stream(lines, executor=None, sections=None, compact=False, encoding='utf-8', profile=None, context=None):
+    '''parses pss/e data from an asynchronous stream of lines in the
+    executor, see grg_psse2grg.io.parse_psse_case_lines.  The lines are
+    read by the event loop in chunks of stream_chunk_lines while the
+    executor parses the previous chunk, so the data is never held in
+    memory as a whole.
+
+    Args:
+        lines: an asynchronous iterable of lines, as str or bytes, such as
+            an asyncio.StreamReader
+        executor: a concurrent.futures.ThreadPoolExecutor, by default the
+            default executor of the event loop
+        sections(list): the names of the sections to parse
+        compact(bool): build records with __slots__
+        encoding(str): the encoding of lines given as bytes, whose \\r\\n
+            line endings are read as \\n
+        profile(Profile): records the phases of the parsing
+        context(ConversionContext): receives the progress messages and
+            warnings, and is cancelled when the awaiting task is
+    Returns:
+        Case: a grg_pssedata case
+    '''
+
+    context = conversion_context(context, profile=profile)
+    stream_lines = _iter_stream_lines(lines.__aiter__(), asyncio.get_running_loop(), context, encoding)
+    return await _run(executor, context, functools.partial(parse_psse_case_lines, stream_lines, sections=sections, compact=compact, context=context))
+
+
+async def parse_grg_case_file(grg_file_name, executor=None):
+    '''parses a grg json file in the executor, see
+    grg_psse2grg.io.parse_grg_case_file
+
+    Args:
+        grg_file_name(str): path to the a json data file
+        executor: a concurrent.futures.ThreadPoolExecutor, by default the
+            default executor of the event loop
+    Returns:
+        Dict: a dictionary case
+    '''
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _parse_grg_case_file, grg_file_name)
+
+
+async def to_grg(case, network_id, executor=None, omit_subtype=False, skip_validation=False, validation='full', validation_workers=None, diagnostics=None, profile=None, context=None):
+    '''converts a case to grg data in the executor, see Case.to_grg
+
+    Args:
+        case(Case): a grg_psse2grg case
+        network_id(str): the grg network id
+        executor: a concurrent.futures.ThreadPoolExecutor, by default the
+            default executor of the event loop
+        omit_subtype(bool): omit the subtypes of the grg components
+        skip_validation(bool): return the grg data without validating it
+        validation(str): one of grg_psse2grg.validation.grg_validation_modes
+        validation_workers(int): the number of worker processes of the full
+            validation
+        diagnostics(Diagnostics): collects the per record warnings
+        profile(Profile): records the phases of the conversion
+        context(ConversionContext): receives the warnings and validation
+            errors, and is cancelled when the awaiting task is
+    Returns:
+        Dict: the grg data, or None when it is not valid
+    '''
+
+    context = conversion_context(context, diagnostics, profile)
+    return await _run(executor, context, functools.partial(case.to_grg, network_id, omit_subtype, skip_validation, validation, validation_workers, context=context))
+
+
+async def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id, executor=None, diagnostics=None, profile=None, context=None):
+    '''builds a pss/e case from grg data in the executor, see
+    grg_psse2grg.io.build_psse_case
+
+    Args:
+        grg_data(dict): grg data
+        starting_point_map_id(str): the mapping of the starting point values
+        switch_assignment_map_id(str): the mapping of the switch states
+        executor: a concurrent.futures.ThreadPoolExecutor, by default the
+            default executor of the event loop
+        diagnostics(Diagnostics): collects the per record warnings
+        profile(Profile): records the stages of the conversion
+        context(ConversionContext): receives the warnings, and is
+            cancelled when the awaiting task is
+    Returns:
+        Case: a grg_psse2grg case, or None when the network is not given in
+            per unit
+    '''
+
+    context = conversion_context(context, diagnostics, profile)
+    return await _run(executor, context, functools.partial(_build_psse_case, grg_data, starting_point_map_id, switch_assignment_map_id, context=context))
+
+
+def _iter_batched(chunks):
+    batch = []
+    size = 0
+    for chunk in chunks:
+        batch.append(chunk)
+        size += len(chunk)
+        if size >= stream_chunk_size:
+            yield ''.join(batch)
+            batch = []
+            size = 0
+    if len(batch) > 0:
+        yield ''.join(batch)
+
+
+async def _write_stream(output, text, encoding):
+    output.write(text.encode(encoding))
+    await output.drain()
+
+
+def _write_chunks(chunks, output, encoding, loop, context):
+    # runs in the executor, the chunks are written to a file, or are
+    # written to a stream by the event loop, which waits until the stream
+    # accepts more data
+    if isinstance(output, str):
+        with open_output_file(output) as output_file:
+            for chunk in _iter_batched(chunks):
+                context.check_cancelled()
+                output_file.write(chunk)
+        return
+
+    for chunk in _iter_batched(chunks):
+        context.check_cancelled()
+        asyncio.run_coroutine_threadsafe(_write_stream(output, chunk, encoding), loop).result()
+
+
+def _iter_grg_json_lines(grg_data, release, indent, json_backend, float_precision):
+    for chunk in iter_grg_json(grg_data, release, indent, json_backend, float_precision):
+        yield chunk
+    yield '\n'
+
+
+async def write_grg_json(grg_data, output, executor=None, release=False, compact=False, json_backend='json', float_precision=None, encoding='utf-8', context=None):
+    '''writes grg data as json, encoded in the executor, see
+    grg_psse2grg.io.write_grg_json
+
+    Args:
+        grg_data(dict): grg data, such as given by to_grg
+        output: the path of the output file, possibly with a compression
+            extension, or an asyncio.StreamWriter, which receives the json
+            in chunks of stream_chunk_size as the stream accepts them
+        executor: a concurrent.futures.ThreadPoolExecutor, by default the
+            default executor of the event loop
+        release(bool): remove the written values from grg_data
+        compact(bool): write json without line breaks or spaces
+        json_backend(str): one of grg_psse2grg.io.json_backends
+        float_precision(int): round floats to this many decimal places
+        encoding(str): the encoding of the text written to a stream
+        context(ConversionContext): is cancelled when the awaiting task is
+    '''
+
+    context = conversion_context(context)
+    indent = None if compact else 2
+    chunks = _iter_grg_json_lines(grg_data, release, indent, json_backend, float_precision)
+    await _run(executor, context, functools.partial(_write_chunks, chunks, output, encoding, asyncio.get_running_loop(), context))
+
+
+def _iter_psse_lines(case):
+    yield case.to_psse()
+    yield '\n'
+
+
+async def write_psse_case(case, output, executor=None, encoding='utf-8', context=None):
+    '''writes a case as pss/e data, formatted in the executor
+
+    Args:
+        case(Case): a grg_psse2grg case, such as given by build_psse_case
+        output: the path of the output file, possibly with a compression
+            extension, or an asyncio.StreamWriter
+        executor: a concurrent.futures.ThreadPoolExecutor, by default the
+            default executor of the event loop
+        encoding(str): the encoding of the text written to a stream
+        context(ConversionContext): is cancelled when the awaiting task is
+    '''
+
+    context = conversion_context(context)
+    chunks = _iter_psse_lines(case)
+    await _run(executor, context, functools.partial(_write_chunks, chunks, output, encoding, asyncio.get_running_loop(), context))
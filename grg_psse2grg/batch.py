@@ -0,0 +1,337 @@
+''' conversion of many pss/e and grg files in one run, in a pool of worker
+processes, with a summary of the throughput and of the failed files
+
+usage: python -m grg_psse2grg.batch inputs... -o output_dir
+'''
+
+from __future__ import print_function
+
+import concurrent.futures
+import functools
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+
+from grg_psse2grg.cache import CaseCache
+from grg_psse2grg.context import ConversionContext
+from grg_psse2grg.diagnostics import Diagnostics
+from grg_psse2grg.io import build_psse_case
+from grg_psse2grg.io import json_backends
+from grg_psse2grg.io import open_output_file
+from grg_psse2grg.io import parse_grg_case_file
+from grg_psse2grg.io import parse_psse_case_file
+from grg_psse2grg.io import uncompressed_file_name
+from grg_psse2grg.io import write_grg_json
+from grg_psse2grg.validation import grg_validation_modes
+
+print_err = functools.partial(print, file=sys.stderr)
+
+# the output extension of each input extension
+batch_conversions = {'.raw': '.json', '.json': '.raw'}
+
+
+class BatchOptions(object):
+    def __init__(self, validation='full', omit_subtypes=False, compact=False,
+            json_backend='json', float_precision=None,
+            starting_point_mapping='starting_points',
+            switch_assignment_mapping='breakers_assignment', cache_dir=None):
+        '''the conversion options of a batch, as in the grg_psse2grg.io cli'''
+        self.validation = validation
+        self.omit_subtypes = omit_subtypes
+        self.compact = compact
+        self.json_backend = json_backend
+        self.float_precision = float_precision
+        self.starting_point_mapping = starting_point_mapping
+        self.switch_assignment_mapping = switch_assignment_mapping
+        self.cache_dir = cache_dir
+
+
+def find_input_files(inputs):
+    '''expands the given directories and glob patterns into the files to
+    convert, the .raw and .json files in a directory and its subdirectories
+
+    Args:
+        inputs (list): paths of files or directories, or glob patterns
+    Returns:
+        list: (input file, output file relative to the output directory)
+            pairs, files under a given directory keep their relative path
+    '''
+
+    files = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for wd, directories, file_names in os.walk(pattern):
+                directories.sort()
+                for file_name in sorted(file_names):
+                    path = os.path.join(wd, file_name)
+                    if _conversion_extension(path) is not None:
+                        files.append((path, os.path.relpath(path, pattern)))
+        else:
+            for path in sorted(glob.glob(pattern)):
+                if os.path.isfile(path):
+                    files.append((path, os.path.basename(path)))
+
+    output_files = []
+    for path, relative_path in files:
+        extension = _conversion_extension(path)
+        if extension is not None:
+            output_name = uncompressed_file_name(relative_path)
+            output_files.append((path, output_name[:-len(extension)] + batch_conversions[extension]))
+    return output_files
+
+
+def _conversion_extension(file_name):
+    extension = os.path.splitext(uncompressed_file_name(file_name))[1]
+    return extension if extension in batch_conversions else None
+
+
+def _file_size(file_name):
+    # the size of a file that is missing or unreadable is reported as 0
+    try:
+        return os.path.getsize(file_name)
+    except OSError:
+        return 0
+
+
+def convert_file(input_file, output_file, options):
+    '''converts one pss/e file to grg or one grg file to pss/e, the errors
+    and the warnings of the conversion are returned instead of raised
+
+    Args:
+        input_file (str): the .raw or .json file, possibly compressed
+        output_file (str): the file to write
+        options (BatchOptions): the conversion options
+    Returns:
+        dict: the input and output files, the status, ok or failed, the
+            error of a failed conversion, the conversion time in seconds,
+            the sizes of the files in bytes and the conversion warnings
+    '''
+
+    result = {
+        'input': input_file,
+        'output': output_file,
+        'status': 'failed',
+        'error': None,
+        'seconds': 0.0,
+        'input_bytes': _file_size(input_file),
+        'output_bytes': 0,
+        'warnings': [],
+    }
+
+    start = time.perf_counter()
+    context = ConversionContext(Diagnostics(), capture_warnings=True)
+    try:
+        output_directory = os.path.dirname(output_file)
+        if output_directory != '' and not os.path.isdir(output_directory):
+            os.makedirs(output_directory, exist_ok=True)
+
+        if _conversion_extension(input_file) == '.raw':
+            _convert_psse_file(input_file, output_file, options, context)
+        else:
+            _convert_grg_file(input_file, output_file, options, context)
+
+        result['warnings'] = [text for category, text in context.diagnostics.summary()]
+        result['warnings'].extend(message for message, category in context.warnings)
+        result['output_bytes'] = os.path.getsize(output_file)
+        result['status'] = 'ok'
+    except Exception as error:
+        result['error'] = '{}: {}'.format(type(error).__name__, error)
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = time.perf_counter() - start
+
+    return result
+
+
+def _convert_psse_file(input_file, output_file, options, context):
+    name = uncompressed_file_name(input_file)[:-4]
+    cache = CaseCache(options.cache_dir) if options.cache_dir is not None else None
+    case = parse_psse_case_file(input_file, cache=cache, context=context)
+    grg_data = case.to_grg(name, options.omit_subtypes, validation=options.validation, context=context)
+    del case
+    if grg_data is None:
+        raise ValueError('the grg data of {} is not valid'.format(input_file))
+    with open_output_file(output_file) as output:
+        write_grg_json(grg_data, output, True, options.compact, options.json_backend, options.float_precision)
+
+
+def _convert_grg_file(input_file, output_file, options, context):
+    grg_data = parse_grg_case_file(input_file)
+    case = build_psse_case(grg_data, options.starting_point_mapping, options.switch_assignment_mapping, context=context)
+    if case is None:
+        raise ValueError('the grg network of {} is not given in per unit'.format(input_file))
+    with open_output_file(output_file) as output:
+        output.write(case.to_psse())
+        output.write('\n')
+
+
+def _init_worker(quiet):
+    if quiet:
+        # the parser reports its progress on stderr, which would interleave
+        # the messages of all of the workers
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 2)
+        os.close(devnull)
+
+
+def convert_files(files, output_directory, options=None, workers=None, quiet=True):
+    '''converts files in a pool of worker processes, a failure of one file
+    does not affect the others.  A file whose output would overwrite one of
+    the input files, or the output of an earlier file, is not converted and
+    is reported as failed.
+
+    Args:
+        files (list): (input file, output file) pairs, as given by
+            find_input_files, the output files are relative to the
+            output directory
+        output_directory (str): the directory of the converted files
+        options (BatchOptions): the conversion options
+        workers (int): the number of worker processes, by default the
+            number of cpus
+        quiet (bool): discards the progress messages of the workers
+    Returns:
+        dict: the results of the files, see convert_file, and the totals
+            and throughput of the batch
+    '''
+
+    options = BatchOptions() if options is None else options
+
+    results = [None]*len(files)
+    start = time.perf_counter()
+
+    # when the output directory overlaps an input directory, such as one
+    # with both x.raw and x.json, an output may be another input
+    input_paths = set(os.path.realpath(input_file) for input_file, output_name in files)
+    claimed_outputs = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(quiet,)) as executor:
+        futures = {}
+        for index, (input_file, output_name) in enumerate(files):
+            output_file = os.path.join(output_directory, output_name)
+            output_path = os.path.realpath(output_file)
+            if output_path in input_paths:
+                results[index] = _failed_result(input_file, output_file, 'the output file is one of the input files')
+                continue
+            if output_path in claimed_outputs:
+                results[index] = _failed_result(input_file, output_file,
+                    'the output file is also the output of {}'.format(claimed_outputs[output_path]))
+                continue
+            claimed_outputs[output_path] = input_file
+            futures[executor.submit(convert_file, input_file, output_file, options)] = index
+
+        for future in concurrent.futures.as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as error:
+                input_file, output_name = files[index]
+                results[index] = _failed_result(input_file, os.path.join(output_directory, output_name),
+                    'the worker process failed, {}: {}'.format(type(error).__name__, error))
+
+    return summarize(results, time.perf_counter() - start)
+
+
+def _failed_result(input_file, output_file, error):
+    return {
+        'input': input_file,
+        'output': output_file,
+        'status': 'failed',
+        'error': error,
+        'seconds': 0.0,
+        'input_bytes': _file_size(input_file),
+        'output_bytes': 0,
+        'warnings': [],
+    }
+
+
+def summarize(results, seconds):
+    '''Returns: the totals and throughput of the given file results, which
+    took the given wall time in seconds'''
+
+    converted = [result for result in results if result['status'] == 'ok']
+    input_bytes = sum(result['input_bytes'] for result in results)
+    return {
+        'files': len(results),
+        'converted': len(converted),
+        'failed': len(results) - len(converted),
+        'seconds': seconds,
+        'input_bytes': input_bytes,
+        'output_bytes': sum(result['output_bytes'] for result in converted),
+        'files_per_second': len(results)/seconds if seconds > 0 else 0.0,
+        'megabytes_per_second': input_bytes/1e6/seconds if seconds > 0 else 0.0,
+        'results': results,
+    }
+
+
+def print_summary(summary, output=None):
+    '''writes the totals of a summary and the failed files to output,
+    sys.stdout by default'''
+    output = sys.stdout if output is None else output
+    print('converted {} of {} files in {:.2f} seconds, {:.2f} files/s, {:.2f} MB/s'.format(
+        summary['converted'], summary['files'], summary['seconds'],
+        summary['files_per_second'], summary['megabytes_per_second']), file=output)
+    for result in summary['results']:
+        if result['status'] != 'ok':
+            print('failed: {} ({})'.format(result['input'], result['error']), file=output)
+
+
+def main(args):
+    '''converts the files given by command line arguments
+
+    Args:
+        args: an argparse data structure
+    Returns:
+        int: 0 if all of the files were converted, 1 otherwise
+    '''
+
+    files = find_input_files(args.inputs)
+    if len(files) == 0:
+        print_err('no .raw or .json files found in {}'.format(', '.join(args.inputs)))
+        return 1
+
+    options = BatchOptions(args.validation, args.omit_subtypes, args.compact,
+        args.json_backend, args.float_precision, args.starting_point_mapping,
+        args.switch_assignment_mapping, args.cache_dir)
+    summary = convert_files(files, args.output_dir, options, args.workers, not args.verbose)
+
+    print_summary(summary)
+    if args.summary is not None:
+        with open(args.summary, 'w') as summary_file:
+            json.dump(summary, summary_file, indent=2, sort_keys=True)
+            summary_file.write('\n')
+
+    return 0 if summary['failed'] == 0 else 1
+
+
+def build_cli_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='''grg_psse2grg.%(prog)s converts many pss/e files to grg
+            and grg files to pss/e in a pool of worker processes''',
+    )
+    parser.add_argument('inputs', help='files, directories or glob patterns of .raw and .json files, optionally compressed', nargs='+')
+    parser.add_argument('-o', '--output-dir', help='the directory of the converted files', required=True)
+    parser.add_argument('-w', '--workers', help='the number of worker processes, the number of cpus by default', type=int, default=None)
+    parser.add_argument('-s', '--summary', help='writes the results of all files and the throughput as json to the given file', default=None)
+    parser.add_argument('-spm', '--starting-point-mapping', help='a grg starting point mapping to be use as a basis for the psse case', default='starting_points')
+    parser.add_argument('-sam', '--switch-assignment-mapping', help='a grg switch mapping to be use as a basis for the psse case', default='breakers_assignment')
+    parser.add_argument('-os', '--omit-subtypes', help='ommits optional component subtypes when translating from psse to grg', default=False, action='store_true')
+    parser.add_argument('-vm', '--validation', help='full validates grg data against the grg json schema, structural only checks ids, voltage links and pointers', choices=grg_validation_modes, default='full')
+    parser.add_argument('-c', '--compact', help='writes grg json without line breaks or indentation', default=False, action='store_true')
+    parser.add_argument('-jb', '--json-backend', help='the json encoder for grg output, auto uses orjson when it is installed', choices=json_backends, default='json')
+    parser.add_argument('-fp', '--float-precision', help='rounds the floats in grg output to the given number of decimal places', type=int, default=None)
+    parser.add_argument('-cd', '--cache-dir', help='caches parsed pss/e cases in the given directory, shared by the workers', default=None)
+    parser.add_argument('-vb', '--verbose', help='keeps the progress messages of the workers on stderr', default=False, action='store_true')
+
+    version = __import__('grg_psse2grg').__version__
+    parser.add_argument('-v', '--version', action='version', \
+        version='grg_psse2grg.%(prog)s (version '+version+')')
+
+    return parser
+
+
+if __name__ == '__main__':
+    parser = build_cli_parser()
+    sys.exit(main(parser.parse_args()))
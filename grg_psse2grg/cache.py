@@ -0,0 +1,148 @@
+''' an on-disk cache of parsed pss/e cases, keyed by the content of the
+source file, the library versions and the parsing options'''
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import grg_pssedata
+
+from grg_psse2grg.context import conversion_context
+from grg_psse2grg.exception import PSSE2GRGWarning
+
+cache_file_extension = '.case.pickle'
+
+# the layout of the cached files, a change of it invalidates the cache
+cache_format_version = 2
+
+# files are hashed in chunks of this many bytes
+hash_chunk_size = 1 << 20
+
+
+class CaseCache(object):
+    def __init__(self, directory, max_bytes=1 << 30):
+        '''stores parsed cases as pickle files in a directory.  When the
+        files exceed max_bytes the least recently used ones are removed,
+        each hit refreshes the modification time of the cached file.
+
+        Args:
+            directory (str): the cache directory, created if it is missing
+            max_bytes (int): the size limit of the cached files
+        '''
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def key(self, psse_file_name, **options):
+        '''Args:
+            psse_file_name (str): path to the a psse data file
+            options: the parsing options that change the parsed case
+        Returns:
+            str: a sha256 hex digest of the file's content, the versions of
+                grg_psse2grg, grg_pssedata and the cache format and the given
+                options
+        '''
+
+        digest = hashlib.sha256()
+        with open(psse_file_name, 'rb') as psse_file:
+            for chunk in iter(lambda: psse_file.read(hash_chunk_size), b''):
+                digest.update(chunk)
+
+        version = __import__('grg_psse2grg').__version__
+        context = [version, grg_pssedata.__version__, cache_format_version, pickle.HIGHEST_PROTOCOL]
+        context.extend('{}={!r}'.format(name, options[name]) for name in sorted(options))
+        digest.update(repr(context).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + cache_file_extension)
+
+    def load(self, key, context=None):
+        '''Returns: the cached case for the given key, or None on a miss.
+        The progress messages and warnings of the parse that stored the case
+        are passed to the given ConversionContext, as is the warning about
+        an unreadable cached case, which is removed.'''
+
+        context = conversion_context(context)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                case, messages, warnings = pickle.load(cache_file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as error:
+            context.warn('removing unreadable cached case {}: {}'.format(path, error), PSSE2GRGWarning)
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        os.utime(path, None)
+        self.hits += 1
+        context.replay(messages, warnings)
+        return case
+
+    def store(self, key, case, messages=(), warnings=()):
+        '''writes the given case to the cache and evicts the least recently
+        used cases when the cache is over its size limit
+
+        Args:
+            key (str): the key of the case, see key
+            case (Case): the parsed case
+            messages (list): the progress messages of the parse
+            warnings (list): the warnings of the parse, as (message,
+                category) pairs
+        '''
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as cache_file:
+                pickle.dump((case, list(messages), list(warnings)), cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except:
+            self._remove(temp_path)
+            raise
+
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        '''removes the least recently used cases until the cache is within
+        its size limit, the case of the keep key is removed last'''
+
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(cache_file_extension):
+                path = os.path.join(self.directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                kept = keep is not None and file_name == keep + cache_file_extension
+                entries.append((kept, stat.st_mtime, path, stat.st_size))
+
+        total_bytes = sum(entry[3] for entry in entries)
+        for kept, mtime, path, size in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            self.evictions += 1
+            total_bytes -= size
+
+    def clear(self):
+        '''removes all of the cached cases'''
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(cache_file_extension):
+                self._remove(os.path.join(self.directory, file_name))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,171 @@
+''' an optional columnar representation of the large pss/e tables, with one
+typed numpy array per field, for bulk computations over whole cases
+
+numpy is not a requirement of grg_psse2grg, it can be installed with
+pip install grg-psse2grg[columnar]
+'''
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from grg_psse2grg.struct import Case
+from grg_psse2grg.struct import _record_values
+
+
+# the sections of a case with uniform records that are stored as columns
+columnar_sections = ['buses', 'loads', 'fixed_shunts', 'generators', 'branches']
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('the columnar representation requires numpy, install it with pip install grg-psse2grg[columnar]')
+
+
+def _column_dtype(values):
+    '''Returns: the numpy dtype for a list of field values, int and float
+    fields are typed and all other fields are stored as python objects'''
+    types = set(type(value) for value in values)
+    if types == {int}:
+        return numpy.int64
+    if types == {float}:
+        return numpy.float64
+    return object
+
+
+class ColumnarTable(object):
+    def __init__(self, components):
+        '''stores a list of components of one type as one numpy array per
+        field, component objects are only created when they are accessed
+
+        Args:
+            components (list): components of the same type and fields, such
+                as the buses of a case
+        '''
+
+        _require_numpy()
+
+        self.component_type = type(components[0]) if len(components) > 0 else None
+        self.fields = list(_record_values(components[0])) if len(components) > 0 else []
+        self.columns = {}
+        for field in self.fields:
+            values = [getattr(component, field) for component in components]
+            self.columns[field] = numpy.array(values, dtype=_column_dtype(values))
+        self._length = len(components)
+
+    def __len__(self):
+        return self._length
+
+    def column(self, field):
+        '''Returns: the numpy array of the given field'''
+        if len(self) == 0: # the fields of an empty table are unknown
+            return numpy.zeros(0)
+        return self.columns[field]
+
+    def __getitem__(self, row):
+        '''Returns: a component object view of the given row'''
+        if row < 0:
+            row += len(self)
+        if row < 0 or row >= len(self):
+            raise IndexError('row {} is out of range for a table of {} rows'.format(row, len(self)))
+
+        component = self.component_type.__new__(self.component_type)
+        for field in self.fields:
+            value = self.columns[field][row]
+            setattr(component, field, value.item() if isinstance(value, numpy.generic) else value)
+        return component
+
+    def __iter__(self):
+        for row in range(0, len(self)):
+            yield self[row]
+
+    def components(self):
+        '''Returns: a list of component objects for all rows'''
+        return list(self)
+
+
+class ColumnarCase(object):
+    def __init__(self, case):
+        '''a case whose bus, load, fixed shunt, generator and branch tables
+        are stored in columns, the other sections are kept as components
+
+        Args:
+            case (Case): the case to convert
+        '''
+
+        _require_numpy()
+
+        self.ic = case.ic
+        self.sbase = case.sbase
+        self.rev = case.rev
+        self.xfrrat = case.xfrrat
+        self.nxfrat = case.nxfrat
+        self.basfrq = case.basfrq
+        self.record1 = case.record1
+        self.record2 = case.record2
+
+        self.tables = {}
+        self.sections = {}
+        for name in Case.section_names:
+            if name in columnar_sections:
+                self.tables[name] = ColumnarTable(getattr(case, name))
+                setattr(self, name, self.tables[name])
+            else:
+                self.sections[name] = getattr(case, name)
+
+        bus_numbers = self.buses.column('i').astype(numpy.int64)
+        self._bus_order = numpy.argsort(bus_numbers, kind='stable')
+        self._sorted_bus_numbers = bus_numbers[self._bus_order]
+
+    def bus_rows(self, bus_numbers):
+        '''maps bus numbers to rows of the bus table
+
+        Args:
+            bus_numbers: an array of bus numbers, such as loads.column('i')
+        Returns:
+            numpy.ndarray: the bus table row of each bus number
+        '''
+
+        bus_numbers = numpy.asarray(bus_numbers, dtype=numpy.int64)
+        positions = numpy.searchsorted(self._sorted_bus_numbers, bus_numbers)
+        found = positions < len(self._sorted_bus_numbers)
+        found[found] = self._sorted_bus_numbers[positions[found]] == bus_numbers[found]
+        if not numpy.all(found):
+            raise KeyError('unknown bus numbers {}'.format(bus_numbers[~found].tolist()))
+        return self._bus_order[positions]
+
+    def bus_voltage_setpoints(self):
+        '''Returns: the voltage magnitude and angle (in radians) of each bus'''
+        buses = self.tables['buses']
+        return buses.column('vm'), numpy.radians(buses.column('va'))
+
+    def load_demands(self, base_mva=None):
+        '''Returns: the active and reactive demand of each load in per unit'''
+        base_mva = self.sbase if base_mva is None else base_mva
+        loads = self.tables['loads']
+        return loads.column('pl')/base_mva, loads.column('ql')/base_mva
+
+    def generator_outputs(self, base_mva=None):
+        '''Returns: the active and reactive output of each generator in per unit'''
+        base_mva = self.sbase if base_mva is None else base_mva
+        generators = self.tables['generators']
+        return generators.column('pg')/base_mva, generators.column('qg')/base_mva
+
+    def branch_ratings(self, base_mva=None):
+        '''Returns: the rate a, b and c of each branch in per unit'''
+        base_mva = self.sbase if base_mva is None else base_mva
+        branches = self.tables['branches']
+        return tuple(branches.column(rate)/base_mva for rate in ['ratea', 'rateb', 'ratec'])
+
+    def to_case(self):
+        '''Returns: a Case with component objects for all of the tables'''
+        component_lists = []
+        for name in Case.section_names:
+            if name in self.tables:
+                component_lists.append(self.tables[name].components())
+            else:
+                component_lists.append(self.sections[name])
+
+        return Case(self.ic, self.sbase, self.rev, self.xfrrat, self.nxfrat,
+            self.basfrq, self.record1, self.record2, *component_lists)
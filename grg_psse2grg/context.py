@@ -0,0 +1,153 @@
+''' the state of one conversion, which carries its diagnostics, profile and
+output channels through parsing, Case.to_grg and build_psse_case, so that
+conversions in different threads do not share warnings or output'''
+
+import io
+import sys
+import threading
+import warnings
+
+from grg_psse2grg.exception import ConversionCancelledError
+from grg_psse2grg.profiling import null_profile
+
+
+class ConversionContext(object):
+    def __init__(self, diagnostics=None, profile=None, log=None, output=None, capture_warnings=False, verbose=True):
+        '''the diagnostics, profile and output channels of a conversion.
+
+        The default context reports as the command line does, progress
+        messages on stderr, validation errors on stdout and warnings with
+        warnings.warn, whose filters are global to the process.  A context
+        with its own log and output files that captures its warnings shares
+        no state with the conversions of other threads.
+
+        Args:
+            diagnostics (Diagnostics): collects the per record warnings,
+                see grg_psse2grg.diagnostics
+            profile (Profile): records the phases of the conversion, see
+                grg_psse2grg.profiling
+            log: a text file for progress messages and the warnings of
+                build_psse_case, sys.stderr by default
+            output: a text file for the errors of the grg validation,
+                sys.stdout by default
+            capture_warnings (bool): keeps the warnings in the warnings list
+                of the context, instead of issuing them with warnings.warn
+            verbose (bool): writes progress messages, such as the number of
+                parsed records of each section, to the log
+        '''
+
+        self.diagnostics = diagnostics
+        self.profile = null_profile if profile is None else profile
+        self.log_file = log
+        self.output_file = output
+        self.capture_warnings = capture_warnings
+        self.verbose = verbose
+        self.warnings = []
+        self._cancelled = threading.Event()
+
+    def log(self, message):
+        '''writes a line to the log'''
+        log_file = sys.stderr if self.log_file is None else self.log_file
+        log_file.write(message + '\n')
+
+    def progress(self, message):
+        '''writes a line to the log, if the context is verbose'''
+        if self.verbose:
+            self.log(message)
+
+    def report(self, message):
+        '''writes a line to the output'''
+        output_file = sys.stdout if self.output_file is None else self.output_file
+        output_file.write(message + '\n')
+
+    def warn(self, message, category):
+        '''issues a warning, or keeps it when the context captures warnings
+
+        Args:
+            message (str): the warning message
+            category (type): the warning class
+        '''
+
+        self._warn(message, category)
+
+    def record_warning(self, summary, example_id, detail, category=None):
+        '''reports a warning about one record, which is collected in the
+        diagnostics of the context when it has them, or is otherwise issued
+        as a warning, or written to the log when it has no category
+
+        Args:
+            summary (str): the kind of warning, as reported once with a count
+                and example ids by the diagnostics
+            example_id: the id of the record
+            detail (str): the message about this record alone
+            category (type): the warning class, or None for a log message
+        '''
+
+        if self.diagnostics is not None:
+            self.diagnostics.add(summary, example_id, category)
+        elif category is None:
+            self.log('warning: ' + detail)
+        else:
+            self._warn(detail, category)
+
+    def _warn(self, message, category):
+        if self.capture_warnings:
+            self.warnings.append((message, category))
+        else:
+            # the caller of warn or record_warning
+            warnings.warn(message, category, stacklevel=3)
+
+    def captured(self):
+        '''Returns: a context for a part of this conversion, whose progress
+        messages, whether verbose or not, and warnings are kept in its log
+        and warnings list, so that they can be passed to this context with
+        replay, such as when they are stored with a cached case.  It shares
+        the diagnostics, the profile and the cancellation of this context.
+        '''
+
+        context = ConversionContext(self.diagnostics, self.profile, log=io.StringIO(), capture_warnings=True)
+        context._cancelled = self._cancelled
+        return context
+
+    def replay(self, messages, warnings):
+        '''passes the messages and warnings kept by a captured context to
+        this context
+
+        Args:
+            messages (list): the progress messages, as lines of the log
+            warnings (list): (message, category) pairs
+        '''
+
+        for message in messages:
+            self.progress(message)
+        for message, category in warnings:
+            self._warn(message, category)
+
+    def cancel(self):
+        '''requests that the conversion stops, which it does at its next
+        checkpoint, such as the start of a pss/e section or of a stage of
+        Case.to_grg and build_psse_case.  This may be called from any
+        thread and a cancelled context stays cancelled.'''
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        '''True when cancel was called'''
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        '''a checkpoint of the conversion, raises ConversionCancelledError
+        when the context was cancelled'''
+        if self._cancelled.is_set():
+            raise ConversionCancelledError('the conversion was cancelled')
+
+
+def conversion_context(context=None, diagnostics=None, profile=None):
+    '''Returns: the given context, or a default context with the given
+    diagnostics and profile when no context is given'''
+
+    if context is None:
+        return ConversionContext(diagnostics, profile)
+    if diagnostics is not None or profile is not None:
+        raise ValueError('the diagnostics and the profile of a conversion with a context are given by the context')
+    return context
@@ -0,0 +1,92 @@
+''' collection of the warnings of a conversion, which are counted per message
+and reported once, instead of once per record'''
+
+from __future__ import print_function
+
+import collections
+import functools
+import sys
+import warnings
+
+print_err = functools.partial(print, file=sys.stderr)
+
+
+class Diagnostics(object):
+    def __init__(self, sample_size=5):
+        '''counts the occurrences of each diagnostic message of a conversion
+        and keeps the first few examples, such as the ids of the affected
+        components, until the messages are emitted
+
+        Args:
+            sample_size (int): the number of examples kept per message
+        '''
+
+        self.sample_size = sample_size
+        self.clear()
+
+    def add(self, message, example=None, category=None):
+        '''records an occurrence of a diagnostic message
+
+        Args:
+            message (str): a message that does not depend on the record,
+                such as 'bus area ids are not in the areas table'
+            example: an identifier of the record, formatted on emit
+            category (type): the warning class of the message, or None for
+                messages that are printed to stderr
+        '''
+
+        key = (category, message)
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        if count == 0:
+            self.examples[key] = []
+        if example is not None and len(self.examples[key]) < self.sample_size:
+            self.examples[key].append(example)
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def count(self, message, category=None):
+        '''Returns: the number of occurrences of the given message'''
+        return self.counts.get((category, message), 0)
+
+    def summary(self):
+        '''Returns: a list of (category, text) pairs, one per message in the
+        order that they first occurred, with the number of occurrences and
+        the examples of each message'''
+
+        summary = []
+        for key, count in self.counts.items():
+            category, message = key
+            text = '{} ({} {})'.format(message, count, 'time' if count == 1 else 'times')
+            if len(self.examples[key]) > 0:
+                more = ', ...' if count > len(self.examples[key]) else ''
+                text += ', e.g. {}{}'.format(', '.join(str(example) for example in self.examples[key]), more)
+            summary.append((category, text))
+        return summary
+
+    def emit(self, context=None):
+        '''issues one warning, or one line on stderr, per message and clears
+        the collected messages
+
+        Args:
+            context (ConversionContext): receives the warnings and lines
+                instead, see grg_psse2grg.context
+        '''
+
+        for category, text in self.summary():
+            if category is None:
+                if context is None:
+                    print_err('warning: {}'.format(text))
+                else:
+                    context.log('warning: {}'.format(text))
+            elif context is None:
+                warnings.warn(text, category)
+            else:
+                context.warn(text, category)
+        self.clear()
+
+    def clear(self):
+        '''removes all of the collected messages'''
+        self.counts = collections.OrderedDict()
+        self.examples = {}
@@ -1,5 +1,17 @@
 '''a collection of all grg_psse2grg exception classes'''
 
+# grg_psse2grg.exception was grg_pssedata.exception in earlier versions, its
+# classes remain available here
+from grg_pssedata.exception import PSSEDataException
+from grg_pssedata.exception import PSSEDataParsingError
+from grg_pssedata.exception import PSSEDataValidationError
+from grg_pssedata.exception import PSSEDataWarning
+
+
 class PSSE2GRGWarning(Warning):
     '''root class for all PSSE2GRG Warnings'''
     pass
+
+class ConversionCancelledError(Exception):
+    '''raised at a checkpoint of a conversion whose context was cancelled'''
+    pass
@@ -1,15 +1,27 @@
 from __future__ import print_function
 
-import argparse
+import array
+import bz2
+import locale
+import mmap
+import os
 import shlex
 import math
 import json
 import functools
+import gzip
+import io
+import lzma
 import sys
 
-import warnings
-
 from grg_psse2grg.exception import PSSE2GRGWarning
+from grg_psse2grg.cache import CaseCache
+from grg_psse2grg.context import ConversionContext
+from grg_psse2grg.context import conversion_context
+from grg_psse2grg.diagnostics import Diagnostics
+from grg_psse2grg.profiling import Profile
+from grg_psse2grg.validation import grg_validation_modes
+from grg_psse2grg.lazy import LazyModule
 
 from grg_pssedata.exception import PSSEDataParsingError
 from grg_pssedata.exception import PSSEDataWarning
@@ -25,13 +37,6 @@ from grg_pssedata.io import LineRequirements
 
 from grg_pssedata.cmd import diff
 
-from grg_grgdata.cmd import flatten_network
-from grg_grgdata.cmd import components_by_type
-from grg_grgdata.cmd import collapse_voltage_points
-from grg_grgdata.cmd import active_voltage_points
-from grg_grgdata.cmd import isolated_voltage_points
-from grg_grgdata.cmd import voltage_level_by_voltage_point
-
 from grg_pssedata.struct import TransformerParametersFirstLine
 from grg_pssedata.struct import TransformerParametersSecondLine
 from grg_pssedata.struct import TransformerParametersSecondLineShort
@@ -51,202 +56,673 @@ from grg_psse2grg.struct import Zone
 from grg_psse2grg.struct import Owner
 from grg_psse2grg.struct import SwitchedShunt
 from grg_psse2grg.struct import Case
+from grg_psse2grg.struct import LazyCase
+from grg_psse2grg.struct import record_classes
+from grg_psse2grg.struct import compact_record_classes
 
 from grg_psse2grg.struct import grg_description_preamble
 
+# grg_grgdata, which loads jsonschema, is only needed for grg data, so it is
+# imported on the first use
+grg_cmd = LazyModule('grg_grgdata.cmd')
+grg_common = LazyModule('grg_grgdata.common')
 
-
-from grg_grgdata.cmd import flatten_network
-import grg_grgdata.common as grg_common
+# concurrent.futures loads logging, it is only needed with workers
+concurrent_futures = LazyModule('concurrent.futures')
 
 print_err = functools.partial(print, file=sys.stderr)
 
+# the supported compression formats, as (extension, magic bytes, open function)
+compression_formats = [
+    ('.gz', b'\x1f\x8b', gzip.open),
+    ('.bz2', b'BZh', bz2.open),
+    ('.xz', b'\xfd7zXZ\x00', lzma.open),
+]
+
+
+def _compression_format(file_name):
+    '''Returns: the compression format of the given file, detected by its
+    extension or its first bytes, or None for uncompressed files'''
+
+    for compression_format in compression_formats:
+        if file_name.endswith(compression_format[0]):
+            return compression_format
+
+    with open(file_name, 'rb') as data_file:
+        head = data_file.read(6)
+    for compression_format in compression_formats:
+        if head.startswith(compression_format[1]):
+            return compression_format
+
+    return None
+
+
+def uncompressed_file_name(file_name):
+    '''Returns: the given file name without a compression extension'''
+    for extension, magic, open_function in compression_formats:
+        if file_name.endswith(extension):
+            return file_name[:-len(extension)]
+    return file_name
+
+
+def open_data_file(file_name):
+    '''opens the given path for reading text, compressed files are
+    decompressed as they are read
+
+    Args:
+        file_name(str): path to the a data file, possibly compressed with
+            gzip, bz2 or xz
+    Returns:
+        file: a text file object
+    '''
+
+    compression_format = _compression_format(file_name)
+    if compression_format is None:
+        return open(file_name, 'r')
+    return compression_format[2](file_name, 'rt')
+
+
+def open_output_file(file_name):
+    '''opens the given path for writing text, the file is compressed when
+    its name ends with a compression extension, see compression_formats
+
+    Args:
+        file_name(str): path to the output file
+    Returns:
+        file: a text file object
+    '''
+
+    for extension, magic, open_function in compression_formats:
+        if file_name.endswith(extension):
+            return open_function(file_name, 'wt')
+    return open(file_name, 'w')
+
+
+# the number of nesting levels of grg data that iter_grg_json writes key by
+# key, deeper values are encoded whole, this reaches the individual
+# components of the network
+grg_json_stream_depth = 3
+
+
+json_backends = ['json', 'orjson', 'auto']
+
+
+def _round_floats(value, float_precision):
+    '''Returns: a copy of the given json data with finite floats rounded to
+    the given number of decimal places'''
+    if isinstance(value, float):
+        return round(value, float_precision) if math.isfinite(value) else value
+    if isinstance(value, dict):
+        return {key: _round_floats(item, float_precision) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(item, float_precision) for item in value]
+    return value
+
+
+def _is_finite(value):
+    '''Returns: True when the given json data has no nan or infinite floats'''
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, dict):
+        return all(_is_finite(item) for item in value.values())
+    if isinstance(value, list):
+        return all(_is_finite(item) for item in value)
+    return True
+
+
+def _json_encoder(indent, json_backend, float_precision):
+    '''builds the function that encodes the values below the streamed levels
+    of iter_grg_json
+
+    Returns:
+        function: a function of a json value returning its sorted key
+            encoding as a string
+    '''
+
+    if json_backend not in json_backends:
+        raise ValueError('json backend {} given, must be one of {}'.format(json_backend, json_backends))
+
+    separators = (',', ': ') if indent is not None else (',', ':')
+    def encode(value):
+        return json.dumps(value, sort_keys=True, indent=indent, separators=separators)
+
+    if json_backend != 'json':
+        try:
+            import orjson
+        except ImportError:
+            if json_backend == 'orjson':
+                raise
+            orjson = None
+
+        if orjson is not None:
+            if indent not in [None, 2]:
+                raise ValueError('the orjson backend only supports an indent of 2, given {}'.format(indent))
+
+            option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            if indent is not None:
+                option |= orjson.OPT_INDENT_2
+
+            json_encode = encode
+            def encode(value):
+                # orjson writes nan and infinite floats as null
+                if not _is_finite(value):
+                    return json_encode(value)
+                return orjson.dumps(value, option=option).decode('utf-8')
+
+    if float_precision is not None:
+        unrounded_encode = encode
+        def encode(value):
+            return unrounded_encode(_round_floats(value, float_precision))
+
+    return encode
+
+
+def iter_grg_json(grg_data, release=False, indent=2, json_backend='json', float_precision=None):
+    '''encodes grg data as json text in chunks, by default the chunks join
+    to the same text as json.dumps(grg_data, sort_keys=True, indent=2,
+    separators=(',', ': ')), but the complete text is never built
+
+    The orjson backend is faster and gives equivalent json, but its text
+    differs from the json module's in the format of some floats and in
+    writing non-ascii characters unescaped.  The auto backend uses orjson
+    when it is installed and the json module otherwise.
+
+    Args:
+        grg_data(dict): grg data, such as given by Case.to_grg
+        release(bool): remove each top level value from grg_data once it
+            is encoded, so that its memory can be reclaimed.  Nested values
+            are left as they are, since they may be shared, such as units
+        indent(int): the number of spaces per nesting level, None gives
+            compact json without line breaks or spaces
+        json_backend(str): one of json_backends
+        float_precision(int): round floats to this many decimal places
+    Returns:
+        generator: json text chunks
+    '''
+
+    encode = _json_encoder(indent, json_backend, float_precision)
+    return _iter_json(grg_data, 0, release, indent, encode)
+
+
+def _iter_json(value, level, release, indent, encode):
+    if isinstance(value, dict) and len(value) > 0 and level < grg_json_stream_depth \
+        and all(isinstance(key, str) for key in value):
+        if indent is not None:
+            padding = '\n' + ' '*(indent*(level+1))
+            key_separator = ': '
+            closing = '\n' + ' '*(indent*level) + '}'
+        else:
+            padding = ''
+            key_separator = ':'
+            closing = '}'
+
+        separator = '{'
+        for key in sorted(value):
+            yield separator + padding + json.dumps(key) + key_separator
+            for chunk in _iter_json(value[key], level+1, release, indent, encode):
+                yield chunk
+            if release and level == 0:
+                del value[key]
+            separator = ','
+        yield closing
+    else:
+        text = encode(value)
+        if indent is not None:
+            text = text.replace('\n', '\n' + ' '*(indent*level))
+        yield text
+
+
+def write_grg_json(grg_data, output, release=False, compact=False, json_backend='json', float_precision=None):
+    '''writes grg data as json to a text file object, see iter_grg_json
+
+    Args:
+        grg_data(dict): grg data, such as given by Case.to_grg
+        output(file): a text file object, such as sys.stdout
+        release(bool): remove the written values from grg_data
+        compact(bool): write json without line breaks or spaces
+        json_backend(str): one of json_backends
+        float_precision(int): round floats to this many decimal places
+    '''
+
+    indent = None if compact else 2
+    for chunk in iter_grg_json(grg_data, release, indent, json_backend, float_precision):
+        output.write(chunk)
+    output.write('\n')
+
+
 def parse_grg_case_file(grg_file_name):
     '''opens the given path and parses it as json data
 
     Args:
-        grg_file_name(str): path to the a json data file
+        grg_file_name(str): path to the a json data file, possibly
+            compressed, see open_data_file
     Returns:
         Dict: a dictionary case
     '''
 
     # TODO validate format via grg_grgdata library!
-    with open(grg_file_name, 'r') as grg_data:
+    with open_data_file(grg_file_name) as grg_data:
         data = json.load(grg_data)
         grg_data.close()
 
     return data
 
-def parse_psse_case_file(psse_file_name):
+psse_input_modes = ['stream', 'mmap']
+
+
+def parse_psse_case_file(psse_file_name, workers=None, input_mode='stream', lazy=False, sections=None, compact=False, cache=None, profile=None, context=None):
     '''opens the given path and parses it as pss/e data
 
+    In the stream mode the file is consumed line by line, so the complete
+    text of the file is never held in memory, unless workers is given.  In
+    the mmap mode the file is memory mapped and each line is decoded from
+    the mapped bytes only when the parser reaches it, which also gives the
+    workers random access to the lines without reading them into a list.
+    Compressed files are decompressed as they are read, see open_data_file,
+    and can not be memory mapped, so the stream mode is used for them.
+
+    When a cache is given, the case is loaded from it if the file was
+    parsed with the same sections and compact options before, and the
+    parser's progress messages and warnings are reported as when the file
+    was parsed.
+
     Args:
         psse_file_name(str): path to the a psse data file
+        workers(int): the number of worker processes for parsing large
+            sections, see parse_psse_case_lines
+        input_mode(str): one of psse_input_modes
+        lazy(bool): returns a LazyCase, see parse_psse_case_lines.  In
+            the mmap mode the file stays mapped until the case is deleted
+        sections(list): the names of the sections to parse, see
+            parse_psse_case_lines
+        compact(bool): build records with __slots__, see
+            parse_psse_case_lines
+        cache(CaseCache): a grg_psse2grg.cache.CaseCache of parsed cases
+        profile(Profile): records the time and memory of reading the file
+            and of parsing each section, see parse_psse_case_lines and
+            grg_psse2grg.profiling
+        context(ConversionContext): receives the progress messages and
+            warnings, see parse_psse_case_lines
     Returns:
         Case: a grg_pssedata case
     '''
 
-    with open(psse_file_name, 'r') as psse_file:
-        lines = psse_file.readlines()
-    return parse_psse_case_lines(lines)
+    context = conversion_context(context, profile=profile)
+    with context.profile.phase('parse'):
+        return _parse_psse_case_file(psse_file_name, workers, input_mode, lazy, sections, compact, cache, context)
+
+
+def _parse_psse_case_file(psse_file_name, workers, input_mode, lazy, sections, compact, cache, context):
+    profile = context.profile
+
+    if input_mode not in psse_input_modes:
+        raise ValueError('input mode {} given, must be one of {}'.format(input_mode, psse_input_modes))
+
+    if input_mode == 'mmap' and _compression_format(psse_file_name) is not None:
+        context.warn('compressed file {} can not be memory mapped, using the stream input mode.'.format(psse_file_name), PSSE2GRGWarning)
+        input_mode = 'stream'
+
+    if cache is not None:
+        if lazy:
+            raise ValueError('lazy cases can not be cached')
+        with profile.phase('cache load'):
+            # the order of the sections does not change the parsed case
+            key_sections = None if sections is None else sorted(set(sections))
+            key = cache.key(psse_file_name, sections=key_sections, compact=compact)
+            case = cache.load(key, context)
+        if case is not None:
+            context.progress('loaded cached case {}'.format(key))
+            return case
+
+        # the messages and warnings are stored with the case, so that a hit
+        # reports the same as this parse
+        parse_context = context.captured()
+        case = _parse_psse_case_file(psse_file_name, workers, input_mode, lazy, sections, compact, None, parse_context)
+        messages = parse_context.log_file.getvalue().splitlines()
+        context.replay(messages, parse_context.warnings)
+        with profile.phase('cache store'):
+            cache.store(key, case, messages, parse_context.warnings)
+        return case
+
+    if lazy:
+        with profile.phase('read'):
+            if input_mode == 'mmap':
+                with open(psse_file_name, 'rb') as psse_file:
+                    lines = _MappedPSSELines(psse_file)
+            else:
+                with open_data_file(psse_file_name) as psse_file:
+                    lines = psse_file.readlines()
+        return parse_psse_case_lines(lines, workers, lazy, sections, compact, context=context)
+
+    if input_mode == 'mmap':
+        with open(psse_file_name, 'rb') as psse_file:
+            with profile.phase('read'):
+                lines = _MappedPSSELines(psse_file)
+            with lines:
+                return parse_psse_case_lines(lines, workers, sections=sections, compact=compact, context=context)
+
+    with open_data_file(psse_file_name) as psse_file:
+        if workers is not None:
+            with profile.phase('read'):
+                lines = psse_file.readlines()
+            return parse_psse_case_lines(lines, workers, sections=sections, compact=compact, context=context)
+        return parse_psse_case_lines(psse_file, sections=sections, compact=compact, context=context)
+
+
+class _MappedPSSELines(object):
+    def __init__(self, psse_file):
+        '''a read only sequence of the lines of a memory mapped pss/e file,
+        lines are decoded from the mapped bytes when they are accessed and
+        end with a single newline as in a file opened in text mode.  The byte
+        offsets of the lines are indexed on the first random access.
+
+        Args:
+            psse_file: a file opened in binary mode
+        '''
+
+        self._encoding = locale.getpreferredencoding(False)
+        self._offsets = None
+        if os.fstat(psse_file.fileno()).st_size > 0:
+            self._data = mmap.mmap(psse_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else: # empty files can not be mapped
+            self._data = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def _decode(self, start, end):
+        line = self._data[start:end].decode(self._encoding)
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        return line
+
+    def _line_ends(self):
+        start = 0
+        size = len(self._data)
+        while start < size:
+            end = self._data.find(b'\n', start)
+            end = size if end < 0 else end + 1
+            yield start, end
+            start = end
+
+    def _index(self):
+        if self._offsets is None:
+            self._offsets = array.array('q', [0])
+            for start, end in self._line_ends():
+                self._offsets.append(end)
+        return self._offsets
+
+    def __iter__(self):
+        for start, end in self._line_ends():
+            yield self._decode(start, end)
+
+    def __len__(self):
+        return len(self._index()) - 1
+
+    def __getitem__(self, key):
+        offsets = self._index()
+        if isinstance(key, slice):
+            return [self._decode(offsets[i], offsets[i+1]) for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError('line index out of range')
+        return self._decode(offsets[key], offsets[key+1])
+
+
+def _fast_parse_line(line):
+    '''splits a pss/e data line that has no comment, no double quotes and
+    no commas inside of single quoted values.  On such lines splitting on
+    every comma gives the same values as grg_pssedata's parse_line, at a
+    fraction of the cost of its regular expressions.
 
+    Args:
+        line(str): a pss/e data line
+    Returns:
+        tuple: the line parts and comment, as given by parse_line, or None
+            if the line requires the general parse_line
+    '''
 
-def parse_psse_case_lines(lines):
-    if len(lines) < 3: # need at base values and record
-        raise PSSEDataParsingError('psse case has {} lines and at least 3 are required'.format(len(lines)))
+    if '/' in line or '"' in line:
+        return None
 
-    (ic, sbase, rev, xfrrat, nxfrat, basefrq), comment = parse_line(lines[0], LineRequirements(0, 6, 6, "header"))
-    print_err('case data: {} {} {} {} {} {}'.format(ic, sbase, rev, xfrrat, nxfrat, basefrq))
+    if '\'' in line:
+        segments = line.split('\'')
+        if len(segments) % 2 == 0: # unbalanced quotes
+            return None
+        for quoted in segments[1::2]:
+            if ',' in quoted:
+                return None
 
-    if len(ic.strip()) > 0 and not (ic.strip() == "0"): # note validity checks may fail on "change data"
-        raise PSSEDataParsingError('ic value of {} given, only a value of 0 is supported'.format(ic))
+    return line.strip().split(','), None
 
-    version_id = 33
-    if len(rev.strip()) > 0:
-        try:
-            version_id = int(float(rev))
-        except ValueError:
-             warnings.warn('assuming PSSE version 33, given version value "{}".'.format(rev.strip()), PSSEDataWarning)
 
-    if version_id != 33:
-        warnings.warn('PSSE version {} given but only version 33 is supported, parser may not function correctly.'.format(rev.strip()), PSSEDataWarning)
+def _check_line_requirements(line_parts, line_reqs, context):
+    '''applies the value count checks of grg_pssedata's parse_line to an
+    already tokenized line
 
-    record1 = lines[1].strip('\n')
-    record2 = lines[2].strip('\n')
-    print_err('record 1: {}'.format(record1))
-    print_err('record 2: {}'.format(record2))
+    Args:
+        line_parts(list): the values of a pss/e data line
+        line_reqs(LineRequirements): the expected number of values
+        context(ConversionContext): receives the warnings
+    Returns:
+        list: the line values, truncated to the maximum number of values
+    '''
 
+    if len(line_parts) < line_reqs.min_values:
+        raise PSSEDataParsingError('on psse data line {} in the "{}" section, at least {} values were expected but only {} where found.\nparsed: {}'.format(line_reqs.line_index, line_reqs.section, line_reqs.min_values, len(line_parts), line_parts))
+    if len(line_parts) > line_reqs.max_values:
+        context.warn('on psse data line {} in the "{}" section, at most {} values were expected but {} where found, extra values will be ignored.\nparsed: {}'.format(line_reqs.line_index, line_reqs.section, line_reqs.max_values, len(line_parts), line_parts), PSSEDataWarning)
+        line_parts = line_parts[:line_reqs.max_values]
+    return line_parts
+
+
+class _PSSELineCursor(object):
+    def __init__(self, lines, line_index=0, compact=False, context=None):
+        '''walks over pss/e data lines with one line of look-ahead, so that
+        a case can be parsed section by section from any line iterator.
+        Each line is tokenized at most once, the terminus checks and the
+        record parsing share the tokens of the line under the cursor.
+
+        Args:
+            lines: an iterable of pss/e data lines, such as a list, an open
+                file or a generator
+            line_index(int): the index of the first line in the pss/e data
+            compact(bool): build records with the compact record classes
+            context(ConversionContext): receives the progress messages and
+                warnings of the section parsers
+        '''
+
+        self.records = compact_record_classes if compact else record_classes
+        self.context = conversion_context(context)
+        self._lines = iter(lines)
+        self.line_index = line_index - 1
+        self.line = None
+        self._tokens = None
+        self.fast_path_lines = 0
+        self.general_path_lines = 0
+        self.advance()
+
+    def advance(self):
+        '''moves the cursor to the next line, line is None at the end of the data'''
+        self.line = next(self._lines, None)
+        self._tokens = None
+        self.line_index += 1
+
+    def current(self):
+        '''Returns: the line under the cursor'''
+        if self.line is None:
+            raise PSSEDataParsingError('psse data ended unexpectedly after {} lines'.format(self.line_index))
+        return self.line
+
+    def tokens(self):
+        '''Returns: the line parts and comment of the line under the cursor'''
+        if self._tokens is None:
+            line = self.current()
+            self._tokens = _fast_parse_line(line)
+            if self._tokens is not None:
+                self.fast_path_lines += 1
+            else:
+                self._tokens = parse_line(line)
+                self.general_path_lines += 1
+        return self._tokens
+
+    def parse(self, min_values=None, max_values=None, section=None):
+        '''parses the line under the cursor and moves to the next line
+
+        Returns:
+            tuple: the line parts and comment, as given by parse_line
+        '''
+
+        line_parts, comment = self.tokens()
+        if section is not None:
+            line_parts = _check_line_requirements(line_parts, LineRequirements(self.line_index, min_values, max_values, section), self.context)
+        self.advance()
+        return line_parts, comment
+
+    def first_value(self):
+        '''Returns: the stripped first value of the line under the cursor'''
+        return self.tokens()[0][0].strip()
+
+    def at_terminus(self):
+        return self.first_value() in psse_terminuses
+
+    def skip_records(self, record_lines):
+        '''moves the cursor to the end of the current data table, only the
+        first value of each record is inspected
+
+        Args:
+            record_lines: the number of lines in each record or a function
+                of the record's first line, as given in psse_sections
+        '''
+
+        while _first_value(self.current()) not in psse_terminuses:
+            count = record_lines(self.line) if callable(record_lines) else record_lines
+            for i in range(0, count):
+                self.advance()
+
+    def skip_table_terminus(self):
+        '''steps over the end of a data table, unless the end of all records was reached'''
+        if self.first_value() != psse_record_terminus:
+            self.advance()
+
+    def remaining(self):
+        '''Returns: a generator over the lines following the cursor'''
+        while self.line is not None:
+            line = self.line
+            self.advance()
+            yield line
+
+
+def _parse_buses(cursor):
     buses = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(13, 13, "bus")
+        buses.append(cursor.records['Bus'](*line_parts))
+    cursor.context.progress('parsed {} buses'.format(len(buses)))
+    return buses
+
+
+def _parse_loads(cursor):
     loads = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(13, 14, "load")
+        loads.append(cursor.records['Load'](len(loads), *line_parts))
+    cursor.context.progress('parsed {} loads'.format(len(loads)))
+    return loads
+
+
+def _parse_fixed_shunts(cursor):
     fixed_shunts = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(5, 5, "fixed shunt")
+        fixed_shunts.append(cursor.records['FixedShunt'](len(fixed_shunts), *line_parts))
+    cursor.context.progress('parsed {} fixed shunts'.format(len(fixed_shunts)))
+    return fixed_shunts
+
+
+def _parse_generators(cursor):
     generators = []
-    branches = []
-    transformers = []
-    areas = []
-    tt_dc_lines = []
-    vsc_dc_lines = []
-    transformer_corrections = []
-    mt_dc_lines = []
-    line_groupings = []
-    zones = []
-    transfers = []
-    owners = []
-    facts = []
-    switched_shunts = []
-    gnes = []
-    induction_machines = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(28, 28, "generator")
+        generators.append(cursor.records['Generator'](len(generators), *line_parts))
+    cursor.context.progress('parsed {} generators'.format(len(generators)))
+    return generators
 
 
-    line_index = 3
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 13, 13, "bus"))
-        buses.append(Bus(*line_parts))
-        line_index += 1
-    print_err('parsed {} buses'.format(len(buses)))
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    load_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 13, 14, "load"))
-        loads.append(Load(line_index - load_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} loads'.format(len(loads)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    fixed_shunt_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 5, 5, "fixed shunt"))
-        fixed_shunts.append(FixedShunt(line_index - fixed_shunt_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} fixed shunts'.format(len(fixed_shunts)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    gen_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 28, 28, "generator"))
-        generators.append(Generator(line_index - gen_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} generators'.format(len(generators)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    branch_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        #line = shlex.split(lines[line_index].strip())
-        #line = expand_commas(line)
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 24, 24, "branch"))
-        #print(line_parts)
-        branches.append(Branch(line_index - branch_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} branches'.format(len(branches)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
+def _parse_branches(cursor):
+    branches = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(24, 24, "branch")
+        branches.append(cursor.records['Branch'](len(branches), *line_parts))
+    cursor.context.progress('parsed {} branches'.format(len(branches)))
+    return branches
+
 
+def _parse_transformers(cursor):
+    transformers = []
     transformer_index = 0
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts_1, comment_1 = parse_line(lines[line_index], LineRequirements(line_index, 21, 21, "transformer"))
-        parameters_1 = TransformerParametersFirstLine(*line_parts_1)
+    while not cursor.at_terminus():
+        line_parts_1, comment_1 = cursor.parse(21, 21, "transformer")
+        parameters_1 = cursor.records['TransformerParametersFirstLine'](*line_parts_1)
         #print(parameters_1)
 
         if parameters_1.k == 0: # two winding case
-            line_parts_2, comment_2 = parse_line(lines[line_index+1], LineRequirements(line_index+1, 3, 3, "transformer"))
-            line_parts_3, comment_3 = parse_line(lines[line_index+2], LineRequirements(line_index+1, 17, 17, "transformer"))
-            line_parts_4, comment_4 = parse_line(lines[line_index+3], LineRequirements(line_index+1, 2, 2, "transformer"))
+            line_parts_2, comment_2 = cursor.parse(3, 3, "transformer")
+            line_parts_3, comment_3 = cursor.parse(17, 17, "transformer")
+            line_parts_4, comment_4 = cursor.parse(2, 2, "transformer")
 
-            parameters_2 = TransformerParametersSecondLineShort(*line_parts_2)
-            winding_1 = TransformerWinding(1, *line_parts_3)
-            winding_2 = TransformerWindingShort(2, *line_parts_4)
+            parameters_2 = cursor.records['TransformerParametersSecondLineShort'](*line_parts_2)
+            winding_1 = cursor.records['TransformerWinding'](1, *line_parts_3)
+            winding_2 = cursor.records['TransformerWindingShort'](2, *line_parts_4)
 
-            t = TwoWindingTransformer(transformer_index, parameters_1, parameters_2, winding_1, winding_2)
+            t = cursor.records['TwoWindingTransformer'](transformer_index, parameters_1, parameters_2, winding_1, winding_2)
 
-            line_index += 4
         else: # three winding case
-            line_parts_2, comment_2 = parse_line(lines[line_index+1], LineRequirements(line_index+1, 11, 11, "transformer"))
-            line_parts_3, comment_3 = parse_line(lines[line_index+2], LineRequirements(line_index+2, 17, 17, "transformer"))
-            line_parts_4, comment_4 = parse_line(lines[line_index+3], LineRequirements(line_index+3, 17, 17, "transformer"))
-            line_parts_5, comment_5 = parse_line(lines[line_index+4], LineRequirements(line_index+4, 17, 17, "transformer"))
-
-            parameters_2 = TransformerParametersSecondLine(*line_parts_2)
-            winding_1 = TransformerWinding(1, *line_parts_3)
-            winding_2 = TransformerWinding(2, *line_parts_4)
-            winding_3 = TransformerWinding(3, *line_parts_5)
+            line_parts_2, comment_2 = cursor.parse(11, 11, "transformer")
+            line_parts_3, comment_3 = cursor.parse(17, 17, "transformer")
+            line_parts_4, comment_4 = cursor.parse(17, 17, "transformer")
+            line_parts_5, comment_5 = cursor.parse(17, 17, "transformer")
 
-            t = ThreeWindingTransformer(transformer_index, parameters_1, parameters_2, winding_1, winding_2, winding_3)
+            parameters_2 = cursor.records['TransformerParametersSecondLine'](*line_parts_2)
+            winding_1 = cursor.records['TransformerWinding'](1, *line_parts_3)
+            winding_2 = cursor.records['TransformerWinding'](2, *line_parts_4)
+            winding_3 = cursor.records['TransformerWinding'](3, *line_parts_5)
 
-            line_index += 5
+            t = cursor.records['ThreeWindingTransformer'](transformer_index, parameters_1, parameters_2, winding_1, winding_2, winding_3)
 
         transformers.append(t)
         transformer_index += 1
-    print_err('parsed {} transformers'.format(len(transformers)))
+    cursor.context.progress('parsed {} transformers'.format(len(transformers)))
+    return transformers
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 1, 5, "areas"))
+def _parse_areas(cursor):
+    areas = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(1, 5, "areas")
         areas.append(Area(*line_parts))
-        line_index += 1
-    print_err('parsed {} areas'.format(len(areas)))
+    cursor.context.progress('parsed {} areas'.format(len(areas)))
+    return areas
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    #two terminal dc line data
+def _parse_tt_dc_lines(cursor):
+    tt_dc_lines = []
     ttdc_index = 0
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts_1, comment_1 = parse_line(lines[line_index], LineRequirements(line_index, 12, 12, "two terminal dc line"))
-        line_parts_2, comment_2 = parse_line(lines[line_index+1], LineRequirements(line_index+1, 17, 17, "two terminal dc line"))
-        line_parts_3, comment_3 = parse_line(lines[line_index+2], LineRequirements(line_index+2, 17, 17, "two terminal dc line"))
+    while not cursor.at_terminus():
+        line_parts_1, comment_1 = cursor.parse(12, 12, "two terminal dc line")
+        line_parts_2, comment_2 = cursor.parse(17, 17, "two terminal dc line")
+        line_parts_3, comment_3 = cursor.parse(17, 17, "two terminal dc line")
 
         if ttdc_index == 0:
-            warnings.warn('skipping two terminal dc line data in PSSE file.', PSSE2GRGWarning)
+            cursor.context.warn('skipping two terminal dc line data in PSSE file.', PSSE2GRGWarning)
 
         # parameters = TwoTerminalDCLineParameters(*line_parts_1)
         # rectifier = TwoTerminalDCLineRectifier(*line_parts_2)
@@ -255,21 +731,20 @@ def parse_psse_case_lines(lines):
         # tt_dc_lines.append(TwoTerminalDCLine(ttdc_index, parameters, rectifier, inverter))
 
         ttdc_index += 1
-        line_index += 3
-    print_err('parsed {} two terminal dc lines'.format(len(tt_dc_lines)))
+    cursor.context.progress('parsed {} two terminal dc lines'.format(len(tt_dc_lines)))
+    return tt_dc_lines
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    #vsc dc line data
+def _parse_vsc_dc_lines(cursor):
+    vsc_dc_lines = []
     vscdc_index = 0
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts_1, comment_1 = parse_line(lines[line_index], LineRequirements(line_index, 3, 11, "vsc dc line"))
-        line_parts_2, comment_2 = parse_line(lines[line_index+1], LineRequirements(line_index+1, 13, 15, "vsc dc line"))
-        line_parts_3, comment_3 = parse_line(lines[line_index+2], LineRequirements(line_index+2, 13, 15, "vsc dc line"))
+    while not cursor.at_terminus():
+        line_parts_1, comment_1 = cursor.parse(3, 11, "vsc dc line")
+        line_parts_2, comment_2 = cursor.parse(13, 15, "vsc dc line")
+        line_parts_3, comment_3 = cursor.parse(13, 15, "vsc dc line")
 
         if vscdc_index == 0:
-            warnings.warn('skipping vsc dc line data in PSSE file.', PSSE2GRGWarning)
+            cursor.context.warn('skipping vsc dc line data in PSSE file.', PSSE2GRGWarning)
 
         # parameters = VSCDCLineParameters(*line_parts_1)
         # converter_1 = VSCDCLineConverter(*line_parts_2)
@@ -277,172 +752,456 @@ def parse_psse_case_lines(lines):
 
         # vsc_dc_lines.append(VSCDCLine(vscdc_index, parameters, converter_1, converter_2))
 
-        line_index += 3
         vscdc_index += 1
-    print_err('parsed {} vsc dc lines'.format(len(vsc_dc_lines)))
+    cursor.context.progress('parsed {} vsc dc lines'.format(len(vsc_dc_lines)))
+    return vsc_dc_lines
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    #transformer impedence correction tables data
-    trans_offset_index = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 1, 23, "transformer correction"))
+def _parse_transformer_corrections(cursor):
+    transformer_corrections = []
+    trans_count = 0
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(1, 23, "transformer correction")
 
-        if trans_offset_index == line_index:
-            warnings.warn('skipping transformer impedance correction data in PSSE file.', PSSE2GRGWarning)
+        if trans_count == 0:
+            cursor.context.warn('skipping transformer impedance correction data in PSSE file.', PSSE2GRGWarning)
 
-        #transformer_corrections.append(TransformerImpedanceCorrection(line_index - trans_offset_index, *line_parts))
-        line_index += 1
-    print_err('parsed {} transformer corrections'.format(len(transformer_corrections)))
+        #transformer_corrections.append(TransformerImpedanceCorrection(trans_count, *line_parts))
+        trans_count += 1
+    cursor.context.progress('parsed {} transformer corrections'.format(len(transformer_corrections)))
+    return transformer_corrections
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    #multi-terminal dc line data
+def _parse_mt_dc_lines(cursor):
+    mt_dc_lines = []
     mtdc_count = 0
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        #line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 8, 8, "multi-terminal dc line"))
-        line_parts, comment = parse_line(lines[line_index])
+    while not cursor.at_terminus():
+        #line_parts, comment = cursor.parse(8, 8, "multi-terminal dc line")
+        line_parts, comment = cursor.parse()
 
         if mtdc_count == 0:
-            warnings.warn('skipping mtdc line data in PSSE file.', PSSE2GRGWarning)
+            cursor.context.warn('skipping mtdc line data in PSSE file.', PSSE2GRGWarning)
 
         # parameters = MultiTerminalDCLineParameters(*line_parts)
 
         # nconv, ndcbs, ndcln = [], [], []
         # for i in range(0, parameters.nconv):
-        #     line_parts, comment = parse_line(lines[line_index + i + 1], LineRequirements(line_index + i + 1, 16, 16, "multi-terminal dc line"))
+        #     line_parts, comment = cursor.parse(16, 16, "multi-terminal dc line")
         #     nconv.append(MultiTerminalDCLineConverter(*line_parts))
 
         # for i in range(parameters.nconv, parameters.ndcbs+parameters.nconv):
-        #     line_parts, comment = parse_line(lines[line_index + i + 1], LineRequirements(line_index + i + 1, 8, 8, "multi-terminal dc line"))
+        #     line_parts, comment = cursor.parse(8, 8, "multi-terminal dc line")
         #     ndcbs.append(MultiTerminalDCLineDCBus(*line_parts))
 
         # for i in range(parameters.nconv + parameters.ndcbs, parameters.ndcln+parameters.nconv+parameters.ndcbs):
-        #     line_parts, comment = parse_line(lines[line_index + i + 1], LineRequirements(line_index + i + 1, 6, 6, "multi-terminal dc line"))
+        #     line_parts, comment = cursor.parse(6, 6, "multi-terminal dc line")
         #     ndcln.append(MultiTerminalDCLineDCLink(*line_parts))
 
         # mt_dc_lines.append(MultiTerminalDCLine(mtdc_count, parameters, nconv, ndcbs, ndcln))
         mtdc_count += 1
-        line_index += 1
-        #line_index += 1 + parameters.nconv + parameters.ndcbs + parameters.ndcln
-    print_err('parsed {} multi-terminal dc lines'.format(len(mt_dc_lines)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    #multi-section line grouping data
-    msline_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 5, 5, "multi-section line"))
-        if msline_index_offset == line_index:
-            warnings.warn('skipping multi-section line grouping data in PSSE file.', PSSE2GRGWarning)
-        #line_groupings.append(MultiSectionLineGrouping(line_index - msline_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} multi-section lines'.format(len(line_groupings)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 2, 2, "zone"))
+    cursor.context.progress('parsed {} multi-terminal dc lines'.format(len(mt_dc_lines)))
+    return mt_dc_lines
+
+
+def _parse_line_groupings(cursor):
+    line_groupings = []
+    msline_count = 0
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(5, 5, "multi-section line")
+        if msline_count == 0:
+            cursor.context.warn('skipping multi-section line grouping data in PSSE file.', PSSE2GRGWarning)
+        #line_groupings.append(MultiSectionLineGrouping(msline_count, *line_parts))
+        msline_count += 1
+    cursor.context.progress('parsed {} multi-section lines'.format(len(line_groupings)))
+    return line_groupings
+
+
+def _parse_zones(cursor):
+    zones = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(2, 2, "zone")
         zones.append(Zone(*line_parts))
-        line_index += 1
-    print_err('parsed {} zones'.format(len(zones)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    # inter area transfer data
-    intarea_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 4, 4, "inter-area transfer"))
-        if intarea_index_offset == line_index:
-            warnings.warn('skipping inter area transfer data in PSSE file.', PSSE2GRGWarning)
-        #transfers.append(InterareaTransfer(line_index - intarea_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} inter-area transfers'.format(len(transfers)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 2, 2, "owner"))
+    cursor.context.progress('parsed {} zones'.format(len(zones)))
+    return zones
+
+
+def _parse_transfers(cursor):
+    transfers = []
+    intarea_count = 0
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(4, 4, "inter-area transfer")
+        if intarea_count == 0:
+            cursor.context.warn('skipping inter area transfer data in PSSE file.', PSSE2GRGWarning)
+        #transfers.append(InterareaTransfer(intarea_count, *line_parts))
+        intarea_count += 1
+    cursor.context.progress('parsed {} inter-area transfers'.format(len(transfers)))
+    return transfers
+
+
+def _parse_owners(cursor):
+    owners = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(2, 2, "owner")
         owners.append(Owner(*line_parts))
-        line_index += 1
-    print_err('parsed {} owners'.format(len(owners)))
+    cursor.context.progress('parsed {} owners'.format(len(owners)))
+    return owners
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    # facts device data block
+def _parse_facts(cursor):
+    facts = []
     facts_index = 0
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 19, 21, "facts device"))
-        if facts_index == line_index:
-            warnings.warn('skipping FACTS device data in PSSE file.', PSSE2GRGWarning)
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(19, 21, "facts device")
+        if facts_index == 0:
+            cursor.context.warn('skipping FACTS device data in PSSE file.', PSSE2GRGWarning)
         #facts.append(FACTSDevice(facts_index, *line_parts))
         facts_index += 1
-        line_index += 1
-    print_err('parsed {} facts devices'.format(len(facts)))
+    cursor.context.progress('parsed {} facts devices'.format(len(facts)))
+    return facts
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    # switched shunt data block
-    swithced_shunt_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 12, 26, "swticthed shunt"))
-        switched_shunts.append(SwitchedShunt(line_index - swithced_shunt_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} switched shunts'.format(len(switched_shunts)))
+def _parse_switched_shunts(cursor):
+    switched_shunts = []
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(12, 26, "swticthed shunt")
+        switched_shunts.append(cursor.records['SwitchedShunt'](len(switched_shunts), *line_parts))
+    cursor.context.progress('parsed {} switched shunts'.format(len(switched_shunts)))
+    return switched_shunts
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
 
-    # GNE device data
+def _parse_gnes(cursor):
+    gnes = []
     gne_count = 0
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
+    while not cursor.at_terminus():
         gne_count += 1
-        line_index += 1
+        cursor.advance()
     if gne_count > 0:
-        warnings.warn('skipped {} lines of GNE data'.format(gne_count), PSSEDataWarning)
+        cursor.context.warn('skipped {} lines of GNE data'.format(gne_count), PSSEDataWarning)
         #print_err('parsed {} generic network elements'.format(len(gnes)))
+    return gnes
+
+
+def _parse_induction_machines(cursor):
+    induction_machines = []
+    indm_count = 0
+    while not cursor.at_terminus():
+        line_parts, comment = cursor.parse(34, 34, "induction machine")
+        if indm_count == 0:
+            cursor.context.warn('skipping induction machine data in PSSE file.', PSSE2GRGWarning)
+        #induction_machines.append(InductionMachine(indm_count, *line_parts))
+        indm_count += 1
+    cursor.context.progress('parsed {} induction machines'.format(len(induction_machines)))
+    return induction_machines
+
+
+def _transformer_record_lines(line):
+    '''Returns: the number of lines in the transformer record starting on the given line'''
+    line_parts, comment = _fast_parse_line(line) or parse_line(line)
+    k = line_parts[2].strip() if len(line_parts) > 2 else ''
+    if len(k) == 0 or int(k) == 0:
+        return 4 # two winding case
+    return 5 # three winding case
+
+
+# the data sections of a pss/e v33 file in the order they occur, each entry
+# gives the Case argument name, the section parser and the number of lines
+# in each record (or a function of the record's first line)
+psse_sections = [
+    ('buses', _parse_buses, 1),
+    ('loads', _parse_loads, 1),
+    ('fixed_shunts', _parse_fixed_shunts, 1),
+    ('generators', _parse_generators, 1),
+    ('branches', _parse_branches, 1),
+    ('transformers', _parse_transformers, _transformer_record_lines),
+    ('areas', _parse_areas, 1),
+    ('tt_dc_lines', _parse_tt_dc_lines, 3),
+    ('vsc_dc_lines', _parse_vsc_dc_lines, 3),
+    ('transformer_corrections', _parse_transformer_corrections, 1),
+    ('mt_dc_lines', _parse_mt_dc_lines, 1),
+    ('line_groupings', _parse_line_groupings, 1),
+    ('zones', _parse_zones, 1),
+    ('transfers', _parse_transfers, 1),
+    ('owners', _parse_owners, 1),
+    ('facts', _parse_facts, 1),
+    ('switched_shunts', _parse_switched_shunts, 1),
+    ('gnes', _parse_gnes, 1),
+    ('induction_machines', _parse_induction_machines, 1),
+]
+
+_psse_section_parsers = {name: parse_section for name, parse_section, record_lines in psse_sections}
+
+# sections with fewer lines than this are not worth sending to a worker process
+parallel_section_min_lines = 1000
+
+
+def _first_value(line):
+    '''a cheap equivalent of parse_line(line)[0][0].strip(), for locating the
+    table and record terminuses without tokenizing the whole line'''
+    return line.split(',', 1)[0].split('/', 1)[0].strip()
+
+
+def scan_psse_sections(lines, line_index=3):
+    '''locates the data sections of pss/e data lines by walking over the
+    table terminuses, only the first value of each record is inspected
+
+    Args:
+        lines(list): pss/e data lines
+        line_index(int): the index of the first line of the bus data
+    Returns:
+        tuple: a list of (section name, first line index, terminus line
+            index) in file order and the index of the first line after
+            the last section
+    '''
+
+    sections = []
+    for name, parse_section, record_lines in psse_sections:
+        start = line_index
+        while True:
+            if line_index >= len(lines):
+                raise PSSEDataParsingError('psse data ended unexpectedly after {} lines'.format(len(lines)))
+            line = lines[line_index]
+            first_value = _first_value(line)
+            if first_value in psse_terminuses:
+                break
+            line_index += record_lines(line) if callable(record_lines) else record_lines
+        sections.append((name, start, line_index))
+        if first_value != psse_record_terminus:
+            line_index += 1
+
+    return sections, line_index
+
+
+def _parse_section_lines(name, lines, line_index, compact=False, verbose=True):
+    '''parses the lines of one data section, this runs in worker processes,
+    so the warnings and the progress messages are collected and returned to
+    the caller
+
+    Args:
+        name(str): the name of the section, as given in psse_sections
+        lines(list): the lines of the section, including its terminus
+        line_index(int): the index of the first line in the pss/e data
+        compact(bool): build records with the compact record classes
+        verbose(bool): collects the progress messages
+    Returns:
+        tuple: the parsed components, the warnings as (message, category)
+            pairs, the progress messages and the fast and general tokenizer
+            line counts
+    '''
+
+    context = ConversionContext(log=io.StringIO(), capture_warnings=True, verbose=verbose)
+    cursor = _PSSELineCursor(lines, line_index, compact, context)
+    components = _psse_section_parsers[name](cursor)
+
+    messages = context.log_file.getvalue().splitlines()
+    return components, context.warnings, messages, cursor.fast_path_lines, cursor.general_path_lines
+
+
+def _parse_header(cursor):
+    '''parses the three header lines of pss/e data
+
+    Returns:
+        dict: the Case arguments given by the header
+    '''
+
+    header_lines = []
+    while len(header_lines) < 3 and cursor.line is not None:
+        header_lines.append(cursor.line)
+        cursor.advance()
+
+    if len(header_lines) < 3: # need at base values and record
+        raise PSSEDataParsingError('psse case has {} lines and at least 3 are required'.format(len(header_lines)))
+
+    (ic, sbase, rev, xfrrat, nxfrat, basefrq), comment = parse_line(header_lines[0], LineRequirements(0, 6, 6, "header"))
+    cursor.context.progress('case data: {} {} {} {} {} {}'.format(ic, sbase, rev, xfrrat, nxfrat, basefrq))
+
+    if len(ic.strip()) > 0 and not (ic.strip() == "0"): # note validity checks may fail on "change data"
+        raise PSSEDataParsingError('ic value of {} given, only a value of 0 is supported'.format(ic))
+
+    version_id = 33
+    if len(rev.strip()) > 0:
+        try:
+            version_id = int(float(rev))
+        except ValueError:
+             cursor.context.warn('assuming PSSE version 33, given version value "{}".'.format(rev.strip()), PSSEDataWarning)
+
+    if version_id != 33:
+        cursor.context.warn('PSSE version {} given but only version 33 is supported, parser may not function correctly.'.format(rev.strip()), PSSEDataWarning)
+
+    record1 = header_lines[1].strip('\n')
+    record2 = header_lines[2].strip('\n')
+    cursor.context.progress('record 1: {}'.format(record1))
+    cursor.context.progress('record 2: {}'.format(record2))
+
+    return {
+        'ic': ic,
+        'sbase': sbase,
+        'rev': rev,
+        'xfrrat': xfrrat,
+        'nxfrat': nxfrat,
+        'basfrq': basefrq,
+        'record1': record1,
+        'record2': record2,
+    }
+
+
+def parse_psse_case_lines(lines, workers=None, lazy=False, sections=None, compact=False, profile=None, context=None):
+    '''parses pss/e data section by section, only the record currently being
+    parsed is held in memory in addition to the resulting case
+
+    When workers is given, the data sections are first located with
+    scan_psse_sections and the large sections are parsed in a pool of
+    worker processes.  This requires all of the lines, so an iterator is
+    read into a list first.
+
+    When lazy is given, the sections are also located up front, but each
+    one is only parsed when the corresponding attribute of the returned
+    LazyCase is first accessed.  The lines are held until then.
+
+    When sections is given, only the named sections are parsed and the
+    component lists of the other sections are empty.  The records of the
+    skipped sections are stepped over without being tokenized.
+
+    When compact is given, the buses, loads, shunts, generators, branches
+    and transformers are built with the compact record classes of
+    grg_psse2grg.struct, which store their fields in __slots__.  These
+    behave like the regular classes, but they are not subclasses of them.
+
+    Args:
+        lines: an iterable of pss/e data lines, such as a list, an open file
+            or a generator
+        workers(int): the number of worker processes for parsing large
+            sections, by default all sections are parsed in this process
+        lazy(bool): defer parsing each section until it is accessed
+        sections(list): the names of the sections to parse, as given in
+            psse_sections, by default all sections are parsed
+        compact(bool): build records with the compact record classes
+        profile(Profile): records the time and memory of parsing the
+            header and each section, which includes reading the lines of an
+            iterator, or of the section scan and the parallel parsing when
+            workers is given, see grg_psse2grg.profiling
+        context(ConversionContext): receives the progress messages and
+            warnings of the parser, and gives the profile instead of the
+            profile argument, see grg_psse2grg.context.  The context of a
+            LazyCase is used when its sections are parsed.
+    Returns:
+        Case: a grg_pssedata case
+    '''
+
+    context = conversion_context(context, profile=profile)
+    profile = context.profile
+
+    if sections is not None:
+        unknown = set(sections) - set(_psse_section_parsers)
+        if len(unknown) > 0:
+            raise ValueError('unknown pss/e sections {}, must be in {}'.format(sorted(unknown), [name for name, parse_section, record_lines in psse_sections]))
+
+    if lazy:
+        if workers is not None:
+            raise ValueError('lazy parsing does not support worker processes')
+        if not hasattr(lines, '__getitem__'):
+            lines = list(lines)
+        with profile.phase('scan'):
+            return _parse_psse_case_lines_lazy(lines, sections, compact, context)
+
+    if workers is not None:
+        if not hasattr(lines, '__getitem__'):
+            lines = list(lines)
+        with profile.phase('sections'):
+            return _parse_psse_case_lines_parallel(lines, workers, sections, compact, context)
+
+    cursor = _PSSELineCursor(lines, compact=compact, context=context)
+    with profile.phase('header'):
+        case_args = _parse_header(cursor)
+
+    for name, parse_section, record_lines in psse_sections:
+        context.check_cancelled()
+        with profile.phase(name):
+            if sections is None or name in sections:
+                case_args[name] = parse_section(cursor)
+            else:
+                cursor.skip_records(record_lines)
+                case_args[name] = []
+            cursor.skip_table_terminus()
+
+    context.progress('tokenized {} lines with the fast path and {} lines with the general path'.format(cursor.fast_path_lines, cursor.general_path_lines))
 
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    # induction machine data
-    indm_index_offset = line_index
-    while parse_line(lines[line_index])[0][0].strip() not in psse_terminuses:
-        line_parts, comment = parse_line(lines[line_index], LineRequirements(line_index, 34, 34, "induction machine"))
-        if indm_index_offset == line_index:
-            warnings.warn('skipping induction machine data in PSSE file.', PSSE2GRGWarning)
-        #induction_machines.append(InductionMachine(line_index - indm_index_offset, *line_parts))
-        line_index += 1
-    print_err('parsed {} induction machines'.format(len(induction_machines)))
-
-    if parse_line(lines[line_index])[0][0].strip() != psse_record_terminus:
-        line_index += 1
-
-    print_err('un-parsed lines:')
-    while line_index < len(lines):
-        #print(parse_line(lines[line_index]))
-        print_err('  '+lines[line_index])
-        line_index += 1
-
-    case = Case(ic, sbase, rev, xfrrat, nxfrat, basefrq, record1, record2,
-        buses, loads, fixed_shunts, generators, branches, transformers, areas,
-        tt_dc_lines, vsc_dc_lines, transformer_corrections, mt_dc_lines,
-        line_groupings, zones, transfers, owners, facts, switched_shunts,
-        gnes, induction_machines)
+    context.progress('un-parsed lines:')
+    for line in cursor.remaining():
+        #print(parse_line(line))
+        context.progress('  '+line)
+
+    case = Case(**case_args)
 
     #print(case)
     #print(case.to_psse())
     return case
 
 
+def _parse_psse_case_lines_parallel(lines, workers, sections, compact, context):
+    case_args = _parse_header(_PSSELineCursor(lines[:3], context=context))
+
+    section_lines, line_index = scan_psse_sections(lines)
+
+    fast_path_lines = 0
+    general_path_lines = 0
+    with concurrent_futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for name, start, end in section_lines:
+            if sections is not None and name not in sections:
+                continue
+            if end - start >= parallel_section_min_lines:
+                futures[name] = executor.submit(_parse_section_lines, name, lines[start:end+1], start, compact, context.verbose)
+
+        for name, start, end in section_lines:
+            context.check_cancelled()
+            if sections is not None and name not in sections:
+                case_args[name] = []
+                continue
+            if name in futures:
+                components, caught_warnings, messages, fast, general = futures[name].result()
+            else:
+                components, caught_warnings, messages, fast, general = _parse_section_lines(name, lines[start:end+1], start, compact, context.verbose)
+
+            for message in messages:
+                context.log(message)
+            for message, category in caught_warnings:
+                context.warn(message, category)
+            case_args[name] = components
+            fast_path_lines += fast
+            general_path_lines += general
+
+    context.progress('tokenized {} lines with the fast path and {} lines with the general path'.format(fast_path_lines, general_path_lines))
+
+    context.progress('un-parsed lines:')
+    for line in lines[line_index:]:
+        context.progress('  '+line)
+
+    return Case(**case_args)
+
+
+def _parse_psse_section(name, lines, start, end, compact, context):
+    return _psse_section_parsers[name](_PSSELineCursor(lines[start:end+1], start, compact, context))
+
+
+def _parse_psse_case_lines_lazy(lines, sections, compact, context):
+    case_args = _parse_header(_PSSELineCursor(lines[:3], context=context))
+
+    section_lines, line_index = scan_psse_sections(lines)
+
+    context.progress('un-parsed lines:')
+    for line in lines[line_index:]:
+        context.progress('  '+line)
+
+    section_loaders = {}
+    for name, start, end in section_lines:
+        if sections is None or name in sections:
+            section_loaders[name] = functools.partial(_parse_psse_section, name, lines, start, end, compact, context)
+        else:
+            section_loaders[name] = list
+    return LazyCase(section_loaders=section_loaders, **case_args)
+
+
+
 # def build_psse_case_network(grg_data):
 #     network = grg_data['network']
 #     network_id = network['id']
@@ -461,7 +1220,33 @@ def parse_psse_case_lines(lines):
 #     return build_psse_case(flat_network_id, network, root_components, flat_components)
 
 
-def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
+def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id, diagnostics=None, profile=None, context=None):
+    '''builds a pss/e case from grg data, the per component warnings are
+    collected in diagnostics when it is given, see grg_psse2grg.diagnostics
+
+    Args:
+        grg_data(dict): grg data, such as given by parse_grg_case_file
+        starting_point_map_id(str): the mapping with the voltage, power and
+            tap position values
+        switch_assignment_map_id(str): the mapping with the switch statuses
+        diagnostics(Diagnostics): collects the warnings of the conversion
+        profile(Profile): records the time and memory of the topology,
+            group and component stages, see grg_psse2grg.profiling
+        context(ConversionContext): receives the warnings and gives the
+            diagnostics and the profile instead of the diagnostics and
+            profile arguments, see grg_psse2grg.context
+    Returns:
+        Case: the pss/e case
+    '''
+
+    context = conversion_context(context, diagnostics, profile)
+    with context.profile.phase('build_psse_case'):
+        return _build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id, context)
+
+
+def _build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id, context):
+    profile = context.profile
+
     # TODO see if this grg_mp2grg case is ok, and should not be grg_mpdata
 
     #print(json.dumps(flat_components, sort_keys=True, indent=2, separators=(',', ': ')))
@@ -482,14 +1267,16 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
 
 
     if not network['per_unit']:
-        print_err('network data not given in per unit')
+        context.log('network data not given in per unit')
         return
 
     base_mva = 100.0
     if 'sbase' in network:
         base_mva = network['sbase']
 
-    cbt = components_by_type(grg_data)
+    context.check_cancelled()
+    profile.start('topology')
+    cbt = grg_cmd.components_by_type(grg_data)
     #print_err('comps: {}'.format(cbt.keys()))
 
     switch_assignment = {}
@@ -500,19 +1287,19 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
             if key.count('/') == 1 and key.endswith('/status'):
                 switch_assignment[key.split('/')[0]] = value
 
-    vp2int = collapse_voltage_points(grg_data, switch_assignment)
+    vp2int = grg_cmd.collapse_voltage_points(grg_data, switch_assignment)
     # print_err('voltage points to int:')
     # print_err(vp2int)
 
-    avps = active_voltage_points(grg_data, switch_assignment)
+    avps = grg_cmd.active_voltage_points(grg_data, switch_assignment)
     # print_err('active voltage points:')
     # print_err(avps)
 
-    ivps = isolated_voltage_points(grg_data, switch_assignment)
+    ivps = grg_cmd.isolated_voltage_points(grg_data, switch_assignment)
     # print_err('isolated voltage points:')
     # print_err(ivps)
 
-    vlbvp = voltage_level_by_voltage_point(grg_data)
+    vlbvp = grg_cmd.voltage_level_by_voltage_point(grg_data)
     #print_err(vlbvp)
 
 
@@ -549,6 +1336,9 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
             bid_with_active_gen.add(vp2int[sc['link']])
 
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('groups')
     psse_buses = []
     psse_loads = []
     psse_fixed_shunts = []
@@ -579,7 +1369,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
                 if not comp_id in area_index_lookup:
                     area_index_lookup[comp_id] = int(area['source_id'])
                 else:
-                    warnings.warn('component %s is in multiple areas only %s will be used.' % (comp_id, area_index_lookup[comp_id]), PSSE2GRGWarning)
+                    context.record_warning('components are in multiple areas, only the first is used', comp_id, 'component %s is in multiple areas only %s will be used.' % (comp_id, area_index_lookup[comp_id]), PSSE2GRGWarning)
     else:
         idx = 1
         for k,area in areas.items():
@@ -588,7 +1378,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
                 if not comp_id in area_index_lookup:
                     area_index_lookup[comp_id] = idx
                 else:
-                    warnings.warn('component %s is in multiple areas only %s will be used.' % (comp_id, area_index_lookup[comp_id]), PSSE2GRGWarning)
+                    context.record_warning('components are in multiple areas, only the first is used', comp_id, 'component %s is in multiple areas only %s will be used.' % (comp_id, area_index_lookup[comp_id]), PSSE2GRGWarning)
             idx += 1
 
     for name, area in areas.items():
@@ -620,7 +1410,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
                 if not comp_id in zone_index_lookup:
                     zone_index_lookup[comp_id] = int(zone['source_id'])
                 else:
-                    warnings.warn('component %s is in multiple zones only %s will be used.' % (comp_id, zone_index_lookup[comp_id]), PSSE2GRGWarning)
+                    context.record_warning('components are in multiple zones, only the first is used', comp_id, 'component %s is in multiple zones only %s will be used.' % (comp_id, zone_index_lookup[comp_id]), PSSE2GRGWarning)
     else:
         idx = 1
         for k,zone in zones.items():
@@ -629,7 +1419,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
                 if not comp_id in zone_index_lookup:
                     zone_index_lookup[comp_id] = idx
                 else:
-                    warnings.warn('component %s is in multiple zones only %s will be used.' % (comp_id, zone_index_lookup[comp_id]), PSSE2GRGWarning)
+                    context.record_warning('components are in multiple zones, only the first is used', comp_id, 'component %s is in multiple zones only %s will be used.' % (comp_id, zone_index_lookup[comp_id]), PSSE2GRGWarning)
             idx += 1
 
     for name, zone in zones.items():
@@ -661,7 +1451,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
                 if len(owner_index_lookup[comp_id]) < 4:
                     owner_index_lookup[comp_id].append(int(owner['source_id']))
                 else:
-                    warnings.warn('component %s has multiple owners only %s will be used.' % (comp_id, owner_index_lookup[comp_id]), PSSE2GRGWarning)
+                    context.record_warning('components have multiple owners, only the first is used', comp_id, 'component %s has multiple owners only %s will be used.' % (comp_id, owner_index_lookup[comp_id]), PSSE2GRGWarning)
     else:
         idx = 1
         for k,owner in owners.items():
@@ -672,7 +1462,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
                 if len(owner_index_lookup[comp_id]) < 4:
                     owner_index_lookup[comp_id].append(idx)
                 else:
-                    warnings.warn('component %s has multiple owners only %s will be used.' % (comp_id, owner_index_lookup[comp_id]), PSSE2GRGWarning)
+                    context.record_warning('components have multiple owners, only the first is used', comp_id, 'component %s has multiple owners only %s will be used.' % (comp_id, owner_index_lookup[comp_id]), PSSE2GRGWarning)
             idx += 1
 
     for name, owner in owners.items():
@@ -693,10 +1483,13 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
 
 
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('buses')
     psse_bus_lookup = {}
     for bid, buses in buses_by_bid.items():
         if len(buses) > 1:
-            print_err('warning: merging buses {} into 1'.format(len(buses)))
+            context.record_warning('merging buses into 1', bid, 'merging buses {} into 1'.format(len(buses)))
 
         bus_names = [bus['psse_name'] if 'psse_name' in bus else bus['id'] for bus in buses]
         bus_name = ' & '.join(bus_names)
@@ -727,7 +1520,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
             if bus['id'] in area_index_lookup:
                 bus_area = area_index_lookup[bus['id']]
                 if area != 1 and bus_area != area:
-                    print_err('warning: inconsistent bus areas found')
+                    context.record_warning('inconsistent bus areas found', bid, 'inconsistent bus areas found')
                 else:
                     area = bus_area
 
@@ -736,7 +1529,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
             if bus['id'] in zone_index_lookup:
                 bus_zone = zone_index_lookup[bus['id']]
                 if zone != 1 and bus_zone != zone:
-                    print_err('warning: inconsistent bus zones found')
+                    context.record_warning('inconsistent bus zones found', bid, 'inconsistent bus zones found')
                 else:
                     zone = bus_zone
 
@@ -745,10 +1538,10 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
             if bus['id'] in owner_index_lookup:
                 bus_owners = owner_index_lookup[bus['id']]
                 if len(bus_owners) > 1:
-                    print_err('warning: multiple bus owners found, using the first one')
+                    context.record_warning('multiple bus owners found, using the first one', bid, 'multiple bus owners found, using the first one')
                 bus_owner = bus_owners[0]
                 if owner != 1 and bus_owner != owner:
-                    print_err('warning: inconsistent bus owners found')
+                    context.record_warning('inconsistent bus owners found', bid, 'inconsistent bus owners found')
                 else:
                     owner = bus_owner
 
@@ -759,7 +1552,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
             if 'mp_base_kv' in vl['voltage']:
                 nv = vl['voltage']['mp_base_kv']
             if base_kv != 1.0 and nv != base_kv:
-                print_err('warning: inconsistent bus base_kv values found')
+                context.record_warning('inconsistent bus base_kv values found', bid, 'inconsistent bus base_kv values found')
             else:
                 base_kv = nv
 
@@ -815,6 +1608,9 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
 
 
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('loads')
     load_index_lookup = {}
     if all('source_id' in load for load in cbt['load']):
         for load in cbt['load']:
@@ -842,7 +1638,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         if load['id'] in owner_index_lookup:
             load_owners = owner_index_lookup[load['id']]
             if len(bus_owners) > 1:
-                print_err('warning: multiple load owners found, using the first one')
+                context.record_warning('multiple load owners found, using the first one', load['id'], 'multiple load owners found, using the first one')
             owner = load_owners[0]
 
         load_args = {
@@ -871,6 +1667,9 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
     psse_loads.sort(key=lambda x: x.index)
 
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('shunts')
     shunt_index_lookup = {}
     if all('source_id' in shunt for shunt in cbt['shunt']):
         for shunt in cbt['shunt']:
@@ -888,7 +1687,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
 
         if isinstance(shunt['shunt']['conductance'], dict) or \
             isinstance(shunt['shunt']['susceptance'], dict):
-            print_err('warning: skipping shunt with variable admittance values')
+            context.record_warning('skipping shunts with variable admittance values', shunt['id'], 'skipping shunt with variable admittance values')
             continue
 
         shunt_args = {
@@ -910,6 +1709,9 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
 
 
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('branches')
     branch_index_lookup = {}
     if all('source_id' in line for line in cbt['ac_line']):
         for line in cbt['ac_line']:
@@ -958,7 +1760,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         if line['id'] in owner_index_lookup:
             line_owners = owner_index_lookup[line['id']]
             if len(line_owners) > 4:
-                print_err('warning: more than 4 line owners found, using the first 4')
+                context.record_warning('more than 4 line owners found, using the first 4', line['id'], 'more than 4 line owners found, using the first 4')
             for i,oid in enumerate(line_owners):
                 k = 'o{}'.format(i+1)
                 owners[k] = oid
@@ -995,6 +1797,9 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
 
 
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('transformers')
     xfer_index_lookup = {}
     if all('source_id' in xfer for xfer in cbt['two_winding_transformer']):
         for xfer in cbt['two_winding_transformer']:
@@ -1019,14 +1824,14 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         if key in starting_point_map:
             tap_position = starting_point_map[key]
         else:
-            print_err('warning: skipping transformer {} due to missing tap position setting'.format(xfer['id']))
+            context.record_warning('skipping transformers due to missing tap position settings', xfer['id'], 'skipping transformer {} due to missing tap position setting'.format(xfer['id']))
             continue
 
         transform = xfer['tap_changer']['transform']
 
         tap_value = grg_common.tap_setting(xfer['tap_changer'], tap_position)
         if tap_value == None:
-            print_err('warning: skipping transformer {} due to missing tap position values'.format(xfer['id']))
+            context.record_warning('skipping transformers due to missing tap position values', xfer['id'], 'skipping transformer {} due to missing tap position values'.format(xfer['id']))
 
         rate_a, rate_b, rate_c = grg_common.get_thermal_rates(xfer)
 
@@ -1040,7 +1845,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         if xfer['id'] in owner_index_lookup:
             xfer_owners = owner_index_lookup[xfer['id']]
             if len(xfer_owners) > 4:
-                print_err('warning: more than 4 transformer owners found, using the first 4')
+                context.record_warning('more than 4 transformer owners found, using the first 4', xfer['id'], 'more than 4 transformer owners found, using the first 4')
             for i,oid in enumerate(xfer_owners):
                 k = 'o{}'.format(i+1)
                 owners[k] = oid
@@ -1112,6 +1917,9 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
     psse_transformers.sort(key=lambda x: x.index)
 
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('generators')
     gen_index_lookup = {}
     if all('source_id' in gen for gen in cbt['generator']) and \
         all('source_id' in syn_cond for syn_cond in cbt['synchronous_condenser']):
@@ -1165,7 +1973,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         if gen['id'] in owner_index_lookup:
             gen_owners = owner_index_lookup[gen['id']]
             if len(gen_owners) > 4:
-                print_err('warning: more than 4 generator owners found, using the first 4')
+                context.record_warning('more than 4 generator owners found, using the first 4', gen['id'], 'more than 4 generator owners found, using the first 4')
             for i,oid in enumerate(gen_owners):
                 k = 'o{}'.format(i+1)
                 owners[k] = oid
@@ -1235,7 +2043,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         if syn_cond['id'] in owner_index_lookup:
             gen_owners = owner_index_lookup[syn_cond['id']]
             if len(gen_owners) > 4:
-                print_err('warning: more than 4 generator owners found, using the first 4')
+                context.record_warning('more than 4 generator owners found, using the first 4', syn_cond['id'], 'more than 4 generator owners found, using the first 4')
             for i,oid in enumerate(gen_owners):
                 k = 'o{}'.format(i+1)
                 owners[k] = oid
@@ -1281,6 +2089,9 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         del syn_cond
     psse_gens.sort(key=lambda x: x.index)
 
+    profile.stop()
+    context.check_cancelled()
+    profile.start('case')
     psse_ic = 0
     if 'ic' in network:
         psse_ic = network['ic']
@@ -1333,6 +2144,7 @@ def build_psse_case(grg_data, starting_point_map_id, switch_assignment_map_id):
         'induction_machines': [],
     }
     case = Case(**case_args)
+    profile.stop()
 
     return case
 
@@ -1343,10 +2155,11 @@ def psse_name(data, default_name, name_key = 'name', length=8):
         psse_name = data[name_key]
     return psse_name[:length]
 
-def test_idempotent(input_data_file, name):
-    case1 = parse_psse_case_file(input_data_file)
-    grg_data = case1.to_grg(name)
-    case2 = build_psse_case(grg_data, 'starting_points', 'breakers_assignment')
+def test_idempotent(input_data_file, name, diagnostics=None, context=None):
+    context = conversion_context(context, diagnostics)
+    case1 = parse_psse_case_file(input_data_file, context=context)
+    grg_data = case1.to_grg(name, context=context)
+    case2 = build_psse_case(grg_data, 'starting_points', 'breakers_assignment', context=context)
     return case1, case2
 
 
@@ -1359,30 +2172,50 @@ def main(args):
         args: an argparse data structure
     '''
 
-    #start = time.time()
+    profile = Profile() if args.profile is not None else None
+    diagnostics = Diagnostics() if args.aggregate_diagnostics else None
 
-    if args.file.endswith('.raw'):
-        name = args.file[:-4]
+    _main(args, ConversionContext(diagnostics, profile))
+
+    if profile is not None:
+        print_err(profile.to_json() if args.profile == 'json' else profile.table())
+
+
+def _main(args, context):
+    file_name = uncompressed_file_name(args.file)
+
+    diagnostics = context.diagnostics
+    profile = context.profile
+
+    if file_name.endswith('.raw'):
+        name = file_name[:-4]
 
         if not args.idempotent:
-            case = parse_psse_case_file(args.file)
+            cache = CaseCache(args.cache_dir) if args.cache_dir is not None else None
+            case = parse_psse_case_file(args.file, args.workers, args.input_mode, cache=cache, context=context)
             #print('internal PSSE representation:')
             #print(case)
-            #print(time.time() - start)
-            #start = time.time()
             print_err('')
 
             print_err('inferred network name: %s' % name)
-            grg_data = case.to_grg(name, args.omit_subtypes, args.skip_validation)
+            grg_data = case.to_grg(name, args.omit_subtypes, args.skip_validation, args.validation, args.validation_workers, context=context)
+            del case
+            if diagnostics is not None:
+                diagnostics.emit(context)
             if grg_data != None:
                 print_err('grg data representation:')
-                print(json.dumps(grg_data, sort_keys=True, indent=2, \
-                                 separators=(',', ': ')))
-                #print(time.time() - start)
+                with profile.phase('write'):
+                    if args.output is not None:
+                        with open_output_file(args.output) as output:
+                            write_grg_json(grg_data, output, True, args.compact, args.json_backend, args.float_precision)
+                    else:
+                        write_grg_json(grg_data, sys.stdout, True, args.compact, args.json_backend, args.float_precision)
                 print_err('')
             return
         else:
-            case1, case2 = test_idempotent(args.file, name)
+            case1, case2 = test_idempotent(args.file, name, context=context)
+            if diagnostics is not None:
+                diagnostics.emit(context)
             if case1 != case2:
                 diff(case1, case2)
                 #print(case1)
@@ -1391,12 +2224,13 @@ def main(args):
             return
 
 
-    if args.file.endswith('.json'):
+    if file_name.endswith('.json'):
         if args.idempotent:
             print('idempotent test only supported on PSSE files.')
             return
 
-        grg_data = parse_grg_case_file(args.file)
+        with profile.phase('parse'):
+            grg_data = parse_grg_case_file(args.file)
         #print('internal grg data representation:')
         #print(grg_data)
         #print('')
@@ -1412,10 +2246,13 @@ def main(args):
         #     network_name = grg_data['network'].keys()[0]
         #     case = build_psse_case_network(grg_data, network_name)
 
-        case = build_psse_case(grg_data, args.starting_point_mapping, args.switch_assignment_mapping)
+        case = build_psse_case(grg_data, args.starting_point_mapping, args.switch_assignment_mapping, context=context)
+        if diagnostics is not None:
+            diagnostics.emit(context)
 
         print('PSSE representation:')
-        print(case.to_psse())
+        with profile.phase('write'):
+            print(case.to_psse())
 
         print('')
         return
@@ -1424,6 +2261,9 @@ def main(args):
 
 
 def build_cli_parser():
+    # imported here, as only the command line needs it
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='''grg_psse2grg.%(prog)s is a tool for converting power 
             network dataset between the PSSE and GRG formats.
@@ -1431,12 +2271,23 @@ def build_cli_parser():
 
         epilog='''Please file bugs at...''',
     )
-    parser.add_argument('file', help='the data file to operate on (.raw|.json)')
+    parser.add_argument('file', help='the data file to operate on (.raw|.json), optionally compressed (.gz|.bz2|.xz)')
     parser.add_argument('-spm', '--starting-point-mapping', help='a grg starting point mapping to be use as a basis for the matpower case', default='starting_points')
     parser.add_argument('-sam', '--switch-assignment-mapping', help='a grg switch mapping to be use as a basis for the matpower case', default='breakers_assignment')
     parser.add_argument('-i', '--idempotent', help='tests the translation of a given matpower file is idempotent', action='store_true')
     parser.add_argument('-os', '--omit-subtypes', help='ommits optional component subtypes when translating from matpower to grg', default=False, action='store_true')
     parser.add_argument('-sv', '--skip-validation', help='skips the grg validation step when translating from matpower to grg', default=False, action='store_true')
+    parser.add_argument('-w', '--workers', help='parses large pss/e data sections in the given number of worker processes', type=int, default=None)
+    parser.add_argument('-im', '--input-mode', help='how pss/e files are read, mmap decodes lines from a memory mapped file as they are parsed', choices=psse_input_modes, default='stream')
+    parser.add_argument('-o', '--output', help='writes the grg data to the given file instead of standard out, compressed by a .gz, .bz2 or .xz extension', default=None)
+    parser.add_argument('-vm', '--validation', help='full validates grg data against the grg json schema, structural only checks ids, voltage links and pointers', choices=grg_validation_modes, default='full')
+    parser.add_argument('-p', '--profile', help='prints the time and peak memory of each conversion phase to stderr, as a table or as json', choices=['table', 'json'], default=None)
+    parser.add_argument('-ad', '--aggregate-diagnostics', help='reports each kind of conversion warning once, with a count and a few example ids, instead of once per component', default=False, action='store_true')
+    parser.add_argument('-vw', '--validation-workers', help='validates the grg network components against the json schema in the given number of worker processes', type=int, default=None)
+    parser.add_argument('-c', '--compact', help='writes grg json without line breaks or indentation', default=False, action='store_true')
+    parser.add_argument('-jb', '--json-backend', help='the json encoder for grg output, auto uses orjson when it is installed', choices=json_backends, default='json')
+    parser.add_argument('-fp', '--float-precision', help='rounds the floats in grg output to the given number of decimal places', type=int, default=None)
+    parser.add_argument('-cd', '--cache-dir', help='a directory for caching parsed pss/e cases between runs', default=None)
 
     #parser.add_argument('--foo', help='foo help')
     version = __import__('grg_psse2grg').__version__
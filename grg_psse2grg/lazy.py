@@ -0,0 +1,25 @@
+''' deferred imports of the heavy dependencies, such as grg_grgdata and
+jsonschema, so that importing grg_psse2grg and parsing pss/e data does not
+load them'''
+
+import importlib
+
+
+class LazyModule(object):
+    def __init__(self, name):
+        '''a stand-in for a module, which imports the module on the first
+        access of one of its attributes.  The accessed attributes are kept,
+        so later accesses are as fast as those of the module.
+
+        Args:
+            name (str): the absolute module name, such as grg_grgdata.common
+        '''
+        self._lazy_module_name = name
+
+    def __getattr__(self, name):
+        value = getattr(importlib.import_module(self._lazy_module_name), name)
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self):
+        return '<lazy module {}>'.format(self._lazy_module_name)
@@ -0,0 +1,187 @@
+''' timing and memory instrumentation of the phases of a conversion, such as
+the parsing of each pss/e section, the steps of Case.to_grg, writing the
+grg json and the stages of build_psse_case'''
+
+import collections
+import contextlib
+import json
+import time
+import tracemalloc
+
+
+def _reset_peak():
+    # tracemalloc.reset_peak is only available in python 3.9 and later,
+    # before that the peak of a nested phase includes the earlier phases
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+
+
+class PhaseStats(object):
+    def __init__(self, name):
+        '''the accumulated measurements of a phase
+
+        Args:
+            name (str): the phase name, with the names of the enclosing
+                phases as a / separated prefix, such as to_grg/validation
+        '''
+
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_memory = None
+
+    def as_dict(self):
+        '''Returns: the measurements as a dictionary, times in seconds and
+        the peak memory in bytes'''
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'peak_memory': self.peak_memory,
+        }
+
+
+class _ActivePhase(object):
+    __slots__ = ['name', 'wall_start', 'cpu_start', 'memory_start', 'peak']
+
+    def __init__(self, name, memory_start):
+        self.name = name
+        self.memory_start = memory_start
+        self.peak = memory_start
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+
+class Profile(object):
+    def __init__(self, trace_memory=True):
+        '''records the wall time, the cpu time of this process and the peak
+        memory of each phase of a conversion.  Phases may be nested and a
+        phase that runs more than once is accumulated.
+
+        The memory is measured with tracemalloc, which is started for the
+        outermost phase if it is not already tracing.  Tracing slows the
+        conversion down several times, so the times of a profile without
+        trace_memory are more representative.  The peak memory of a phase
+        is the largest amount of memory allocated while it ran, above the
+        allocated memory at its start.  The time and memory of worker
+        processes is not included.
+
+        tracemalloc is global to the process, so profiles with trace_memory
+        that run at the same time in several threads, such as conversions
+        in an executor of grg_psse2grg.aio, disturb each other: each one
+        measures the allocations of all of the threads and resets their
+        peaks.  The cpu time is also that of the whole process.
+
+        Args:
+            trace_memory (bool): measures the peak memory of each phase
+        '''
+
+        self.trace_memory = trace_memory
+        self.phases = collections.OrderedDict()
+        self._active = []
+        self._started_tracing = False
+
+    def start(self, name):
+        '''starts a phase, nested in the current phase if there is one'''
+
+        if len(self._active) > 0:
+            name = self._active[-1].name + '/' + name
+        if name not in self.phases:
+            self.phases[name] = PhaseStats(name)
+
+        memory_start = None
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if len(self._active) > 0:
+                parent = self._active[-1]
+                parent.peak = max(parent.peak, peak)
+            _reset_peak()
+            memory_start = current
+
+        self._active.append(_ActivePhase(name, memory_start))
+
+    def stop(self):
+        '''stops the current phase
+
+        Returns:
+            PhaseStats: the accumulated measurements of the stopped phase
+        '''
+
+        phase = self._active.pop()
+        wall_time = time.perf_counter() - phase.wall_start
+        cpu_time = time.process_time() - phase.cpu_start
+
+        stats = self.phases[phase.name]
+        stats.calls += 1
+        stats.wall_time += wall_time
+        stats.cpu_time += cpu_time
+
+        if phase.memory_start is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(phase.peak, peak)
+            stats.peak_memory = max(stats.peak_memory or 0, peak - phase.memory_start)
+            if len(self._active) > 0:
+                parent = self._active[-1]
+                parent.peak = max(parent.peak, peak)
+            elif self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            _reset_peak()
+
+        return stats
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''a context manager for a phase, the phases started within it and
+        not stopped, for example due to an exception, are stopped with it'''
+
+        depth = len(self._active)
+        self.start(name)
+        try:
+            yield self
+        finally:
+            while len(self._active) > depth:
+                self.stop()
+
+    def as_dict(self):
+        '''Returns: the measurements of all phases, in the order that they
+        were first started'''
+        return {'phases': [stats.as_dict() for stats in self.phases.values()]}
+
+    def to_json(self):
+        '''Returns: the measurements of all phases as json text'''
+        return json.dumps(self.as_dict(), indent=2)
+
+    def table(self):
+        '''Returns: the measurements of all phases as a text table'''
+
+        name_width = max([len('phase')] + [len(name) for name in self.phases])
+        row = '{:<' + str(name_width) + '} {:>6} {:>10} {:>10} {:>10}'
+        lines = [row.format('phase', 'calls', 'wall s', 'cpu s', 'peak MB')]
+        for stats in self.phases.values():
+            peak = '-' if stats.peak_memory is None else '{:.1f}'.format(stats.peak_memory/1e6)
+            lines.append(row.format(stats.name, stats.calls, '{:.3f}'.format(stats.wall_time),
+                '{:.3f}'.format(stats.cpu_time), peak))
+        return '\n'.join(lines)
+
+
+class _NullProfile(object):
+    '''a profile that records nothing, used when no profile is given'''
+
+    def start(self, name):
+        pass
+
+    def stop(self):
+        pass
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        yield self
+
+
+null_profile = _NullProfile()
@@ -0,0 +1,531 @@
+''' a long-running conversion server, which keeps the converter modules, the
+compiled grg schema validator and the parsed case cache warm in a pool of
+worker processes, for clients that convert many cases
+
+usage: python -m grg_psse2grg.server [-p port | -us socket_file]
+
+requests are http posts of a json object, with the content type
+application/json, to localhost or to a unix domain socket.  The files are
+paths on the host of the server, relative paths are relative to the input
+and the output root directories of the server, and paths outside of them
+are rejected:
+
+    POST /psse2grg    {"input": "case.raw", "output": "case.json", "options": {...}}
+    POST /grg2psse    {"input": "case.json", "output": "case.raw", "options": {...}}
+    POST /idempotent  {"input": "case.raw", "options": {...}}
+    GET  /status
+
+the options are the fields of grg_psse2grg.batch.BatchOptions named in
+request_option_names and override the options of the server for one
+request, the cache directory and the worker settings are options of the
+server only.  Requests whose Host header is not localhost are rejected, so
+that web pages cannot reach the server through a browser.  The response is
+a json object, the result of grg_psse2grg.batch.convert_file or
+check_idempotent.  When the request queue is full the server responds with
+status 503.
+'''
+
+from __future__ import print_function
+
+import concurrent.futures
+import concurrent.futures.process
+import contextlib
+import functools
+import http.client
+import http.server
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+import traceback
+
+import grg_pssedata.cmd
+
+from grg_psse2grg.batch import BatchOptions
+from grg_psse2grg.batch import convert_file
+from grg_psse2grg.context import ConversionContext
+from grg_psse2grg.diagnostics import Diagnostics
+from grg_psse2grg.io import json_backends
+from grg_psse2grg.io import test_idempotent
+from grg_psse2grg.io import uncompressed_file_name
+from grg_psse2grg.validation import grg_schema_validator
+from grg_psse2grg.validation import grg_validation_modes
+
+print_err = functools.partial(print, file=sys.stderr)
+
+default_port = 8642
+
+# the input file extension of each conversion
+server_conversions = {'psse2grg': '.raw', 'grg2psse': '.json'}
+
+# the fields of BatchOptions that a request may override
+request_option_names = ['validation', 'omit_subtypes', 'compact', 'json_backend', 'float_precision', 'starting_point_mapping', 'switch_assignment_mapping']
+
+# the values of the Host header of local clients, without the port
+local_hosts = ['localhost', '127.0.0.1', '[::1]']
+
+
+def check_idempotent(input_file, options):
+    '''converts a pss/e file to grg and back, and compares the cases
+
+    Args:
+        input_file (str): the .raw file, possibly compressed
+        options (BatchOptions): the conversion options
+    Returns:
+        dict: the input file, the status, ok or failed, the error of a
+            failed check, idempotent, the number and the description of
+            the differences, the time in seconds and the warnings
+    '''
+
+    result = {
+        'input': input_file,
+        'status': 'failed',
+        'error': None,
+        'idempotent': None,
+        'differences': None,
+        'diff': None,
+        'seconds': 0.0,
+        'warnings': [],
+    }
+
+    start = time.perf_counter()
+    context = ConversionContext(Diagnostics(), capture_warnings=True)
+    try:
+        case1, case2 = test_idempotent(input_file, uncompressed_file_name(input_file)[:-4], context=context)
+        # grg_pssedata.cmd.diff prints the differences
+        diff_output = io.StringIO()
+        with contextlib.redirect_stdout(diff_output):
+            differences = grg_pssedata.cmd.diff(case1, case2)
+
+        result['warnings'] = [text for category, text in context.diagnostics.summary()]
+        result['warnings'].extend(message for message, category in context.warnings)
+        result['idempotent'] = case1 == case2
+        result['differences'] = differences
+        result['diff'] = diff_output.getvalue()
+        result['status'] = 'ok'
+    except Exception as error:
+        result['error'] = '{}: {}'.format(type(error).__name__, error)
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = time.perf_counter() - start
+
+    return result
+
+
+def _init_worker(quiet):
+    if quiet:
+        # the parser and the idempotency check report on stdout and stderr
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        os.close(devnull)
+    grg_schema_validator()
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+class QueueFullError(Exception):
+    '''raised when a request is submitted while all of the workers are busy
+    and the request queue is full'''
+    pass
+
+
+class ConversionService(object):
+    def __init__(self, workers=None, queue_size=16, options=None, quiet=True):
+        '''runs conversion requests in a pool of long-lived worker processes,
+        each worker compiles the grg schema validator once at its start
+
+        Args:
+            workers (int): the number of worker processes, by default the
+                number of cpus
+            queue_size (int): the number of requests that may wait for a
+                worker, further requests are rejected
+            options (BatchOptions): the default conversion options
+            quiet (bool): discards the progress messages of the workers
+        '''
+
+        if queue_size < 0:
+            raise ValueError('the queue size must not be negative, given {}'.format(queue_size))
+
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue_size = queue_size
+        self.options = BatchOptions() if options is None else options
+
+        self._quiet = quiet
+        self._executor = self._new_executor()
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._lock = threading.Lock()
+        self._start_time = time.time()
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _new_executor(self):
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self._quiet,))
+
+    def _restart_workers(self, executor):
+        # a worker that died, such as by the oom killer, breaks the pool for
+        # all later requests, so the broken pool is replaced once
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._new_executor()
+            self.restarts += 1
+        executor.shutdown(wait=False)
+
+    def warm_up(self):
+        '''starts the worker processes, which load the modules and compile
+        the grg schema validator, before the first request'''
+        futures = [self._executor.submit(_worker_pid) for worker in range(0, self.workers)]
+        concurrent.futures.wait(futures)
+
+    def request_options(self, options):
+        '''Args:
+            options (dict): fields of BatchOptions
+        Returns:
+            BatchOptions: the options of the service updated with the given
+                options, raises ValueError for options that are not in
+                request_option_names or are invalid
+        '''
+
+        if not isinstance(options, dict):
+            raise ValueError('the options must be a json object, given {}'.format(options))
+
+        merged = dict(vars(self.options))
+        for name, value in options.items():
+            if name not in request_option_names:
+                raise ValueError('option {} may not be given in a request, must be one of {}'.format(name, request_option_names))
+            merged[name] = value
+
+        if merged['validation'] not in grg_validation_modes:
+            raise ValueError('validation {} given, must be one of {}'.format(merged['validation'], grg_validation_modes))
+        if merged['json_backend'] not in json_backends:
+            raise ValueError('json backend {} given, must be one of {}'.format(merged['json_backend'], json_backends))
+        for name in ['omit_subtypes', 'compact']:
+            if not isinstance(merged[name], bool):
+                raise ValueError('option {} must be true or false, given {}'.format(name, merged[name]))
+        for name in ['starting_point_mapping', 'switch_assignment_mapping']:
+            if not isinstance(merged[name], str):
+                raise ValueError('option {} must be a string, given {}'.format(name, merged[name]))
+        precision = merged['float_precision']
+        if precision is not None and (isinstance(precision, bool) or not isinstance(precision, int)):
+            raise ValueError('option float_precision must be an integer or null, given {}'.format(precision))
+
+        return BatchOptions(**merged)
+
+    def run(self, function, *args):
+        '''runs a function in a worker process and waits for its result
+
+        Returns:
+            the result of the function, raises QueueFullError when no
+            worker and no place in the request queue is free.  When a worker
+            process dies, its requests fail and the pool is restarted for
+            the later requests.
+        '''
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError('{} requests are running or waiting'.format(self.workers + self.queue_size))
+
+        with self._lock:
+            self.active += 1
+            executor = self._executor
+        try:
+            result = executor.submit(function, *args).result()
+        except concurrent.futures.process.BrokenProcessPool:
+            self._restart_workers(executor)
+            with self._lock:
+                self.failed += 1
+            raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._slots.release()
+
+        with self._lock:
+            if result['status'] == 'ok':
+                self.completed += 1
+            else:
+                self.failed += 1
+        return result
+
+    def status(self):
+        '''Returns: the configuration and the request counts of the service'''
+        with self._lock:
+            return {
+                'version': __import__('grg_psse2grg').__version__,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'uptime': time.time() - self._start_time,
+                'active': self.active,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'restarts': self.restarts,
+            }
+
+    def close(self):
+        with self._lock:
+            executor = self._executor
+        executor.shutdown()
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    server_version = 'grg_psse2grg'
+
+    def address_string(self):
+        # the clients of a unix domain socket have no address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return 'unix socket'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            http.server.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _respond(self, code, data):
+        body = json.dumps(data, sort_keys=True).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _local_host(self):
+        # a web page can send requests to localhost through a browser, but
+        # then the Host header names the site of the page
+        host = self.headers.get('Host', '')
+        if host.startswith('['):
+            host = host[:host.find(']')+1]
+        else:
+            host = host.split(':')[0]
+        return host in local_hosts
+
+    def _root_path(self, file_name, root):
+        path = os.path.realpath(os.path.join(root, file_name))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError('the file {} is not in the directory {}'.format(file_name, root))
+        return path
+
+    def do_GET(self):
+        if not self._local_host():
+            self._respond(403, {'error': 'the host {} is not localhost'.format(self.headers.get('Host'))})
+            return
+        if self.path == '/status':
+            self._respond(200, self.server.service.status())
+        else:
+            self._respond(404, {'error': 'unknown path {}, use /status'.format(self.path)})
+
+    def do_POST(self):
+        operation = self.path.strip('/')
+        if operation not in server_conversions and operation != 'idempotent':
+            self._respond(404, {'error': 'unknown path {}, use /psse2grg, /grg2psse or /idempotent'.format(self.path)})
+            return
+
+        if not self._local_host():
+            self._respond(403, {'error': 'the host {} is not localhost'.format(self.headers.get('Host'))})
+            return
+        if self.headers.get_content_type() != 'application/json':
+            self._respond(415, {'error': 'the content type must be application/json, given {}'.format(self.headers.get('Content-Type'))})
+            return
+
+        service = self.server.service
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            if not isinstance(request, dict) or 'input' not in request:
+                raise ValueError('the request must be a json object with an input file')
+            options = service.request_options(request.get('options', {}))
+
+            input_file = self._root_path(request['input'], self.server.input_root)
+            expected_extension = server_conversions.get(operation, '.raw')
+            if not uncompressed_file_name(input_file).endswith(expected_extension):
+                raise ValueError('{} requires a {} input file, given {}'.format(operation, expected_extension, request['input']))
+            if not os.path.isfile(input_file):
+                raise ValueError('the input file {} does not exist'.format(request['input']))
+
+            if operation == 'idempotent':
+                function, args = check_idempotent, (input_file, options)
+            else:
+                if 'output' not in request:
+                    raise ValueError('{} requires an output file'.format(operation))
+                output_file = self._root_path(request['output'], self.server.output_root)
+                if output_file == input_file:
+                    raise ValueError('the output file is the input file {}'.format(request['input']))
+                function, args = convert_file, (input_file, output_file, options)
+        except (ValueError, TypeError) as error:
+            self._respond(400, {'error': str(error)})
+            return
+
+        try:
+            result = service.run(function, *args)
+        except QueueFullError as error:
+            self._respond(503, {'error': str(error)})
+            return
+        except Exception as error:
+            self._respond(500, {'error': 'the worker process failed, {}: {}'.format(type(error).__name__, error)})
+            return
+
+        self._respond(200, result)
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def build_server(service, port=default_port, unix_socket=None, verbose=False, input_root=None, output_root=None):
+    '''Args:
+        service (ConversionService): runs the requests
+        port (int): the localhost port, 0 picks a free port
+        unix_socket (str): the path of a unix domain socket, used instead
+            of the port when given.  A socket left at the path by an earlier
+            server is removed, raises ValueError when the path is another
+            kind of file
+        verbose (bool): logs each request on stderr
+        input_root (str): the directory of the input files of the requests,
+            the current directory by default
+        output_root (str): the directory of the output files of the
+            requests, the current directory by default
+    Returns:
+        a socketserver server, which handles each connection in a thread and
+        runs the conversions in the workers of the service
+    '''
+
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            if not stat.S_ISSOCK(os.stat(unix_socket).st_mode):
+                raise ValueError('{} exists and is not a unix domain socket'.format(unix_socket))
+            os.remove(unix_socket)
+        server = _UnixHTTPServer(unix_socket, _RequestHandler)
+    else:
+        server = _HTTPServer(('127.0.0.1', port), _RequestHandler)
+    server.service = service
+    server.verbose = verbose
+    server.input_root = os.path.realpath(os.getcwd() if input_root is None else input_root)
+    server.output_root = os.path.realpath(os.getcwd() if output_root is None else output_root)
+    return server
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, unix_socket, timeout=None):
+        http.client.HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self.unix_socket = unix_socket
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_socket)
+
+
+def send_request(path, request=None, port=default_port, unix_socket=None, timeout=None):
+    '''sends a request to a conversion server
+
+    Args:
+        path (str): /psse2grg, /grg2psse, /idempotent or /status
+        request (dict): the json object of a post, status is requested
+            with a get when this is None
+        port (int): the localhost port of the server
+        unix_socket (str): the unix domain socket of the server
+        timeout (float): the socket timeout in seconds
+    Returns:
+        (int, dict): the http status and the json response
+    '''
+
+    if unix_socket is not None:
+        connection = _UnixHTTPConnection(unix_socket, timeout)
+    else:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+
+    try:
+        if request is None:
+            connection.request('GET', path)
+        else:
+            body = json.dumps(request).encode('utf-8')
+            connection.request('POST', path, body, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+    finally:
+        connection.close()
+
+
+def main(args):
+    '''runs a conversion server until it is interrupted
+
+    Args:
+        args: an argparse data structure
+    '''
+
+    options = BatchOptions(args.validation, args.omit_subtypes, args.compact,
+        args.json_backend, args.float_precision, args.starting_point_mapping,
+        args.switch_assignment_mapping, args.cache_dir)
+    service = ConversionService(args.workers, args.queue_size, options, not args.verbose)
+    server = build_server(service, args.port, args.unix_socket, args.verbose, args.input_root, args.output_root)
+
+    try:
+        service.warm_up()
+        if args.unix_socket is not None:
+            print_err('serving on unix socket {}'.format(args.unix_socket))
+        else:
+            print_err('serving on http://127.0.0.1:{}'.format(server.server_address[1]))
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.unix_socket is not None and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+
+
+def build_cli_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='''grg_psse2grg.%(prog)s serves conversions between the
+            pss/e and grg formats and idempotency checks on localhost or a
+            unix domain socket''',
+    )
+    parser.add_argument('-p', '--port', help='the localhost port', type=int, default=default_port)
+    parser.add_argument('-us', '--unix-socket', help='serves on the given unix domain socket instead of a port', default=None)
+    parser.add_argument('-ir', '--input-root', help='the directory of the input files of the requests, the current directory by default', default=None)
+    parser.add_argument('-or', '--output-root', help='the directory of the output files of the requests, the current directory by default', default=None)
+    parser.add_argument('-w', '--workers', help='the number of worker processes, the number of cpus by default', type=int, default=None)
+    parser.add_argument('-q', '--queue-size', help='the number of requests that may wait for a worker, further requests are rejected', type=int, default=16)
+    parser.add_argument('-spm', '--starting-point-mapping', help='a grg starting point mapping to be use as a basis for the psse case', default='starting_points')
+    parser.add_argument('-sam', '--switch-assignment-mapping', help='a grg switch mapping to be use as a basis for the psse case', default='breakers_assignment')
+    parser.add_argument('-os', '--omit-subtypes', help='ommits optional component subtypes when translating from psse to grg', default=False, action='store_true')
+    parser.add_argument('-vm', '--validation', help='full validates grg data against the grg json schema, structural only checks ids, voltage links and pointers', choices=grg_validation_modes, default='full')
+    parser.add_argument('-c', '--compact', help='writes grg json without line breaks or indentation', default=False, action='store_true')
+    parser.add_argument('-jb', '--json-backend', help='the json encoder for grg output, auto uses orjson when it is installed', choices=json_backends, default='json')
+    parser.add_argument('-fp', '--float-precision', help='rounds the floats in grg output to the given number of decimal places', type=int, default=None)
+    parser.add_argument('-cd', '--cache-dir', help='caches parsed pss/e cases in the given directory, shared by the workers', default=None)
+    parser.add_argument('-vb', '--verbose', help='logs each request and keeps the progress messages of the workers on stderr', default=False, action='store_true')
+
+    version = __import__('grg_psse2grg').__version__
+    parser.add_argument('-v', '--version', action='version', \
+        version='grg_psse2grg.%(prog)s (version '+version+')')
+
+    return parser
+
+
+if __name__ == '__main__':
+    parser = build_cli_parser()
+    main(parser.parse_args())
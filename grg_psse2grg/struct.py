@@ -3,7 +3,6 @@ support grg data encoding'''
 
 import inspect, json, math
 
-import warnings
 
 # from grg_mpdata.exception import MPDataValidationError
 from grg_psse2grg.exception import PSSE2GRGWarning
@@ -11,8 +10,14 @@ from grg_psse2grg.exception import PSSE2GRGWarning
 import grg_pssedata.struct
 # from grg_mpdata.struct import _guard_none
 
-from grg_grgdata.cmd import validate_grg
-import grg_grgdata.common as grg_common
+from grg_psse2grg.validation import grg_validation_modes
+from grg_psse2grg.validation import validate_grg_data
+from grg_psse2grg.validation import check_grg_structure
+from grg_psse2grg.context import conversion_context
+from grg_psse2grg.lazy import LazyModule
+
+# grg_grgdata is imported on the first translation to grg
+grg_common = LazyModule('grg_grgdata.common')
 
 grg_description_preamble = 'Translated from PSS/E v33 data by grg-psse2grg.  Source file description:'
 
@@ -20,10 +25,36 @@ default_voltage_angle_difference = 0.5236 # 30 deg. in rad
 
 # TODO data format strings below should come from grg-grgdata project 
 class Case(grg_pssedata.struct.Case):
-
-    def to_grg(self, network_id, omit_subtype=False, skip_validation=False):
-        '''Returns: an encoding of this data structure as a grg data dictionary'''
-        #start = time.time()
+    # the component lists of a case, in the order of component_lists
+    section_names = ['buses', 'loads', 'fixed_shunts', 'generators',
+        'branches', 'transformers', 'areas', 'tt_dc_lines', 'vsc_dc_lines',
+        'transformer_corrections', 'mt_dc_lines', 'line_groupings', 'zones',
+        'transfers', 'owners', 'facts', 'switched_shunts', 'gnes',
+        'induction_machines']
+
+    def to_grg(self, network_id, omit_subtype=False, skip_validation=False, validation='full', validation_workers=None, diagnostics=None, profile=None, context=None):
+        '''Returns: an encoding of this data structure as a grg data dictionary
+
+        Args:
+            validation (str): full checks the grg json schema and the
+                structural invariants, structural only checks the latter,
+                see grg_psse2grg.validation
+            validation_workers (int): the number of worker processes for
+                checking the network components against the json schema
+            diagnostics (Diagnostics): collects the per component warnings,
+                which are otherwise issued one by one, see
+                grg_psse2grg.diagnostics
+            profile (Profile): records the time and memory of the lookup,
+                components, mappings and validation phases, see
+                grg_psse2grg.profiling
+            context (ConversionContext): receives the warnings and the
+                validation errors, and gives the diagnostics and the profile
+                instead of the diagnostics and profile arguments, see
+                grg_psse2grg.context
+        '''
+
+        if validation not in grg_validation_modes:
+            raise ValueError('validation mode {} given, must be one of {}'.format(validation, grg_validation_modes))
 
         data = {}
 
@@ -42,33 +73,43 @@ class Case(grg_pssedata.struct.Case):
         base_mva = self.sbase
         network['ic'] = self.ic
 
-        comp_lookup = self._grg_component_lookup()
-
-        network_components, groups, switch_status = self._grg_components(comp_lookup, base_mva, omit_subtype)
-        network['components'] = network_components
-        data['groups'] = groups
-        data['mappings'] = self._grg_mappings(comp_lookup, switch_status, base_mva)
-        data['market'] = self._grg_market(comp_lookup, base_mva)
-        data['operation_constraints'] = self._grg_operations(comp_lookup)
-
-
-        if skip_validation:
-            return data
-
-        #return data
-        #print(time.time() - start)
-        #start = time.time()
-        #print('start validation')
-        if validate_grg(data):
+        context = conversion_context(context, diagnostics, profile)
+        profile = context.profile
+
+        with profile.phase('to_grg'):
+            with profile.phase('lookup'):
+                comp_lookup = self._grg_component_lookup()
+
+            context.check_cancelled()
+            with profile.phase('components'):
+                network_components, groups, switch_status = self._grg_components(comp_lookup, base_mva, omit_subtype, context)
+            network['components'] = network_components
+            data['groups'] = groups
+            context.check_cancelled()
+            with profile.phase('mappings'):
+                data['mappings'] = self._grg_mappings(comp_lookup, switch_status, base_mva)
+                data['market'] = self._grg_market(comp_lookup, base_mva)
+                data['operation_constraints'] = self._grg_operations(comp_lookup)
+
+            if skip_validation:
+                return data
+
+            context.check_cancelled()
+            with profile.phase('validation'):
+                if validation == 'structural':
+                    valid = check_grg_structure(data, context)
+                else:
+                    valid = validate_grg_data(data, validation_workers, context)
+
+        if valid:
             #print('VALID ****')
-            #print(time.time() - start)
             return data
         else:
-            print('incorrect grg data representation.')
-            print(json.dumps(data, sort_keys=True, indent=2, \
+            context.report('incorrect grg data representation.')
+            context.report(json.dumps(data, sort_keys=True, indent=2, \
                                  separators=(',', ': ')))
-            print('This is a bug in grg_psse2grg')
-            print('')
+            context.report('This is a bug in grg_psse2grg')
+            context.report('')
         return None
 
 
@@ -157,7 +198,7 @@ class Case(grg_pssedata.struct.Case):
         return lookup
 
 
-    def _grg_components(self, lookup, base_mva, omit_subtype=False):
+    def _grg_components(self, lookup, base_mva, omit_subtype, context):
         components = {}
         groups = {}
 
@@ -227,7 +268,7 @@ class Case(grg_pssedata.struct.Case):
 
 
         for bus in self.buses:
-            bus_data = bus.to_grg_bus(lookup)
+            bus_data = bus.to_grg_bus(lookup, context=context)
             grg_bus_id = lookup['bus'][bus.i]
             grg_vl_id = lookup['voltage_level'][bus.i]
             voltage_levels[grg_vl_id]['voltage_points'].append(lookup['voltage'][bus.i])
@@ -238,17 +279,17 @@ class Case(grg_pssedata.struct.Case):
             if bus.area in lookup['area']:
                 groups[lookup['area'][bus.area]]['component_ids'].append(grg_bus_id)
             else:
-                warnings.warn('area id %s in bus %s was found in the areas table.' % (str(bus.area), str(bus.i)), PSSE2GRGWarning)
+                context.record_warning('bus area ids were not found in the areas table', bus.i, 'area id %s in bus %s was not found in the areas table.' % (str(bus.area), str(bus.i)), PSSE2GRGWarning)
 
             if bus.zone in lookup['zone']:
                 groups[lookup['zone'][bus.zone]]['component_ids'].append(grg_bus_id)
             else:
-                warnings.warn('zone id %s in bus %s was found in the areas table.' % (str(bus.zone), str(bus.i)), PSSE2GRGWarning)
+                context.record_warning('bus zone ids were not found in the zones table', bus.i, 'zone id %s in bus %s was not found in the zones table.' % (str(bus.zone), str(bus.i)), PSSE2GRGWarning)
 
             if bus.owner in lookup['owner']:
                 groups[lookup['owner'][bus.owner]]['component_ids'].append(grg_bus_id)
             else:
-                warnings.warn('owner id %s in bus %s was found in the owners table.' % (str(bus.owner), str(bus.i)), PSSE2GRGWarning)
+                context.record_warning('bus owner ids were not found in the owners table', bus.i, 'owner id %s in bus %s was not found in the owners table.' % (str(bus.owner), str(bus.i)), PSSE2GRGWarning)
 
 
         for load in self.loads:
@@ -355,26 +396,19 @@ class Case(grg_pssedata.struct.Case):
 
 
         # cluster buses into substations based on transformers
-        bus_sub = {}
-        for bus in self.buses:
-            bus_id = bus.i
-            bus_sub[bus_id] = set([bus_id])
-
+        transformer_buses = []
         for transformer in self.transformers:
             if not transformer.is_three_winding():
-                bus_id_set = bus_sub[transformer.p1.i] | bus_sub[transformer.p1.j]
+                transformer_buses.append((transformer.p1.i, transformer.p1.j))
             else: # must be three-winding
-                bus_id_set = bus_sub[transformer.p1.i] | bus_sub[transformer.p1.j] | bus_sub[transformer.p1.k]
+                transformer_buses.append((transformer.p1.i, transformer.p1.j, transformer.p1.k))
 
-            for bus_id in bus_id_set:
-                bus_sub[bus_id] = bus_id_set
-
-        sub_buses = {frozenset(buses) for buses in bus_sub.values()}
+        sub_buses = cluster_buses([bus.i for bus in self.buses], transformer_buses)
 
         lookup['substation'] = {}
         substations = {}
         zeros = int(math.ceil(math.log(len(self.buses), 10)))
-        for index, buses in enumerate(sorted(sub_buses, key=lambda x: min(x))):
+        for index, buses in enumerate(sub_buses):
             grg_ss_id = grg_common.substation_name_template % str(index+1).zfill(zeros)
             #print(grg_ss_id, buses)
             components[grg_ss_id] = {
@@ -768,12 +802,128 @@ class Case(grg_pssedata.struct.Case):
         return switch_1, grg_switch_voltage_id_1, switch_2, grg_switch_voltage_id_2
 
 
+def cluster_buses(bus_ids, bus_groups):
+    '''partitions buses into the connected clusters formed by groups of
+    buses, such as the buses of each transformer, using a disjoint-set with
+    union by size and path halving
+
+    Args:
+        bus_ids (list): the bus ids to partition
+        bus_groups (list): tuples of bus ids in the same cluster
+    Returns:
+        list: the clusters as sorted lists of bus ids, ordered by their
+            smallest bus id
+    '''
+
+    parent = {bus_id: bus_id for bus_id in bus_ids}
+    size = {bus_id: 1 for bus_id in bus_ids}
+
+    def find(bus_id):
+        while parent[bus_id] != bus_id:
+            parent[bus_id] = parent[parent[bus_id]]
+            bus_id = parent[bus_id]
+        return bus_id
+
+    for bus_group in bus_groups:
+        root = find(bus_group[0])
+        for bus_id in bus_group[1:]:
+            other_root = find(bus_id)
+            if other_root == root:
+                continue
+            if size[other_root] > size[root]:
+                root, other_root = other_root, root
+            parent[other_root] = root
+            size[root] += size[other_root]
+
+    clusters = {}
+    for bus_id in parent:
+        clusters.setdefault(find(bus_id), []).append(bus_id)
+
+    return sorted((sorted(buses) for buses in clusters.values()), key=lambda buses: buses[0])
+
+
+class _LazySection(object):
+    '''a case attribute holding a component list that is only built, by
+    the case's section loader, when it is first accessed'''
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, case, owner):
+        if case is None:
+            return self
+        if self.name not in case._sections:
+            case._sections[self.name] = case._section_loaders.pop(self.name)()
+        return case._sections[self.name]
+
+    def __set__(self, case, value):
+        case._sections[self.name] = value
+        case._section_loaders.pop(self.name, None)
+
+
+class LazyCase(Case):
+    def __init__(self, ic, sbase, rev, xfrrat, nxfrat, basfrq, record1, record2, section_loaders):
+        '''a case whose component lists are built on first access, so that
+        jobs using a few sections only pay for parsing those sections
+
+        Args:
+            section_loaders (dict): a function without arguments returning
+                the component list of each name in section_names
+        '''
+
+        self._sections = {}
+        self._section_loaders = {}
+        Case.__init__(self, ic, sbase, rev, xfrrat, nxfrat, basfrq, record1,
+            record2, *[[] for name in self.section_names])
+
+        self._sections = {}
+        self._section_loaders = dict(section_loaders)
+        for name in self.section_names:
+            if name not in self._section_loaders:
+                raise ValueError('no section loader given for {}'.format(name))
+
+    @property
+    def loaded_sections(self):
+        '''Returns: the names of the component lists that have been built'''
+        return [name for name in self.section_names if name in self._sections]
+
+    @property
+    def component_lists(self):
+        return [getattr(self, name) for name in self.section_names]
+
+    @component_lists.setter
+    def component_lists(self, value):
+        pass # assigned by Case.__init__, here it is derived from the sections
+
+    def materialize(self):
+        '''Returns: a Case with all of the component lists of this case'''
+        return Case(self.ic, self.sbase, self.rev, self.xfrrat, self.nxfrat,
+            self.basfrq, self.record1, self.record2, *self.component_lists)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyCase):
+            other = other.materialize()
+        if isinstance(other, Case):
+            return self.materialize() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+for name in LazyCase.section_names:
+    setattr(LazyCase, name, _LazySection(name))
+
+
 class Bus(grg_pssedata.struct.Bus):
-    def to_grg_bus(self, lookup, omit_subtype=False):
-        '''Returns: a grg data bus name and data as a dictionary'''
+    def to_grg_bus(self, lookup, omit_subtype=False, context=None):
+        '''Returns: a grg data bus name and data as a dictionary, the
+        warnings are reported to the given ConversionContext'''
 
         if omit_subtype:
-            warnings.warn('attempted to omit subtype on bus \'%s\', but this is not allowed.' % str(self.i), PSSE2GRGWarning)
+            conversion_context(context).record_warning('attempted to omit the subtype of buses, but this is not allowed', self.i, 'attempted to omit subtype on bus \'%s\', but this is not allowed.' % str(self.i), PSSE2GRGWarning)
 
         data = {
             'source_id': str(self.i),
@@ -1266,3 +1416,103 @@ class Owner(grg_pssedata.struct.Owner):
     def to_grg_owner(self):
         assert(False)
 
+
+
+def _record_values(record):
+    '''Returns: the field values of a regular or a compact record as a dictionary'''
+    if hasattr(record, '__slots__'):
+        return {field: getattr(record, field) for field in record.__slots__}
+    return vars(record)
+
+
+def _compact_record_eq(self, other):
+    if isinstance(other, (type(self), self.record_class)):
+        return _record_values(self) == _record_values(other)
+    return NotImplemented
+
+
+def _compact_record_ne(self, other):
+    equal = _compact_record_eq(self, other)
+    if equal is NotImplemented:
+        return equal
+    return not equal
+
+
+def _compact_record_class(record_class):
+    '''builds a variant of a component class that stores its fields in
+    __slots__ instead of a per-instance __dict__.  The variant has all of
+    the methods of the given class, but it is not a subclass of it, since a
+    subclass would inherit the __dict__.  The fields are the arguments of
+    the class's constructor, which assigns each one to an attribute of the
+    same name.  Compact and regular records with the same values are equal.
+
+    Args:
+        record_class (type): a component class, such as Bus
+    Returns:
+        type: the compact variant of the given class
+    '''
+
+    namespace = {}
+    for base in reversed(record_class.__mro__[:-1]):
+        namespace.update(vars(base))
+    for name in ['__dict__', '__weakref__']:
+        namespace.pop(name, None)
+
+    name = 'Compact' + record_class.__name__
+    namespace.update({
+        '__module__': __name__,
+        '__qualname__': name,
+        '__slots__': tuple(list(inspect.signature(record_class.__init__).parameters)[1:]),
+        '__eq__': _compact_record_eq,
+        '__ne__': _compact_record_ne,
+        'record_class': record_class,
+    })
+    return type(name, (object,), namespace)
+
+
+CompactBus = _compact_record_class(Bus)
+CompactLoad = _compact_record_class(Load)
+CompactFixedShunt = _compact_record_class(FixedShunt)
+CompactSwitchedShunt = _compact_record_class(SwitchedShunt)
+CompactGenerator = _compact_record_class(Generator)
+CompactBranch = _compact_record_class(Branch)
+CompactTwoWindingTransformer = _compact_record_class(TwoWindingTransformer)
+CompactThreeWindingTransformer = _compact_record_class(ThreeWindingTransformer)
+CompactTransformerParametersFirstLine = _compact_record_class(grg_pssedata.struct.TransformerParametersFirstLine)
+CompactTransformerParametersSecondLine = _compact_record_class(grg_pssedata.struct.TransformerParametersSecondLine)
+CompactTransformerParametersSecondLineShort = _compact_record_class(grg_pssedata.struct.TransformerParametersSecondLineShort)
+CompactTransformerWinding = _compact_record_class(grg_pssedata.struct.TransformerWinding)
+CompactTransformerWindingShort = _compact_record_class(grg_pssedata.struct.TransformerWindingShort)
+
+# the classes the parser builds each kind of record with
+record_classes = {
+    'Bus': Bus,
+    'Load': Load,
+    'FixedShunt': FixedShunt,
+    'SwitchedShunt': SwitchedShunt,
+    'Generator': Generator,
+    'Branch': Branch,
+    'TwoWindingTransformer': TwoWindingTransformer,
+    'ThreeWindingTransformer': ThreeWindingTransformer,
+    'TransformerParametersFirstLine': grg_pssedata.struct.TransformerParametersFirstLine,
+    'TransformerParametersSecondLine': grg_pssedata.struct.TransformerParametersSecondLine,
+    'TransformerParametersSecondLineShort': grg_pssedata.struct.TransformerParametersSecondLineShort,
+    'TransformerWinding': grg_pssedata.struct.TransformerWinding,
+    'TransformerWindingShort': grg_pssedata.struct.TransformerWindingShort,
+}
+
+compact_record_classes = {
+    'Bus': CompactBus,
+    'Load': CompactLoad,
+    'FixedShunt': CompactFixedShunt,
+    'SwitchedShunt': CompactSwitchedShunt,
+    'Generator': CompactGenerator,
+    'Branch': CompactBranch,
+    'TwoWindingTransformer': CompactTwoWindingTransformer,
+    'ThreeWindingTransformer': CompactThreeWindingTransformer,
+    'TransformerParametersFirstLine': CompactTransformerParametersFirstLine,
+    'TransformerParametersSecondLine': CompactTransformerParametersSecondLine,
+    'TransformerParametersSecondLineShort': CompactTransformerParametersSecondLineShort,
+    'TransformerWinding': CompactTransformerWinding,
+    'TransformerWindingShort': CompactTransformerWindingShort,
+}
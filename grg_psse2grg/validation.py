@@ -0,0 +1,192 @@
+''' validation of the grg data built by Case.to_grg, with the grg json
+schema compiled once per process, and a structural check of the
+invariants that the translation can break, without the json schema'''
+
+import itertools
+import json
+
+from grg_psse2grg.context import conversion_context
+from grg_psse2grg.lazy import LazyModule
+
+# jsonschema and grg_grgdata are imported on the first validation
+jsonschema_exceptions = LazyModule('jsonschema.exceptions')
+jsonschema_validators = LazyModule('jsonschema.validators')
+grg_common = LazyModule('grg_grgdata.common')
+grg_cmd = LazyModule('grg_grgdata.cmd')
+
+# concurrent.futures loads logging, it is only needed with workers
+concurrent_futures = LazyModule('concurrent.futures')
+
+grg_validation_modes = ['full', 'structural']
+
+valid_grg_versions = ['v.1.6', 'v.2.0', 'v.3.0', 'v.4.0', 'v.4.1']
+
+# the network components are only validated in worker processes when
+# there are at least this many of them
+parallel_validation_min_components = 1000
+
+_grg_schema_validator = None
+_component_schema_validators = {}
+
+
+def grg_schema_validator():
+    '''Returns: a jsonschema validator for the grg json schema, the schema is
+    parsed and checked on the first call and the validator is reused'''
+    global _grg_schema_validator
+    if _grg_schema_validator is None:
+        schema = json.loads(grg_common.grg_schema)
+        validator_class = jsonschema_validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        _grg_schema_validator = validator_class(schema)
+    return _grg_schema_validator
+
+
+def _component_schema_validator(network_subtype):
+    '''Returns: a jsonschema validator for the network components of the
+    given network subtype, such as bus_breaker, built once per process'''
+    if network_subtype not in _component_schema_validators:
+        schema = dict(grg_schema_validator().schema)
+        # draft 4 ignores the siblings of a $ref, the definitions remain
+        # available for resolving the references
+        schema['$ref'] = '#/network/{}/network_components'.format(network_subtype)
+        _component_schema_validators[network_subtype] = type(grg_schema_validator())(schema)
+    return _component_schema_validators[network_subtype]
+
+
+def _validate_components(network_subtype, components):
+    '''Returns: the message and the path of the best matching schema error
+    of the given network components, or None if they are valid'''
+    error = jsonschema_exceptions.best_match(_component_schema_validator(network_subtype).iter_errors(components))
+    if error is None:
+        return None
+    return error.message, ['network', 'components'] + list(error.path)
+
+
+def _validate_grg_schema_parallel(grg_data, workers):
+    '''validates the document without its network components in this
+    process and the components, in chunks, in a pool of worker processes
+
+    Returns:
+        list: the (message, path) of the best matching error of the document
+            and of each invalid chunk of components, in document order
+    '''
+
+    network = grg_data['network']
+    skeleton = dict(grg_data)
+    skeleton['network'] = dict(network)
+    skeleton['network']['components'] = {}
+
+    error = jsonschema_exceptions.best_match(grg_schema_validator().iter_errors(skeleton))
+    if error is not None:
+        return [(error.message, list(error.path))]
+
+    component_ids = list(network['components'])
+    chunk_size = -(-len(component_ids) // (4*workers))
+
+    errors = []
+    with concurrent_futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for start in range(0, len(component_ids), chunk_size):
+            chunk = {comp_id: network['components'][comp_id] for comp_id in component_ids[start:start+chunk_size]}
+            futures.append(executor.submit(_validate_components, network['subtype'], chunk))
+
+        for future in futures:
+            error = future.result()
+            if error is not None:
+                errors.append(error)
+
+    return errors
+
+
+def validate_grg_data(grg_data, workers=None, context=None):
+    '''checks grg data against the grg json schema and the structural
+    invariants of check_grg_structure, as grg_grgdata.cmd.validate_grg does,
+    the reason for a failure is reported to the output of the context
+
+    Args:
+        grg_data(dict): grg data, such as given by Case.to_grg
+        workers(int): the number of worker processes for validating the
+            network components, i.e. the substations and lines, against the
+            json schema, the errors of all workers are reported
+        context(ConversionContext): receives the reason for a failure,
+            see grg_psse2grg.context
+    Returns:
+        bool: True if the data is valid
+    '''
+
+    context = conversion_context(context)
+
+    components = grg_data.get('network', {}).get('components', {})
+    if workers is not None and isinstance(components, dict) and len(components) >= parallel_validation_min_components:
+        errors = _validate_grg_schema_parallel(grg_data, workers)
+    else:
+        error = jsonschema_exceptions.best_match(grg_schema_validator().iter_errors(grg_data))
+        errors = [] if error is None else [(error.message, list(error.path))]
+
+    if len(errors) > 0:
+        for message, path in errors:
+            context.report(message)
+            context.report(str(path))
+        return False
+
+    return check_grg_structure(grg_data, context)
+
+
+def check_grg_structure(grg_data, context=None):
+    '''checks the grg invariants that Case.to_grg can break without the grg
+    json schema: a supported version, unique component ids, voltage links
+    to defined voltage points and pointers, including the mapping and
+    operation constraint keys, to existing components.  The reason for a
+    failure is reported to the output of the context.
+
+    Args:
+        grg_data(dict): grg data, such as given by Case.to_grg
+        context(ConversionContext): receives the reason for a failure,
+            see grg_psse2grg.context
+    Returns:
+        bool: True if the data passes the checks
+    '''
+
+    context = conversion_context(context)
+
+    if grg_data.get('grg_version') not in valid_grg_versions:
+        context.report('given a file in grg version {} but only versions {} are supported'.format(grg_data.get('grg_version'), ', '.join(valid_grg_versions)))
+        return False
+
+    component_lookup = {}
+    voltage_points = set()
+    for comp_path_id, comp_data in grg_cmd.walk_components(grg_data):
+        if comp_data['id'] in component_lookup:
+            context.report('component name {} is not unique'.format(comp_data['id']))
+            return False
+        component_lookup[comp_data['id']] = comp_data
+
+        if comp_data['type'] == 'voltage_level':
+            for voltage_point in comp_data['voltage_points']:
+                if voltage_point in voltage_points:
+                    context.report('voltage point {} is not unique'.format(voltage_point))
+                    return False
+                voltage_points.add(voltage_point)
+
+    for comp, link_id in grg_cmd.walk_voltage_links(grg_data):
+        voltage_id = comp[link_id]
+        if not voltage_id in voltage_points:
+            context.report('voltage id {} in component {} is not defined'.format(voltage_id, comp['id']))
+            return False
+
+    for pointer in grg_cmd.walk_pointers(grg_data):
+        if not grg_cmd.validate_pointer(pointer, grg_data, component_lookup):
+            context.report('Invalid component pointer: {}'.format(pointer))
+            return False
+
+    assignment_pointers = itertools.chain(
+        grg_cmd.walk_assignments(grg_data),
+        grg_cmd.walk_operation_constraints(grg_data)
+    )
+
+    for pointer, val in assignment_pointers:
+        if not grg_cmd.validate_pointer(pointer, grg_data, component_lookup, assignment=True):
+            context.report('Invalid assignment pointer: {}'.format(pointer))
+            return False
+
+    return True
@@ -22,8 +22,6 @@ classifiers = [
     'Operating System :: OS Independent',
     'Programming Language :: Python',
     'Programming Language :: Python :: 3',
-    'Programming Language :: Python :: 3.5',
-    'Programming Language :: Python :: 3.6',
     'Programming Language :: Python :: 3.7',
 ]
 
@@ -37,7 +35,12 @@ setup(
     author='Carleton Coffrin',
     author_email='cjc@lanl.gov',
 
+    python_requires='>=3.7',
     install_requires=['grg-pssedata', 'grg-grgdata'],
+    extras_require={
+        'columnar': ['numpy'],
+        'orjson': ['orjson'],
+    },
     setup_requires=['pytest-runner'],
     tests_require=['pytest-cov'],
     test_suite='tests',
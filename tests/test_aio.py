@@ -0,0 +1,168 @@
+import asyncio, concurrent.futures, io, json, os, pytest, threading
+
+import grg_psse2grg
+from grg_psse2grg import aio
+from grg_psse2grg.context import ConversionContext
+from grg_psse2grg.exception import ConversionCancelledError
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/correct'
+case5_file = data_dir+'/case5_000.raw'
+missing_groups_file = data_dir+'/powermodels/two_winding_mag_test.raw'
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def _context():
+    return ConversionContext(log=io.StringIO(), output=io.StringIO(), capture_warnings=True)
+
+
+def test_round_trip(tmpdir):
+    grg_file = str(tmpdir.join('case5_000.json'))
+    psse_file = str(tmpdir.join('case5_000.raw'))
+
+    async def convert():
+        case = await aio.parse_psse_case_file(case5_file, context=_context())
+        grg_data = await aio.to_grg(case, 'case5_000', context=_context())
+        await aio.write_grg_json(grg_data, grg_file)
+        grg_data = await aio.parse_grg_case_file(grg_file)
+        case = await aio.build_psse_case(grg_data, 'starting_points', 'breakers_assignment', context=_context())
+        await aio.write_psse_case(case, psse_file)
+        return grg_data
+
+    grg_data = _run(convert())
+
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file)
+    expected = case.to_grg('case5_000')
+    assert grg_data == json.loads(json.dumps(expected))
+    with open(psse_file) as output:
+        assert output.read() == grg_psse2grg.io.build_psse_case(grg_data, 'starting_points', 'breakers_assignment').to_psse()+'\n'
+
+
+def test_concurrent_conversions():
+    file_names = [case5_file, missing_groups_file]*3
+
+    async def convert(file_name, executor):
+        context = _context()
+        case = await aio.parse_psse_case_file(file_name, executor, context=context)
+        grg_data = await aio.to_grg(case, 'test', executor, context=context)
+        return grg_data, context
+
+    async def convert_all():
+        with concurrent.futures.ThreadPoolExecutor(3) as executor:
+            return await asyncio.gather(*[convert(file_name, executor) for file_name in file_names])
+
+    for file_name, (grg_data, context) in zip(file_names, _run(convert_all())):
+        assert grg_data == grg_psse2grg.io.parse_psse_case_file(file_name).to_grg('test', context=_context())
+        assert context.log_file.getvalue().count('parsed') > 0
+        assert (len(context.warnings) > 0) == (file_name == missing_groups_file)
+
+
+def test_stream_parse_and_write(tmpdir):
+    with open(case5_file, 'rb') as psse_file:
+        data = psse_file.read()
+
+    class _Output(object):
+        def __init__(self):
+            self.data = bytearray()
+
+        def write(self, data):
+            self.data.extend(data)
+
+        async def drain(self):
+            pass
+
+    async def convert():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        case = await aio.parse_psse_case_stream(reader, context=_context())
+        grg_data = await aio.to_grg(case, 'case5_000', skip_validation=True)
+        output = _Output()
+        await aio.write_grg_json(grg_data, output, compact=True)
+        return case, output
+
+    aio_stream_chunk_lines = aio.stream_chunk_lines
+    aio.stream_chunk_lines = 4
+    try:
+        case, output = _run(convert())
+    finally:
+        aio.stream_chunk_lines = aio_stream_chunk_lines
+
+    assert case == grg_psse2grg.io.parse_psse_case_file(case5_file)
+    expected = case.to_grg('case5_000', skip_validation=True)
+    assert json.loads(output.data.decode()) == json.loads(json.dumps(expected))
+
+
+def test_cancellation():
+    context = _context()
+
+    async def cancel():
+        task = asyncio.ensure_future(aio.parse_psse_case_file(case5_file, context=context))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    _run(cancel())
+    assert context.cancelled
+    with pytest.raises(ConversionCancelledError):
+        grg_psse2grg.io.parse_psse_case_file(case5_file, context=context)
+
+
+class _PausingContext(ConversionContext):
+    def __init__(self, pause_at):
+        ConversionContext.__init__(self, log=io.StringIO(), output=io.StringIO(), capture_warnings=True)
+        self.pause_at = pause_at
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+        self.checkpoints = 0
+        self.errors = []
+
+    def check_cancelled(self):
+        # waits at one checkpoint, until the test has cancelled the task
+        self.checkpoints += 1
+        if self.checkpoints == self.pause_at:
+            self.paused.set()
+            self.resume.wait(10)
+        try:
+            ConversionContext.check_cancelled(self)
+        except ConversionCancelledError as error:
+            self.errors.append(error)
+            raise
+
+
+def test_cancel_running_conversion():
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file)
+    context = _PausingContext(2)
+
+    async def cancel(executor):
+        task = asyncio.ensure_future(aio.to_grg(case, 'test', executor, context=context))
+        await asyncio.get_running_loop().run_in_executor(None, context.paused.wait, 10)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        context.resume.set()
+
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        _run(cancel(executor))
+
+    # the conversion stopped at the checkpoint where it waited, before the
+    # mappings and the validation
+    assert context.cancelled
+    assert context.checkpoints == 2
+    assert len(context.errors) == 1
+
+
+def test_process_pool_executor():
+    async def parse():
+        with concurrent.futures.ProcessPoolExecutor(1) as executor:
+            await aio.parse_psse_case_file(case5_file, executor)
+
+    with pytest.raises(ValueError):
+        _run(parse())
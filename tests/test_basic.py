@@ -1,12 +1,18 @@
-import os, pytest
+import gzip, json, lzma, os, pytest, subprocess, sys
 
 import collections
 import warnings
 warnings.filterwarnings('error')
 
 from grg_grgdata.cmd import components_by_type
+from grg_pssedata.exception import PSSEDataParsingError
 
 import grg_psse2grg
+from grg_psse2grg.exception import PSSE2GRGWarning
+
+from test_common import correct_files
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case5_000.raw'
 
 class Test5Bus:
     def setup_method(self, _):
@@ -59,3 +65,209 @@ class TestGRGVariants:
         assert len(psse_case.branches) == 6
         assert len(psse_case.generators) == 5
 
+
+
+def _read_lines(file_name):
+    with open(file_name, 'r') as psse_file:
+        return psse_file.readlines()
+
+
+def test_truncated_stream():
+    lines = _read_lines(case5_file)[:10]
+    with pytest.raises(PSSEDataParsingError):
+        grg_psse2grg.io.parse_psse_case_lines(iter(lines))
+    with pytest.raises(PSSEDataParsingError):
+        grg_psse2grg.io.parse_psse_case_lines(lines, workers=2)
+
+
+def test_short_header():
+    with pytest.raises(PSSEDataParsingError):
+        grg_psse2grg.io.parse_psse_case_lines(iter(['0, 100.0, 33, 0, 0, 60.0']))
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_fast_parse_line(input_data):
+    for line in _read_lines(input_data):
+        tokens = grg_psse2grg.io._fast_parse_line(line)
+        if tokens is not None:
+            assert tokens == grg_psse2grg.io.parse_line(line)
+
+
+@pytest.mark.parametrize('line', [
+    "1,'A, B',230.0",
+    "0 / END OF BUS DATA",
+    '1,"A",230.0',
+    "1,'A,230.0",
+])
+def test_fast_parse_line_fallback(line):
+    assert grg_psse2grg.io._fast_parse_line(line) is None
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_scan_sections(input_data):
+    lines = _read_lines(input_data)
+    sections, line_index = grg_psse2grg.io.scan_psse_sections(lines)
+
+    assert [name for name, start, end in sections] == [name for name, parse_section, record_lines in grg_psse2grg.io.psse_sections]
+    for name, start, end in sections:
+        assert grg_psse2grg.io._first_value(lines[end]) in grg_psse2grg.io.psse_terminuses
+
+
+def test_parallel_sections(monkeypatch):
+    monkeypatch.setattr(grg_psse2grg.io, 'parallel_section_min_lines', 2)
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file)
+    assert grg_psse2grg.io.parse_psse_case_file(case5_file, workers=2) == case
+
+    case_compact = grg_psse2grg.io.parse_psse_case_file(case5_file, workers=2, compact=True)
+    assert type(case_compact.buses[0]) == grg_psse2grg.struct.CompactBus
+    assert case_compact == case
+
+    case_generators = grg_psse2grg.io.parse_psse_case_file(case5_file, workers=2, sections=['generators'])
+    assert case_generators.generators == case.generators
+    assert case_generators.buses == []
+
+
+def test_mapped_lines(tmpdir):
+    psse_file_name = str(tmpdir.join('lines.raw'))
+    with open(psse_file_name, 'wb') as psse_file:
+        psse_file.write(b"0, 100.0\r\n1,'A'\n2,'B'")
+
+    with open(psse_file_name, 'rb') as psse_file:
+        with grg_psse2grg.io._MappedPSSELines(psse_file) as lines:
+            assert list(lines) == ["0, 100.0\n", "1,'A'\n", "2,'B'"]
+            assert len(lines) == 3
+            assert lines[-1] == "2,'B'"
+            assert lines[1:] == ["1,'A'\n", "2,'B'"]
+
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file)
+    assert grg_psse2grg.io.parse_psse_case_file(case5_file, input_mode='mmap') == case
+
+
+def test_mapped_empty_file(tmpdir):
+    psse_file_name = str(tmpdir.join('empty.raw'))
+    open(psse_file_name, 'w').close()
+    with pytest.raises(PSSEDataParsingError):
+        grg_psse2grg.io.parse_psse_case_file(psse_file_name, input_mode='mmap')
+
+
+def test_unknown_input_mode():
+    with pytest.raises(ValueError):
+        grg_psse2grg.io.parse_psse_case_file(case5_file, input_mode='slurp')
+
+
+def test_lazy_section_names():
+    assert grg_psse2grg.struct.LazyCase.section_names == [name for name, parse_section, record_lines in grg_psse2grg.io.psse_sections]
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_lazy_matches_eager(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    case_lazy = grg_psse2grg.io.parse_psse_case_file(input_data, lazy=True)
+
+    assert case_lazy.loaded_sections == []
+    assert case_lazy == case
+    assert case == case_lazy
+    assert not case != case_lazy
+
+
+def test_lazy_loads_accessed_sections():
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file, input_mode='mmap', lazy=True)
+
+    assert len(case.buses) == 5
+    assert len(case.branches) > 0
+    assert case.loaded_sections == ['buses', 'branches']
+
+    case.generators = []
+    assert case.generators == []
+    assert case.loaded_sections == ['buses', 'generators', 'branches']
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_selected_sections(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    sections = ['buses', 'transformers', 'zones']
+    case_selected = grg_psse2grg.io.parse_psse_case_file(input_data, sections=sections)
+    case_selected_lazy = grg_psse2grg.io.parse_psse_case_file(input_data, lazy=True, sections=sections)
+
+    for name in grg_psse2grg.struct.LazyCase.section_names:
+        expected = getattr(case, name) if name in sections else []
+        assert getattr(case_selected, name) == expected
+        assert getattr(case_selected_lazy, name) == expected
+    assert case_selected.record2 == case.record2
+
+
+def test_unknown_section():
+    with pytest.raises(ValueError):
+        grg_psse2grg.io.parse_psse_case_file(case5_file, sections=['buses', 'busses'])
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_compact_matches_regular(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    case_compact = grg_psse2grg.io.parse_psse_case_file(input_data, compact=True)
+
+    assert all(not hasattr(bus, '__dict__') for bus in case_compact.buses)
+    assert case == case_compact
+    assert case_compact == case
+    assert case.to_psse() == case_compact.to_psse()
+    assert case.to_grg('test', skip_validation=True) == case_compact.to_grg('test', skip_validation=True)
+
+
+def _compress(file_name, compressed_file_name, open_function):
+    with open(file_name, 'rb') as data_file:
+        with open_function(compressed_file_name, 'wb') as compressed_file:
+            compressed_file.write(data_file.read())
+
+
+@pytest.mark.parametrize('extension, magic, open_function', grg_psse2grg.io.compression_formats)
+def test_compressed_input(extension, magic, open_function, tmpdir):
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file)
+
+    compressed_file_name = str(tmpdir.join('case5.raw'+extension))
+    _compress(case5_file, compressed_file_name, open_function)
+    assert grg_psse2grg.io.parse_psse_case_file(compressed_file_name) == case
+    assert grg_psse2grg.io.parse_psse_case_file(compressed_file_name, lazy=True) == case
+
+    # detected by magic bytes
+    unlabeled_file_name = str(tmpdir.join('case5_compressed.raw'))
+    _compress(case5_file, unlabeled_file_name, open_function)
+    assert grg_psse2grg.io.parse_psse_case_file(unlabeled_file_name) == case
+
+    with pytest.warns(PSSE2GRGWarning):
+        assert grg_psse2grg.io.parse_psse_case_file(compressed_file_name, input_mode='mmap') == case
+
+
+def test_compressed_cli(tmpdir, capsys):
+    parser = grg_psse2grg.io.build_cli_parser()
+    grg_psse2grg.io.main(parser.parse_args([case5_file, '-sv']))
+    output = capsys.readouterr().out
+
+    compressed_file_name = str(tmpdir.join('case5_000.raw.gz'))
+    _compress(case5_file, compressed_file_name, gzip.open)
+    grg_psse2grg.io.main(parser.parse_args([compressed_file_name, '-sv']))
+    compressed_output = capsys.readouterr().out
+
+    network_id = case5_file[:-4]
+    assert compressed_output.replace(str(tmpdir.join('case5_000')), network_id) == output
+
+    grg_file_name = str(tmpdir.join('case5_000.json.xz'))
+    with lzma.open(grg_file_name, 'wt') as grg_file:
+        grg_file.write(output)
+    assert grg_psse2grg.io.parse_grg_case_file(grg_file_name) == json.loads(output)
+
+
+def test_lazy_imports():
+    code = 'import sys, grg_psse2grg.io; print(sorted(m for m in sys.modules if m.startswith(("jsonschema", "grg_grgdata", "concurrent"))))'
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    assert output.decode('utf-8').strip() == '[]'
+
+
+def test_entry_points():
+    code = 'import grg_psse2grg, grg_pssedata.exception; print(grg_psse2grg.exception.PSSEDataWarning is grg_pssedata.exception.PSSEDataWarning, hasattr(grg_psse2grg.exception, "PSSE2GRGWarning"))'
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    assert output.decode('utf-8').split() == ['True', 'True']
+
+    assert grg_psse2grg.io.parse_psse_case_file is not None
+    assert 'io' in dir(grg_psse2grg)
+    with pytest.raises(AttributeError):
+        grg_psse2grg.missing
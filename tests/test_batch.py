@@ -0,0 +1,100 @@
+import json, os, pytest, shutil
+
+import grg_psse2grg
+from grg_psse2grg.batch import BatchOptions
+from grg_psse2grg.batch import convert_file
+from grg_psse2grg.batch import convert_files
+from grg_psse2grg.batch import find_input_files
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/correct'
+case_files = ['case5_000.raw', 'case5_001.raw']
+
+
+@pytest.fixture
+def input_dir(tmpdir):
+    input_dir = tmpdir.mkdir('input')
+    for file_name in case_files:
+        shutil.copy(os.path.join(data_dir, file_name), str(input_dir))
+    shutil.copy(os.path.join(data_dir, 'powermodels', 'case14.raw'), str(input_dir.mkdir('powermodels')))
+    return input_dir
+
+
+def test_find_input_files(input_dir):
+    input_dir.join('notes.txt').write('')
+    files = find_input_files([str(input_dir)])
+    assert [output for input_file, output in files] == \
+        ['case5_000.json', 'case5_001.json', os.path.join('powermodels', 'case14.json')]
+
+    files = find_input_files([str(input_dir.join('*_001.raw'))])
+    assert files == [(str(input_dir.join('case5_001.raw')), 'case5_001.json')]
+
+
+def test_convert_files(input_dir, tmpdir):
+    output_dir = str(tmpdir.join('output'))
+    summary = convert_files(find_input_files([str(input_dir)]), output_dir, BatchOptions(validation='structural'), workers=2)
+
+    assert summary['files'] == 3
+    assert summary['converted'] == 3
+    assert summary['failed'] == 0
+    assert summary['files_per_second'] > 0
+
+    for result in summary['results']:
+        with open(result['output']) as output_file:
+            grg_data = json.load(output_file)
+        expected = grg_psse2grg.io.parse_psse_case_file(result['input']).to_grg(result['input'][:-4], skip_validation=True)
+        assert grg_data == json.loads(json.dumps(expected))
+        assert result['output_bytes'] == os.path.getsize(result['output'])
+
+
+def test_failed_file_is_isolated(input_dir, tmpdir):
+    input_dir.join('broken.raw').write('not a pss/e file\n')
+    summary = convert_files(find_input_files([str(input_dir)]), str(tmpdir.join('output')), workers=2)
+
+    assert summary['converted'] == 3
+    assert summary['failed'] == 1
+    failed = [result for result in summary['results'] if result['status'] != 'ok']
+    assert failed[0]['input'].endswith('broken.raw')
+    assert failed[0]['error'] is not None
+
+
+def test_outputs_do_not_overwrite_inputs(tmpdir):
+    shutil.copy(os.path.join(data_dir, 'case5_000.raw'), str(tmpdir))
+    grg_file = tmpdir.join('case5_000.json')
+    grg_file.write('{}')
+    files = [(str(tmpdir.join('case5_000.raw')), 'case5_000.json'), (str(grg_file), 'case5_000.raw')]
+
+    summary = convert_files(files, str(tmpdir), workers=1)
+    assert summary['failed'] == 2
+    assert all('is one of the input files' in result['error'] for result in summary['results'])
+    assert grg_file.read() == '{}'
+
+
+def test_missing_input(tmpdir):
+    result = convert_file(str(tmpdir.join('missing.raw')), str(tmpdir.join('missing.json')), BatchOptions())
+    assert result['status'] == 'failed'
+    assert result['input_bytes'] == 0
+
+
+def test_grg_to_psse(input_dir, tmpdir):
+    grg_dir = str(tmpdir.join('grg'))
+    convert_files(find_input_files([str(input_dir.join('*.raw'))]), grg_dir, BatchOptions(validation='structural'), workers=1)
+    psse_dir = str(tmpdir.join('psse'))
+    summary = convert_files(find_input_files([grg_dir]), psse_dir, workers=1)
+
+    assert summary['converted'] == len(case_files)
+    for file_name in case_files:
+        grg_data = grg_psse2grg.io.parse_grg_case_file(os.path.join(grg_dir, file_name[:-4]+'.json'))
+        expected = grg_psse2grg.io.build_psse_case(grg_data, 'starting_points', 'breakers_assignment')
+        with open(os.path.join(psse_dir, file_name)) as psse_file:
+            assert psse_file.read() == expected.to_psse()+'\n'
+
+
+def test_cli(input_dir, tmpdir, capsys):
+    summary_file = str(tmpdir.join('summary.json'))
+    parser = grg_psse2grg.batch.build_cli_parser()
+    args = parser.parse_args([str(input_dir), '-o', str(tmpdir.join('output')), '-w', '1', '-vm', 'structural', '-s', summary_file])
+    assert grg_psse2grg.batch.main(args) == 0
+    assert 'converted 3 of 3 files' in capsys.readouterr().out
+
+    with open(summary_file) as summary_file:
+        assert json.load(summary_file)['converted'] == 3
@@ -0,0 +1,100 @@
+import io, os, shutil, pytest
+
+import grg_psse2grg
+from grg_psse2grg.cache import CaseCache
+from grg_psse2grg.context import ConversionContext
+from grg_psse2grg.exception import PSSE2GRGWarning
+
+from test_common import correct_files
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case5_000.raw'
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_cached_case(input_data, tmpdir):
+    cache = CaseCache(str(tmpdir))
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+
+    assert grg_psse2grg.io.parse_psse_case_file(input_data, cache=cache) == case
+    assert grg_psse2grg.io.parse_psse_case_file(input_data, cache=cache) == case
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_options_and_content_change_key(tmpdir):
+    cache = CaseCache(str(tmpdir.join('cache')))
+    psse_file_name = str(tmpdir.join('case.raw'))
+    shutil.copy(case5_file, psse_file_name)
+
+    key = cache.key(psse_file_name, sections=None, compact=False)
+    assert key == cache.key(psse_file_name, sections=None, compact=False)
+    assert key != cache.key(psse_file_name, sections=None, compact=True)
+
+    case = grg_psse2grg.io.parse_psse_case_file(psse_file_name, cache=cache, sections=['buses'])
+    assert len(case.loads) == 0
+    case = grg_psse2grg.io.parse_psse_case_file(psse_file_name, cache=cache)
+    assert len(case.loads) > 0
+    assert cache.misses == 2
+
+    with open(psse_file_name, 'a') as psse_file:
+        psse_file.write('\n')
+    assert key != cache.key(psse_file_name, sections=None, compact=False)
+
+
+def test_sections_order_key(tmpdir):
+    cache = CaseCache(str(tmpdir))
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file, cache=cache, sections=['buses', 'loads'])
+    assert grg_psse2grg.io.parse_psse_case_file(case5_file, cache=cache, sections=['loads', 'buses', 'loads']) == case
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cached_warnings_and_messages(tmpdir):
+    psse_file_name = str(tmpdir.join('case.raw'))
+    with open(case5_file) as psse_file:
+        lines = psse_file.readlines()
+    lines[0] = lines[0].replace(', 33,', ', 32,', 1)
+    with open(psse_file_name, 'w') as psse_file:
+        psse_file.writelines(lines)
+
+    cache = CaseCache(str(tmpdir.join('cache')))
+    contexts = []
+    for parse in range(0, 2):
+        context = ConversionContext(log=io.StringIO(), capture_warnings=True)
+        grg_psse2grg.io.parse_psse_case_file(psse_file_name, cache=cache, context=context)
+        contexts.append(context)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    missed, hit = contexts
+    assert len(missed.warnings) == 1
+    assert hit.warnings == missed.warnings
+    assert hit.log_file.getvalue().startswith(missed.log_file.getvalue())
+    assert 'parsed 5 buses' in hit.log_file.getvalue()
+    assert 'loaded cached case' in hit.log_file.getvalue()
+
+
+def test_lru_eviction(tmpdir):
+    cache = CaseCache(str(tmpdir))
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file)
+
+    cache.store('a', case)
+    case_bytes = os.path.getsize(os.path.join(str(tmpdir), 'a'+grg_psse2grg.cache.cache_file_extension))
+    cache.max_bytes = 2*case_bytes
+    os.utime(os.path.join(str(tmpdir), 'a'+grg_psse2grg.cache.cache_file_extension), (0, 0))
+    cache.store('b', case)
+    os.utime(os.path.join(str(tmpdir), 'b'+grg_psse2grg.cache.cache_file_extension), (1, 1))
+    assert cache.load('a') == case # refreshes a
+    cache.store('c', case)
+
+    assert cache.evictions == 1
+    assert cache.load('b') is None
+    assert cache.load('a') == case
+    assert cache.load('c') == case
+
+
+def test_unreadable_entry(tmpdir):
+    cache = CaseCache(str(tmpdir))
+    with open(os.path.join(str(tmpdir), 'bad'+grg_psse2grg.cache.cache_file_extension), 'w') as cache_file:
+        cache_file.write('not a pickle')
+
+    with pytest.warns(PSSE2GRGWarning):
+        assert cache.load('bad') is None
+    assert cache.misses == 1
@@ -0,0 +1,60 @@
+import math, pytest
+
+numpy = pytest.importorskip('numpy')
+
+import grg_psse2grg
+from grg_psse2grg.columnar import ColumnarCase
+
+from test_common import correct_files
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_round_trip(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    columnar_case = ColumnarCase(case)
+
+    assert columnar_case.to_case() == case
+    assert columnar_case.to_case().to_psse() == case.to_psse()
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_vectorized_conversions(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    columnar_case = ColumnarCase(case)
+    base_mva = case.sbase
+
+    vm, va = columnar_case.bus_voltage_setpoints()
+    assert vm.tolist() == [bus.vm for bus in case.buses]
+    assert va.tolist() == [math.radians(bus.va) for bus in case.buses]
+
+    pl, ql = columnar_case.load_demands()
+    assert pl.tolist() == [load.pl/base_mva for load in case.loads]
+    assert ql.tolist() == [load.ql/base_mva for load in case.loads]
+
+    pg, qg = columnar_case.generator_outputs()
+    assert pg.tolist() == [gen.pg/base_mva for gen in case.generators]
+
+    ratea, rateb, ratec = columnar_case.branch_ratings()
+    assert ratec.tolist() == [branch.ratec/base_mva for branch in case.branches]
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_bus_rows(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    columnar_case = ColumnarCase(case)
+
+    rows = columnar_case.bus_rows(columnar_case.loads.column('i'))
+    assert [case.buses[row].i for row in rows] == [load.i for load in case.loads]
+
+
+def test_views():
+    case = grg_psse2grg.io.parse_psse_case_file(correct_files[0])
+    columnar_case = ColumnarCase(case)
+
+    assert columnar_case.buses[0] == case.buses[0]
+    assert columnar_case.branches[-1] == case.branches[-1]
+    assert type(columnar_case.generators[0].pg) == float
+    with pytest.raises(IndexError):
+        columnar_case.buses[len(case.buses)]
+    with pytest.raises(KeyError):
+        columnar_case.bus_rows([-1])
@@ -0,0 +1,104 @@
+import concurrent.futures, io, os, pytest, warnings
+
+import grg_psse2grg
+from grg_psse2grg.context import ConversionContext
+from grg_psse2grg.context import conversion_context
+from grg_psse2grg.diagnostics import Diagnostics
+from grg_psse2grg.exception import PSSE2GRGWarning
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/correct'
+case5_file = data_dir+'/case5_000.raw'
+missing_groups_file = data_dir+'/powermodels/two_winding_mag_test.raw'
+variable_shunt_file = data_dir+'/pglib-opf/pglib_opf_case73_ieee_rts.raw'
+
+
+def _convert(file_name):
+    context = ConversionContext(log=io.StringIO(), output=io.StringIO(), capture_warnings=True)
+    case = grg_psse2grg.io.parse_psse_case_file(file_name, context=context)
+    grg_data = case.to_grg('test', context=context)
+    return case, grg_data, context
+
+
+def test_default_context():
+    context = ConversionContext()
+    with pytest.warns(PSSE2GRGWarning):
+        context.warn('a warning', PSSE2GRGWarning)
+    assert len(context.warnings) == 0
+
+    assert conversion_context(context) is context
+    assert conversion_context(diagnostics=Diagnostics()).diagnostics is not None
+    with pytest.raises(ValueError):
+        conversion_context(context, diagnostics=Diagnostics())
+
+
+def test_record_warning():
+    context = ConversionContext(log=io.StringIO(), capture_warnings=True)
+    context.record_warning('bus area ids were not found', 1, 'area id 2 in bus 1 was not found', PSSE2GRGWarning)
+    context.record_warning('merging buses into 1', 3, 'merging buses 2 into 1')
+    assert context.warnings == [('area id 2 in bus 1 was not found', PSSE2GRGWarning)]
+    assert context.log_file.getvalue() == 'warning: merging buses 2 into 1\n'
+
+    context = ConversionContext(Diagnostics(), log=io.StringIO(), capture_warnings=True)
+    context.record_warning('bus area ids were not found', 1, 'area id 2 in bus 1 was not found', PSSE2GRGWarning)
+    context.record_warning('merging buses into 1', 3, 'merging buses 2 into 1')
+    assert len(context.warnings) == 0
+    assert context.log_file.getvalue() == ''
+    assert context.diagnostics.count('bus area ids were not found', PSSE2GRGWarning) == 1
+    assert context.diagnostics.count('merging buses into 1') == 1
+
+
+def test_omit_bus_subtype_warning():
+    case = grg_psse2grg.io.parse_psse_case_file(case5_file)
+    lookup = case._grg_component_lookup()
+
+    context = ConversionContext(log=io.StringIO(), capture_warnings=True)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        case.buses[0].to_grg_bus(lookup, True, context)
+    assert len(caught) == 0
+    assert context.warnings == [('attempted to omit subtype on bus \'{}\', but this is not allowed.'.format(case.buses[0].i), PSSE2GRGWarning)]
+
+
+def test_captured_warnings():
+    case = grg_psse2grg.io.parse_psse_case_file(missing_groups_file)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        grg_data = case.to_grg('test')
+
+    context = ConversionContext(log=io.StringIO(), output=io.StringIO(), capture_warnings=True)
+    with warnings.catch_warnings(record=True) as context_caught:
+        warnings.simplefilter('always')
+        assert case.to_grg('test', context=context) == grg_data
+    assert len(context_caught) == 0
+    assert [message for message, category in context.warnings] == [str(warning.message) for warning in caught]
+    assert any('was not found in the zones table' in message for message, category in context.warnings)
+
+
+def test_build_psse_case_context():
+    grg_data = grg_psse2grg.io.parse_psse_case_file(variable_shunt_file).to_grg('test')
+    case = grg_psse2grg.io.build_psse_case(grg_data, 'starting_points', 'breakers_assignment')
+
+    context = ConversionContext(Diagnostics(), log=io.StringIO(), capture_warnings=True)
+    assert grg_psse2grg.io.build_psse_case(grg_data, 'starting_points', 'breakers_assignment', context=context) == case
+    assert context.diagnostics.count('skipping shunts with variable admittance values') == 3
+
+
+def test_thread_pool():
+    file_names = [case5_file, missing_groups_file]*4
+    expected = [_convert(file_name) for file_name in file_names]
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(_convert, file_names))
+    assert len(caught) == 0
+
+    for (case, grg_data, context), (expected_case, expected_grg_data, expected_context) in zip(results, expected):
+        assert case == expected_case
+        assert grg_data == expected_grg_data
+        assert context.log_file.getvalue() == expected_context.log_file.getvalue()
+        assert context.log_file.getvalue().count('parsed {} buses'.format(len(case.buses))) == 1
+        assert context.warnings == expected_context.warnings
+
+    assert len(results[0][2].warnings) == 0
+    assert len(results[1][2].warnings) > 0
@@ -0,0 +1,72 @@
+import os, pytest, warnings
+
+import grg_psse2grg
+from grg_psse2grg.diagnostics import Diagnostics
+from grg_psse2grg.exception import PSSE2GRGWarning
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/correct'
+missing_groups_file = data_dir+'/powermodels/two_winding_mag_test.raw'
+variable_shunt_file = data_dir+'/pglib-opf/pglib_opf_case73_ieee_rts.raw'
+
+
+def test_counts_and_examples():
+    diagnostics = Diagnostics(sample_size=2)
+    for bus in range(1, 6):
+        diagnostics.add('missing area', bus, PSSE2GRGWarning)
+    diagnostics.add('merging buses')
+
+    assert len(diagnostics) == 6
+    assert diagnostics.count('missing area', PSSE2GRGWarning) == 5
+    assert diagnostics.count('missing area') == 0
+    assert diagnostics.summary() == [
+        (PSSE2GRGWarning, 'missing area (5 times), e.g. 1, 2, ...'),
+        (None, 'merging buses (1 time)'),
+    ]
+
+
+def test_emit_once_per_message():
+    diagnostics = Diagnostics()
+    for bus in range(0, 100):
+        diagnostics.add('missing area', bus, PSSE2GRGWarning)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        diagnostics.emit()
+    assert len(caught) == 1
+    assert '100 times' in str(caught[0].message)
+    assert len(diagnostics) == 0
+
+
+def test_to_grg_diagnostics():
+    case = grg_psse2grg.io.parse_psse_case_file(missing_groups_file)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        grg_data = case.to_grg('test')
+    assert len(caught) == 6
+
+    diagnostics = Diagnostics()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        assert case.to_grg('test', diagnostics=diagnostics) == grg_data
+    assert len(caught) == 0
+    assert len(diagnostics) == 6
+    assert diagnostics.count('bus area ids were not found in the areas table', PSSE2GRGWarning) == 2
+
+
+def test_build_psse_case_diagnostics():
+    grg_data = grg_psse2grg.io.parse_psse_case_file(variable_shunt_file).to_grg('test')
+
+    case = grg_psse2grg.io.build_psse_case(grg_data, 'starting_points', 'breakers_assignment')
+    diagnostics = Diagnostics()
+    assert grg_psse2grg.io.build_psse_case(grg_data, 'starting_points', 'breakers_assignment', diagnostics) == case
+    assert diagnostics.count('skipping shunts with variable admittance values') == 3
+
+
+def test_cli_aggregate_diagnostics(capsys):
+    parser = grg_psse2grg.io.build_cli_parser()
+    args = parser.parse_args([missing_groups_file, '-ad'])
+
+    with pytest.warns(PSSE2GRGWarning) as caught:
+        grg_psse2grg.io.main(args)
+    assert len([warning for warning in caught if 'e.g. 1, 2' in str(warning.message)]) == 3
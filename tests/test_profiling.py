@@ -0,0 +1,81 @@
+import json, os, pytest
+
+import grg_psse2grg
+from grg_psse2grg.profiling import Profile
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/correct'
+case14_file = data_dir+'/powermodels/case14.raw'
+
+
+def test_nested_phases():
+    profile = Profile()
+    for i in range(0, 2):
+        with profile.phase('outer'):
+            with profile.phase('inner'):
+                data = [0.0]*100000
+            profile.start('step')
+            profile.stop()
+
+    assert list(profile.phases) == ['outer', 'outer/inner', 'outer/step']
+    assert all(stats.calls == 2 for stats in profile.phases.values())
+    assert profile.phases['outer/inner'].peak_memory >= 800000
+    assert profile.phases['outer'].peak_memory >= profile.phases['outer/inner'].peak_memory
+    assert profile.phases['outer'].wall_time >= profile.phases['outer/inner'].wall_time
+
+
+def test_phase_exception():
+    profile = Profile(trace_memory=False)
+    with pytest.raises(KeyError):
+        with profile.phase('outer'):
+            profile.start('inner')
+            raise KeyError('missing')
+
+    with profile.phase('next'):
+        pass
+
+    assert list(profile.phases) == ['outer', 'outer/inner', 'next']
+    assert profile.phases['outer/inner'].calls == 1
+    assert profile.phases['next'].peak_memory is None
+
+
+def test_reports():
+    profile = Profile()
+    with profile.phase('parse'):
+        pass
+
+    report = json.loads(profile.to_json())
+    assert [phase['name'] for phase in report['phases']] == ['parse']
+    assert set(report['phases'][0]) == set(['name', 'calls', 'wall_time', 'cpu_time', 'peak_memory'])
+
+    lines = profile.table().split('\n')
+    assert len(lines) == 2
+    assert lines[1].startswith('parse')
+
+
+def test_conversion_phases():
+    profile = Profile()
+    case = grg_psse2grg.io.parse_psse_case_file(case14_file, profile=profile)
+    grg_data = case.to_grg('test', validation='structural', profile=profile)
+    grg_psse2grg.io.build_psse_case(grg_data, 'starting_points', 'breakers_assignment', profile=profile)
+
+    for name in ['parse', 'parse/buses', 'parse/induction_machines', 'to_grg/lookup',
+        'to_grg/components', 'to_grg/mappings', 'to_grg/validation',
+        'build_psse_case/topology', 'build_psse_case/generators', 'build_psse_case/case']:
+        assert profile.phases[name].calls == 1
+
+
+def test_parallel_and_lazy_phases():
+    profile = Profile(trace_memory=False)
+    grg_psse2grg.io.parse_psse_case_file(case14_file, workers=1, profile=profile)
+    grg_psse2grg.io.parse_psse_case_file(case14_file, lazy=True, profile=profile)
+
+    assert profile.phases['parse/read'].calls == 2
+    assert profile.phases['parse/sections'].calls == 1
+    assert profile.phases['parse/scan'].calls == 1
+
+
+@pytest.mark.parametrize('report', ['table', 'json'])
+def test_cli_profile(report, capsys):
+    parser = grg_psse2grg.io.build_cli_parser()
+    grg_psse2grg.io.main(parser.parse_args([case14_file, '-p', report, '-vm', 'structural']))
+    assert len(capsys.readouterr().out) > 0
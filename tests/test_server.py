@@ -0,0 +1,170 @@
+import http.client, json, os, pytest, shutil, signal, threading
+
+import grg_psse2grg
+from grg_psse2grg.batch import BatchOptions
+from grg_psse2grg.server import ConversionService
+from grg_psse2grg.server import _worker_pid
+from grg_psse2grg.server import build_server
+from grg_psse2grg.server import send_request
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/correct'
+case5_file = data_dir+'/case5_000.raw'
+
+
+@pytest.fixture(scope='module')
+def service():
+    service = ConversionService(workers=1, queue_size=1, options=BatchOptions(validation='structural'))
+    service.warm_up()
+    yield service
+    service.close()
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def root(tmpdir):
+    # the input and the output root directory of the server
+    shutil.copy(case5_file, str(tmpdir))
+    return tmpdir
+
+
+@pytest.fixture
+def port(service, root):
+    server = build_server(service, port=0, input_root=str(root), output_root=str(root))
+    _serve(server)
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_round_trip(port, root):
+    grg_file = str(root.join('case5_000.json'))
+    status, result = send_request('/psse2grg', {'input': 'case5_000.raw', 'output': grg_file}, port=port)
+    assert status == 200
+    assert result['status'] == 'ok'
+
+    input_file = str(root.join('case5_000.raw'))
+    with open(grg_file) as output_file:
+        grg_data = json.load(output_file)
+    expected = grg_psse2grg.io.parse_psse_case_file(input_file).to_grg(input_file[:-4], skip_validation=True)
+    assert grg_data == json.loads(json.dumps(expected))
+
+    psse_file = str(root.mkdir('psse').join('case5_000.raw'))
+    status, result = send_request('/grg2psse', {'input': 'case5_000.json', 'output': 'psse/case5_000.raw'}, port=port)
+    assert status == 200
+    assert result['status'] == 'ok'
+    assert os.path.getsize(psse_file) == result['output_bytes']
+
+
+def test_idempotent(port):
+    status, result = send_request('/idempotent', {'input': 'case5_000.raw', 'options': {'validation': 'full'}}, port=port)
+    assert status == 200
+    assert result['status'] == 'ok'
+    assert result['idempotent'] == (result['differences'] == 0)
+
+
+@pytest.mark.parametrize('path,request_data', [
+    ('/psse2grg', {'input': 'case5_000.raw'}),
+    ('/psse2grg', {'input': 'case5_000.raw', 'output': 'case.json', 'options': {'workers': 2}}),
+    ('/psse2grg', {'input': 'case5_000.raw', 'output': 'case.json', 'options': {'cache_dir': '.'}}),
+    ('/psse2grg', {'input': 'case5_000.raw', 'output': 'case.json', 'options': {'validation': 'none'}}),
+    ('/psse2grg', {'input': 'case5_000.raw', 'output': 'case.json', 'options': {'compact': 'yes'}}),
+    ('/psse2grg', {'input': 'case5_000.raw', 'output': 'case5_000.raw'}),
+    ('/psse2grg', {'input': 'case5_000.raw', 'output': '../case.json'}),
+    ('/psse2grg', {'input': case5_file, 'output': 'case.json'}),
+    ('/grg2psse', {'input': 'case5_000.raw', 'output': 'case.raw'}),
+    ('/idempotent', {'input': 'missing.raw'}),
+    ('/idempotent', ['input']),
+])
+def test_bad_requests(port, path, request_data):
+    status, result = send_request(path, request_data, port=port)
+    assert status == 400
+    assert 'error' in result
+
+
+@pytest.mark.parametrize('headers,expected_status', [
+    ({'Content-Type': 'text/plain'}, 415),
+    ({'Content-Type': 'application/json', 'Host': 'example.com'}, 403),
+    ({'Content-Type': 'application/json', 'Host': 'localhost.example.com:8642'}, 403),
+    ({'Content-Type': 'application/json; charset=utf-8', 'Host': 'localhost:8642'}, 200),
+])
+def test_request_headers(port, headers, expected_status):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        body = json.dumps({'input': 'case5_000.raw', 'output': 'case5_000.json'}).encode('utf-8')
+        connection.request('POST', '/psse2grg', body, headers)
+        response = connection.getresponse()
+        assert response.status == expected_status
+        assert 'error' in json.loads(response.read().decode('utf-8'))
+    finally:
+        connection.close()
+
+
+def test_failed_conversion(port, root):
+    root.join('broken.raw').write('not a pss/e file\n')
+    status, result = send_request('/psse2grg', {'input': 'broken.raw', 'output': 'broken.json'}, port=port)
+    assert status == 200
+    assert result['status'] == 'failed'
+    assert result['error'] is not None
+
+
+def test_queue_full(service, port):
+    # occupy the worker and the place in the queue
+    service._slots.acquire()
+    service._slots.acquire()
+    try:
+        status, result = send_request('/idempotent', {'input': 'case5_000.raw'}, port=port)
+    finally:
+        service._slots.release()
+        service._slots.release()
+    assert status == 503
+
+    status, result = send_request('/status', port=port)
+    assert status == 200
+    assert result['rejected'] >= 1
+    assert result['workers'] == 1
+
+
+def test_unix_socket(service, root):
+    unix_socket = str(root.join('server.sock'))
+    server = build_server(service, unix_socket=unix_socket, input_root=str(root), output_root=str(root))
+    _serve(server)
+    try:
+        status, result = send_request('/status', unix_socket=unix_socket)
+        assert status == 200
+        status, result = send_request('/psse2grg', {'input': 'case5_000.raw', 'output': 'case5_000.json'}, unix_socket=unix_socket)
+        assert status == 200
+        assert result['status'] == 'ok'
+        status, result = send_request('/unknown', unix_socket=unix_socket)
+        assert status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unix_socket_path_not_a_socket(service, tmpdir):
+    regular_file = tmpdir.join('server.sock')
+    regular_file.write('not a socket')
+    with pytest.raises(ValueError):
+        build_server(service, unix_socket=str(regular_file))
+    assert regular_file.read() == 'not a socket'
+
+
+def test_worker_killed(service, port):
+    os.kill(service._executor.submit(_worker_pid).result(), signal.SIGKILL)
+
+    # the request that finds the pool broken fails, the later ones run in
+    # the restarted pool
+    status, result = send_request('/idempotent', {'input': 'case5_000.raw'}, port=port)
+    assert status == 500
+    status, result = send_request('/idempotent', {'input': 'case5_000.raw'}, port=port)
+    assert status == 200
+    assert result['status'] == 'ok'
+
+    status, result = send_request('/status', port=port)
+    assert result['restarts'] == 1
@@ -0,0 +1,42 @@
+import random, pytest
+
+import grg_psse2grg
+from grg_psse2grg.struct import cluster_buses
+
+from test_common import correct_files
+
+
+def _set_cluster_buses(bus_ids, bus_groups):
+    # the set based clustering that cluster_buses replaced
+    bus_sub = {bus_id: set([bus_id]) for bus_id in bus_ids}
+    for bus_group in bus_groups:
+        bus_id_set = set().union(*[bus_sub[bus_id] for bus_id in bus_group])
+        for bus_id in bus_id_set:
+            bus_sub[bus_id] = bus_id_set
+    sub_buses = {frozenset(buses) for buses in bus_sub.values()}
+    return [sorted(buses) for buses in sorted(sub_buses, key=lambda x: min(x))]
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_cluster_buses_case(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    bus_ids = [bus.i for bus in case.buses]
+    bus_groups = [(t.p1.i, t.p1.j, t.p1.k) if t.is_three_winding() else (t.p1.i, t.p1.j) for t in case.transformers]
+
+    assert cluster_buses(bus_ids, bus_groups) == _set_cluster_buses(bus_ids, bus_groups)
+
+
+def test_cluster_buses_random():
+    generator = random.Random(0)
+    bus_ids = generator.sample(range(1, 100000), 2000)
+    bus_groups = [tuple(generator.sample(bus_ids, generator.choice([2, 3]))) for i in range(0, 1500)]
+
+    assert cluster_buses(bus_ids, bus_groups) == _set_cluster_buses(bus_ids, bus_groups)
+
+
+def test_cluster_buses_chain():
+    bus_ids = list(range(1, 1001))
+    bus_groups = [(i, i+1) for i in range(1, 1000, 2)] + [(i, i+1) for i in range(2, 1000, 2)]
+
+    assert cluster_buses(bus_ids, bus_groups) == [bus_ids]
+    assert cluster_buses(bus_ids, []) == [[i] for i in bus_ids]
@@ -0,0 +1,103 @@
+import copy, pytest
+
+import grg_psse2grg
+import grg_psse2grg.validation
+from grg_psse2grg.validation import check_grg_structure
+from grg_psse2grg.validation import grg_schema_validator
+from grg_psse2grg.validation import validate_grg_data
+
+from grg_grgdata.cmd import validate_grg
+from grg_grgdata.cmd import walk_components
+
+from test_common import correct_files
+
+
+def _grg_data(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    return case.to_grg('test', skip_validation=True)
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_check_grg_structure(input_data):
+    assert check_grg_structure(_grg_data(input_data))
+
+
+def test_validate_grg_data():
+    grg_data = _grg_data(correct_files[0])
+
+    assert validate_grg_data(grg_data)
+    assert validate_grg(grg_data)
+
+
+def test_validator_reused():
+    assert grg_schema_validator() is grg_schema_validator()
+
+
+def _first_component(grg_data, component_type):
+    for comp_path_id, component in walk_components(grg_data):
+        if component['type'] == component_type:
+            return component
+    assert False
+
+
+def test_structure_errors():
+    grg_data = _grg_data(correct_files[0])
+
+    broken = copy.deepcopy(grg_data)
+    _first_component(broken, 'load')['link'] = 'missing_voltage_point'
+    assert not check_grg_structure(broken)
+
+    broken = copy.deepcopy(grg_data)
+    load = _first_component(broken, 'load')
+    _first_component(broken, 'bus')['id'] = load['id']
+    assert not check_grg_structure(broken)
+
+    broken = copy.deepcopy(grg_data)
+    mapping = next(iter(broken['mappings'].values()))
+    mapping['missing_component/voltage'] = 1.0
+    assert not check_grg_structure(broken)
+
+    broken = copy.deepcopy(grg_data)
+    broken['grg_version'] = 'v.0.1'
+    assert not check_grg_structure(broken)
+
+
+def test_schema_error():
+    grg_data = _grg_data(correct_files[0])
+    del grg_data['network']['type']
+
+    assert not validate_grg_data(grg_data)
+    assert check_grg_structure(grg_data)
+
+
+def test_to_grg_validation_modes():
+    case = grg_psse2grg.io.parse_psse_case_file(correct_files[0])
+
+    assert case.to_grg('test', validation='structural') == case.to_grg('test')
+    with pytest.raises(ValueError):
+        case.to_grg('test', validation='none')
+
+
+def test_validate_grg_data_parallel(monkeypatch):
+    monkeypatch.setattr(grg_psse2grg.validation, 'parallel_validation_min_components', 2)
+    grg_data = _grg_data(correct_files[0])
+
+    assert validate_grg_data(grg_data, workers=2)
+
+
+def test_schema_errors_parallel(monkeypatch, capsys):
+    monkeypatch.setattr(grg_psse2grg.validation, 'parallel_validation_min_components', 2)
+    grg_data = _grg_data(correct_files[0])
+    components = grg_data['network']['components']
+    first_id, last_id = list(components)[0], list(components)[-1]
+    del components[first_id]['type']
+    del components[last_id]['id']
+
+    assert not validate_grg_data(grg_data, workers=2)
+    output = capsys.readouterr().out
+    assert first_id in output
+    assert last_id in output
+
+    grg_data = _grg_data(correct_files[0])
+    del grg_data['network']['type']
+    assert not validate_grg_data(grg_data, workers=2)
@@ -0,0 +1,82 @@
+import gzip, io, json, os, pytest
+
+import grg_psse2grg
+
+from test_common import correct_files
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/correct/case5_000.raw'
+
+
+def _dumps(data):
+    return json.dumps(data, sort_keys=True, indent=2, separators=(',', ': '))
+
+
+@pytest.mark.parametrize('data', [
+    {},
+    [],
+    1.5,
+    {'b': {}, 'a': [1, {'z': None, 'y': 'é'}], 'c': {'d': {'e': {'f': {'g': [[]]}}}}},
+    {1: 'a', 2: {'b': 1}},
+    {'a': {2: 'b', 1: {'c': []}}},
+])
+def test_iter_grg_json(data):
+    assert ''.join(grg_psse2grg.io.iter_grg_json(data)) == _dumps(data)
+
+
+@pytest.mark.parametrize('input_data', correct_files)
+def test_write_grg_json(input_data):
+    case = grg_psse2grg.io.parse_psse_case_file(input_data)
+    grg_data = case.to_grg('test', skip_validation=True)
+    expected = _dumps(grg_data)+'\n'
+
+    output = io.StringIO()
+    grg_psse2grg.io.write_grg_json(grg_data, output, release=True)
+    assert output.getvalue() == expected
+    assert grg_data == {}
+
+
+def test_cli_output(tmpdir, capsys):
+    parser = grg_psse2grg.io.build_cli_parser()
+    grg_psse2grg.io.main(parser.parse_args([case5_file]))
+    output = capsys.readouterr().out
+
+    output_file_name = str(tmpdir.join('case5_000.json.gz'))
+    grg_psse2grg.io.main(parser.parse_args([case5_file, '-o', output_file_name]))
+    assert capsys.readouterr().out == ''
+    with gzip.open(output_file_name, 'rt') as output_file:
+        assert output_file.read() == output
+
+
+def test_compact_json():
+    grg_data = grg_psse2grg.io.parse_psse_case_file(case5_file).to_grg('test', skip_validation=True)
+    output = io.StringIO()
+    grg_psse2grg.io.write_grg_json(grg_data, output, compact=True)
+
+    assert output.getvalue() == json.dumps(grg_data, sort_keys=True, separators=(',', ':'))+'\n'
+
+
+def test_float_precision():
+    data = {'a': {'b': [1.23456, float('inf')], 'c': 2}}
+    text = ''.join(grg_psse2grg.io.iter_grg_json(data, float_precision=2))
+
+    assert json.loads(text) == {'a': {'b': [1.23, float('inf')], 'c': 2}}
+    assert data['a']['b'][0] == 1.23456
+
+
+@pytest.mark.parametrize('indent', [2, None])
+def test_orjson_backend(indent):
+    pytest.importorskip('orjson')
+    grg_data = grg_psse2grg.io.parse_psse_case_file(case5_file).to_grg('test', skip_validation=True)
+    grg_data['network']['nan'] = {'value': float('nan')}
+
+    for json_backend in ['orjson', 'auto']:
+        text = ''.join(grg_psse2grg.io.iter_grg_json(grg_data, indent=indent, json_backend=json_backend))
+        decoded = json.loads(text)
+        assert str(decoded['network']['nan']['value']) == 'nan'
+        del decoded['network']['nan']
+        assert json.dumps(decoded, sort_keys=True) == json.dumps(dict(grg_data, network={k: v for k, v in grg_data['network'].items() if k != 'nan'}), sort_keys=True)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ''.join(grg_psse2grg.io.iter_grg_json({}, json_backend='simplejson'))